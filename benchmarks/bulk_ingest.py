@@ -0,0 +1,88 @@
+"""
+본문 한 건씩 작성(`/posts/write`)과 일괄 작성(`/posts/bulk`)의 처리량을 비교하는 벤치마크입니다.
+
+같은 수의 본문을 한 건씩 동시 요청으로 넣을 때와, JSON 배열 / NDJSON 으로 묶어 넣을 때의
+posts/sec 를 비교합니다.
+
+    python -m benchmarks.bulk_ingest --posts 2000 --batch-size 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_rpc import MockSagaRPC  # noqa: E402
+from benchmarks.posts_latency_under_slow_rpc import start_app  # noqa: E402
+
+
+def make_posts(count, label):
+    return [{"agent_public_key": f"bench-{label}", "content": f"{label} post {i}"} for i in range(count)]
+
+
+async def single_writes(http, base_url, posts, concurrency):
+    queue = asyncio.Queue()
+    for post in posts:
+        queue.put_nowait(post)
+
+    async def worker():
+        while not queue.empty():
+            post = queue.get_nowait()
+            async with http.post(f"{base_url}/posts/write", data={**post, "hash": "benchmark"}) as response:
+                await response.read()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def bulk_writes(http, base_url, posts, batch_size, ndjson):
+    for start in range(0, len(posts), batch_size):
+        batch = posts[start:start + batch_size]
+        if ndjson:
+            body = "\n".join(json.dumps(post) for post in batch)
+            request = http.post(f"{base_url}/posts/bulk", data=body, headers={"Content-Type": "application/x-ndjson"})
+        else:
+            request = http.post(f"{base_url}/posts/bulk", json=batch)
+        async with request as response:
+            result = await response.json()
+            assert result["inserted"] == len(batch), result
+
+
+async def run(args):
+    base_url = f"http://127.0.0.1:{args.app_port}"
+    async with aiohttp.ClientSession() as http:
+        cases = [
+            ("single /posts/write", lambda: single_writes(http, base_url, make_posts(args.posts, "single"), args.concurrency)),
+            ("bulk JSON array", lambda: bulk_writes(http, base_url, make_posts(args.posts, "json"), args.batch_size, False)),
+            ("bulk NDJSON", lambda: bulk_writes(http, base_url, make_posts(args.posts, "ndjson"), args.batch_size, True)),
+        ]
+        for label, case in cases:
+            started = time.perf_counter()
+            await case()
+            elapsed = time.perf_counter() - started
+            print(f"{label:<20} {args.posts} posts in {elapsed:6.2f}s  {args.posts / elapsed:9.1f} posts/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpc-port", type=int, default=18545)
+    parser.add_argument("--app-port", type=int, default=18000)
+    parser.add_argument("--posts", type=int, default=2000, help="방식마다 작성할 본문 수")
+    parser.add_argument("--batch-size", type=int, default=500, help="일괄 요청 하나에 담을 본문 수")
+    parser.add_argument("--concurrency", type=int, default=10, help="한 건씩 작성할 때 동시 요청 수")
+    args = parser.parse_args()
+
+    os.environ["SAGA_RPC_URL"] = MockSagaRPC().serve_in_thread(port=args.rpc_port)
+    os.chdir(tempfile.mkdtemp(prefix="saga-bench-"))
+    start_app(args.app_port)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
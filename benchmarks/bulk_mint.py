@@ -0,0 +1,96 @@
+"""
+mock Saga RPC 위에서 SagaToken mint 를 한 건씩 보낼 때와 /blockchain/mint/bulk 로 한 번에 보낼 때를 비교합니다.
+
+  serial  POST /blockchain/mint 를 에이전트 지갑마다 차례로 호출
+  bulk    POST /blockchain/mint/bulk (all_agents) 한 번
+
+각 방식의 전체 시간, 건당 시간, mock RPC 가 받은 HTTP 요청 수, 노드에 들어간 트랜잭션 수를 보고합니다.
+
+    python -m benchmarks.bulk_mint --agents 200 --rpc-latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_rpc import MockSagaRPC  # noqa: E402
+from benchmarks.posts_latency_under_slow_rpc import start_app  # noqa: E402
+
+
+async def register_wallet(http, base_url, account) -> None:
+    async with http.post(f"{base_url}/external", json={
+        "personalData": {"walletAddress": account.address, "data": ""},
+        "agentModel": "bulk-mint",
+        "backendPrivateKey": account.key.hex(),
+    }) as response:
+        response.raise_for_status()
+
+
+async def run(args, rpc: MockSagaRPC) -> None:
+    from eth_account import Account
+
+    base_url = f"http://127.0.0.1:{args.app_port}"
+    minter = Account.create()
+    agents = [Account.create() for _ in range(args.agents)]
+    async with aiohttp.ClientSession() as http:
+        await register_wallet(http, base_url, minter)
+        for account in agents:
+            await register_wallet(http, base_url, account)
+
+        requests_before, transactions_before = rpc.http_requests, len(rpc.transactions)
+        started = time.perf_counter()
+        errors = 0
+        for account in agents:
+            async with http.post(f"{base_url}/blockchain/mint", data={
+                "wallet_address": minter.address, "recipient_address": account.address, "amount": "1.5",
+            }) as response:
+                errors += response.status != 200
+                await response.read()
+        report("serial", time.perf_counter() - started, len(agents), errors,
+               rpc.http_requests - requests_before, len(rpc.transactions) - transactions_before)
+
+        requests_before, transactions_before = rpc.http_requests, len(rpc.transactions)
+        started = time.perf_counter()
+        async with http.post(f"{base_url}/blockchain/mint/bulk", json={
+            "wallet_address": minter.address, "all_agents": True, "amount": 1.5,
+        }) as response:
+            body = await response.json()
+        # all_agents 에는 minter 자신도 포함됩니다.
+        report("bulk", time.perf_counter() - started, len(body["results"]), body["failed"],
+               rpc.http_requests - requests_before, len(rpc.transactions) - transactions_before)
+
+
+def report(label: str, elapsed: float, count: int, errors: int, http_requests: int, accepted: int) -> None:
+    print(
+        f"{label:<8} {count} mints in {elapsed * 1000:8.1f}ms ({elapsed / count * 1000:6.2f}ms/mint)  "
+        f"errors={errors}  rpc_http_requests={http_requests}  accepted={accepted}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=200)
+    parser.add_argument("--rpc-latency", type=float, default=0.05, help="mock RPC 기본 응답 지연(초)")
+    parser.add_argument("--rpc-port", type=int, default=18745)
+    parser.add_argument("--app-port", type=int, default=18700)
+    args = parser.parse_args()
+
+    rpc = MockSagaRPC(latency=args.rpc_latency)
+    os.environ["SAGA_RPC_URL"] = rpc.serve_in_thread(port=args.rpc_port)
+    # mock 노드는 컨트랙트를 실행하지 않으므로 주소만 있으면 됩니다.
+    os.environ.setdefault("SAGA_TOKEN_ADDRESS", "0x" + "5a" * 20)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.chdir(tempfile.mkdtemp(prefix="saga-bench-"))
+    start_app(args.app_port)
+    asyncio.run(run(args, rpc))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+프로세스를 새로 띄워 `/posts/` 가 처음 200 을 돌려줄 때까지의 시간(cold start)을 잽니다.
+
+매 실행마다 빈 임시 디렉터리(새 SQLite DB)에서 uvicorn 을 시작하고, 프로세스 시작부터
+첫 200 응답까지의 시간을 기록합니다. --max-ms 를 주면 중앙값이 그보다 느릴 때 종료 코드 1 로 끝납니다.
+
+    python -m benchmarks.cold_start --runs 5
+    python -m benchmarks.cold_start --runs 5 --max-ms 2000
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_rpc import MockSagaRPC  # noqa: E402
+
+
+def wait_for_ok(url: str, timeout: float) -> bool:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.005)
+    return False
+
+
+def measure_once(port: int, rpc_url: str, timeout: float) -> float:
+    env = dict(os.environ, SAGA_RPC_URL=rpc_url, PYTHONPATH=ROOT, LOG_LEVEL="WARNING")
+    workdir = tempfile.mkdtemp(prefix="saga-cold-")
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        if not wait_for_ok(f"http://127.0.0.1:{port}/posts/", timeout):
+            raise RuntimeError(f"/posts/ did not return 200 within {timeout}s")
+        return time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--rpc-port", type=int, default=18545)
+    parser.add_argument("--app-port", type=int, default=18000)
+    parser.add_argument("--timeout", type=float, default=30.0, help="실행 한 번의 최대 대기 시간(초)")
+    parser.add_argument("--max-ms", type=float, help="허용하는 중앙값 상한(ms)")
+    args = parser.parse_args()
+
+    rpc = MockSagaRPC()
+    rpc_url = rpc.serve_in_thread(port=args.rpc_port)
+
+    timings = []
+    for run in range(args.runs):
+        elapsed = measure_once(args.app_port, rpc_url, args.timeout)
+        timings.append(elapsed)
+        print(f"run {run + 1}: {elapsed * 1000:.0f}ms")
+
+    median_ms = statistics.median(timings) * 1000
+    print(f"time to first 200 on /posts/: median={median_ms:.0f}ms  min={min(timings) * 1000:.0f}ms  max={max(timings) * 1000:.0f}ms")
+
+    if args.max_ms is not None and median_ms > args.max_ms:
+        print(f"REGRESSION median {median_ms:.0f}ms > {args.max_ms:.0f}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+로컬 mock Saga RPC 위에서 주요 API 를 부하 테스트하고 시나리오별 처리량과 p50/p95/p99 지연을 보고합니다.
+
+시나리오:
+  posts_write     POST /posts/write
+  write_post      POST /llm/llm/execute (write_post)
+  write_comment   POST /llm/llm/execute (write_comment)
+  increment_like  POST /llm/llm/execute (increment_like)
+  connect_db      POST /llm/llm/execute (connect_db)
+  transfer_token  POST /blockchain/transfer-token/
+
+결과를 --save 로 저장해 두고, 다음 실행에서 --compare 로 비교하면 처리량이 줄거나 p99 가
+--tolerance 이상 나빠진 시나리오가 있을 때 종료 코드 1 로 끝납니다.
+
+    python -m benchmarks.load_test --requests 500 --concurrency 20 --rpc-latency 0.05 --save baseline.json
+    python -m benchmarks.load_test --requests 500 --concurrency 20 --rpc-latency 0.05 --compare baseline.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_rpc import MockSagaRPC  # noqa: E402
+from benchmarks.posts_latency_under_slow_rpc import percentile, start_app  # noqa: E402
+
+SCENARIOS = ("posts_write", "write_post", "write_comment", "increment_like", "connect_db", "transfer_token")
+
+
+class Fixture:
+    """시나리오가 공유하는 지갑과 본문입니다."""
+
+    def __init__(self, wallets, post_ids, recipient):
+        self.wallets = wallets
+        self.post_ids = post_ids
+        self.recipient = recipient
+        # 같은 지갑은 같은 본문에 한 번만 좋아요를 할 수 있으므로 (지갑, 본문) 조합을 차례로 씁니다.
+        self.like_pairs = itertools.product(post_ids, wallets)
+
+
+async def setup_fixture(http, base_url, wallets: int, posts: int) -> Fixture:
+    from eth_account import Account
+
+    accounts = [Account.create() for _ in range(wallets)]
+    for account in accounts:
+        async with http.post(f"{base_url}/external", json={
+            "personalData": {"walletAddress": account.address, "data": ""},
+            "agentModel": "load-test",
+            "backendPrivateKey": account.key.hex(),
+        }) as response:
+            response.raise_for_status()
+
+    author = Account.create().address
+    post_ids = []
+    for start in range(0, posts, 1000):
+        batch = [{"agent_public_key": author, "content": f"load test post {i}"} for i in range(start, min(posts, start + 1000))]
+        async with http.post(f"{base_url}/posts/bulk", json=batch) as response:
+            post_ids += [result["id"] for result in (await response.json())["results"]]
+
+    return Fixture([account.address for account in accounts], post_ids, Account.create().address)
+
+
+def build_request(scenario: str, index: int, fixture: Fixture):
+    wallet = fixture.wallets[index % len(fixture.wallets)]
+    if scenario == "posts_write":
+        return "/posts/write", {"data": {"agent_public_key": wallet, "content": f"post {index}", "hash": "load-test"}}
+    if scenario == "write_post":
+        return "/llm/llm/execute", {"json": {"function": "write_post", "arguments": {"wallet_address": wallet, "content": f"post {index}"}}}
+    if scenario == "write_comment":
+        post_id = fixture.post_ids[index % len(fixture.post_ids)]
+        return "/llm/llm/execute", {"json": {"function": "write_comment", "arguments": {"wallet_address": wallet, "content": f"comment {index}", "post_id": post_id}}}
+    if scenario == "increment_like":
+        post_id, wallet = next(fixture.like_pairs)
+        return "/llm/llm/execute", {"json": {"function": "increment_like", "arguments": {"content_type": "post", "content_id": post_id, "wallet_address": wallet}}}
+    if scenario == "connect_db":
+        return "/llm/llm/execute", {"json": {"function": "connect_db", "arguments": {"since_post_id": max(0, fixture.post_ids[-1] - 50)}}}
+    if scenario == "transfer_token":
+        return "/blockchain/transfer-token/", {"data": {"wallet_address": wallet, "recipient_address": fixture.recipient, "amount": "0.001"}}
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+async def run_scenario(http, base_url, scenario: str, requests: int, concurrency: int, fixture: Fixture) -> dict:
+    latencies, errors = [], 0
+    indexes = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for index in indexes:
+            path, kwargs = build_request(scenario, index, fixture)
+            started = time.perf_counter()
+            async with http.post(f"{base_url}{path}", **kwargs) as response:
+                await response.read()
+                if response.status >= 400:
+                    errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput": requests / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def report(results: dict) -> None:
+    print(f"{'scenario':<16} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for scenario, result in results.items():
+        print(
+            f"{scenario:<16} {result['throughput']:9.1f} {result['p50_ms']:9.1f} "
+            f"{result['p95_ms']:9.1f} {result['p99_ms']:9.1f} {result['errors']:7d}"
+        )
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for scenario, result in results.items():
+        base = baseline.get(scenario)
+        if base is None:
+            continue
+        if result["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{scenario}: throughput {result['throughput']:.1f} < baseline {base['throughput']:.1f} req/s")
+        if result["p99_ms"] > base["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{scenario}: p99 {result['p99_ms']:.1f} > baseline {base['p99_ms']:.1f} ms")
+        if result["errors"] > base["errors"]:
+            regressions.append(f"{scenario}: {result['errors']} errors, baseline {base['errors']}")
+    return regressions
+
+
+async def run(args) -> dict:
+    base_url = f"http://127.0.0.1:{args.app_port}"
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as http:
+        # increment_like 는 요청마다 서로 다른 (지갑, 본문) 조합이 필요합니다.
+        posts = max(100, args.requests // args.wallets + 1)
+        fixture = await setup_fixture(http, base_url, args.wallets, posts)
+        results = {}
+        for scenario in args.scenarios:
+            results[scenario] = await run_scenario(http, base_url, scenario, args.requests, args.concurrency, fixture)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=300, help="시나리오마다 보낼 요청 수")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--wallets", type=int, default=8, help="요청을 나눠 보낼 지갑 수")
+    parser.add_argument("--rpc-latency", type=float, default=0.0, help="mock RPC 기본 응답 지연(초)")
+    parser.add_argument("--rpc-jitter", type=float, default=0.0, help="mock RPC 무작위 추가 지연 상한(초)")
+    parser.add_argument("--rpc-port", type=int, default=18545)
+    parser.add_argument("--app-port", type=int, default=18000)
+    parser.add_argument("--save", help="결과를 JSON 으로 저장할 경로")
+    parser.add_argument("--compare", help="비교할 기준 결과 JSON 경로")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용하는 처리량/p99 악화 비율")
+    args = parser.parse_args()
+
+    rpc = MockSagaRPC(latency=args.rpc_latency, jitter=args.rpc_jitter)
+    os.environ["SAGA_RPC_URL"] = rpc.serve_in_thread(port=args.rpc_port)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    save_path = os.path.abspath(args.save) if args.save else None
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+    os.chdir(tempfile.mkdtemp(prefix="saga-bench-"))
+    start_app(args.app_port)
+
+    results = asyncio.run(run(args))
+    report(results)
+    print(f"mock RPC: {rpc.http_requests} HTTP requests, {sum(rpc.calls.values())} calls")
+
+    if save_path:
+        with open(save_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if compare_path:
+        with open(compare_path) as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+로컬 벤치마크용 메모리 Redis 클라이언트입니다.
+
+RedisCacheBackend 가 쓰는 redis.asyncio 클라이언트 명령(get, set(px=), mget, incr, aclose)만 흉내 냅니다.
+redis-py 기본값(decode_responses=False)처럼 값은 bytes 로 돌려주며, incr 한 카운터도 b"3" 처럼 읽힙니다.
+
+- latency: 명령마다 넣는 왕복 지연(초)
+
+calls 에 명령별 호출 수가 쌓입니다.
+"""
+import asyncio
+import time
+from collections import Counter
+
+
+class FakeRedis:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self.closed = False
+        # key → (만료 시각(monotonic), 값). 만료가 없으면 None
+        self._data: dict[str, tuple[float | None, bytes]] = {}
+
+    async def _command(self, name: str) -> None:
+        if self.closed:
+            raise ConnectionError("Client is closed")
+        self.calls[name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _read(self, key: str) -> bytes | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        if isinstance(value, (int, float)):
+            return str(value).encode("ascii")
+        return str(value).encode("utf-8")
+
+    async def get(self, key: str) -> bytes | None:
+        await self._command("get")
+        return self._read(key)
+
+    async def set(self, key: str, value, px: int | None = None) -> bool:
+        await self._command("set")
+        self._data[key] = (time.monotonic() + px / 1000 if px else None, self._encode(value))
+        return True
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        await self._command("mget")
+        return [self._read(key) for key in keys]
+
+    async def incr(self, key: str) -> int:
+        await self._command("incr")
+        value = int(self._read(key) or 0) + 1
+        entry = self._data.get(key)
+        # redis 처럼 기존 만료 시각은 유지합니다.
+        self._data[key] = (entry[0] if entry else None, self._encode(value))
+        return value
+
+    async def aclose(self) -> None:
+        self.closed = True
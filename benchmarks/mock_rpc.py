@@ -0,0 +1,170 @@
+"""
+로컬 벤치마크용 최소 Saga JSON-RPC 서버입니다.
+
+잔액, nonce, gasPrice, chainId, sendRawTransaction, 블록 번호와 영수증 조회를 흉내 내며,
+이미 쓰인 nonce 로 보낸 트랜잭션은 "nonce too low" 로 거절합니다.
+모든 응답에 지연을 넣어 느린 RPC 노드를 재현합니다.
+
+- latency: 모든 HTTP 요청에 넣는 기본 지연(초)
+- jitter: 0 ~ jitter 초 사이의 무작위 지연을 더합니다.
+- method_latency: 메서드별 지연(초). 배치 요청은 담긴 메서드 중 가장 긴 값을 씁니다.
+- error_rate: 이 비율의 요청에 JSON-RPC 에러(-32000)를 돌려줍니다.
+- http_error_rate: 이 비율의 HTTP 요청에 503 을 돌려줍니다(노드 장애, rate limit).
+
+replica() 로 같은 체인 상태를 공유하고 지연/에러 설정만 다른 노드를 더 만들 수 있습니다.
+
+대기 중인 트랜잭션은 eth_blockNumber 가 호출될 때 새 블록 하나로 채굴됩니다.
+"""
+import asyncio
+import random
+import threading
+from aiohttp import web
+from eth_account import Account
+from eth_utils import keccak
+import rlp
+
+DEFAULT_BALANCE = 10 ** 24
+
+
+def transaction_nonce(raw: bytes) -> int:
+    # legacy 트랜잭션은 RLP 리스트의 첫 항목, typed(EIP-2718) 트랜잭션은 chainId 다음 항목이 nonce 입니다.
+    fields = rlp.decode(raw) if raw[0] >= 0xc0 else rlp.decode(raw[1:])
+    return int.from_bytes(fields[0] if raw[0] >= 0xc0 else fields[1], "big")
+
+
+class MockSagaRPC:
+    def __init__(self, latency: float = 0.0, chain_id: int = 2712, gas_price: int = 10 ** 9,
+                 jitter: float = 0.0, method_latency: dict[str, float] | None = None, error_rate: float = 0.0,
+                 http_error_rate: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.method_latency = dict(method_latency or {})
+        self.error_rate = error_rate
+        self.http_error_rate = http_error_rate
+        self.chain_id = chain_id
+        self.gas_price = gas_price
+        self.nonces: dict[str, int] = {}
+        self.transactions: dict[str, dict] = {}
+        self.mempool: list[str] = []
+        self.blocks: list[list[str]] = [[]]
+        self.calls: dict[str, int] = {}
+        self.http_requests = 0
+        self.nonce_rejections = 0
+
+    def replica(self, **settings) -> "MockSagaRPC":
+        """nonce, 트랜잭션, 블록을 공유하는 다른 노드를 만듭니다. 호출 수는 노드마다 따로 셉니다."""
+        node = MockSagaRPC(**{"chain_id": self.chain_id, "gas_price": self.gas_price, **settings})
+        node.nonces, node.transactions, node.mempool, node.blocks = self.nonces, self.transactions, self.mempool, self.blocks
+        return node
+
+    def _dispatch(self, method: str, params: list):
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if method == "eth_chainId":
+            return hex(self.chain_id)
+        if method == "eth_gasPrice":
+            return hex(self.gas_price)
+        if method == "eth_getBalance":
+            return hex(DEFAULT_BALANCE)
+        if method == "eth_getTransactionCount":
+            return hex(self.nonces.get(params[0].lower(), 0))
+        if method == "eth_sendRawTransaction":
+            raw = bytes.fromhex(params[0][2:])
+            sender = Account.recover_transaction(raw).lower()
+            tx_hash = "0x" + keccak(raw).hex()
+            if tx_hash in self.transactions:
+                raise ValueError("already known")
+            nonce = transaction_nonce(raw)
+            if nonce < self.nonces.get(sender, 0):
+                self.nonce_rejections += 1
+                raise ValueError("nonce too low")
+            self.nonces[sender] = nonce + 1
+            self.transactions[tx_hash] = {"hash": tx_hash, "from": sender, "nonce": hex(nonce), "blockNumber": None}
+            self.mempool.append(tx_hash)
+            return tx_hash
+        if method == "eth_blockNumber":
+            self.mine()
+            return hex(len(self.blocks) - 1)
+        if method == "eth_getBlockReceipts":
+            number = int(params[0], 16)
+            if number >= len(self.blocks):
+                return None
+            return [self._receipt(tx_hash) for tx_hash in self.blocks[number]]
+        if method == "eth_getTransactionReceipt":
+            tx = self.transactions.get(params[0].lower())
+            return self._receipt(tx["hash"]) if tx and tx["blockNumber"] is not None else None
+        if method == "eth_getTransactionByHash":
+            return self.transactions.get(params[0].lower())
+        raise KeyError(method)
+
+    def mine(self) -> None:
+        if not self.mempool:
+            return
+        number = len(self.blocks)
+        for tx_hash in self.mempool:
+            self.transactions[tx_hash]["blockNumber"] = hex(number)
+        # replica 와 같은 리스트를 공유하므로 새 리스트로 바꾸지 않고 비웁니다.
+        self.blocks.append(list(self.mempool))
+        self.mempool.clear()
+
+    def _receipt(self, tx_hash: str) -> dict:
+        tx = self.transactions[tx_hash]
+        return {
+            "transactionHash": tx_hash,
+            "blockNumber": tx["blockNumber"],
+            "from": tx["from"],
+            "status": "0x1",
+            "gasUsed": hex(21000),
+        }
+
+    def delay_for(self, methods: list[str]) -> float:
+        delay = self.latency + max((self.method_latency.get(method, 0.0) for method in methods), default=0.0)
+        if self.jitter:
+            delay += random.uniform(0, self.jitter)
+        return delay
+
+    def _respond(self, request: dict) -> dict:
+        if self.error_rate and random.random() < self.error_rate:
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32000, "message": "injected error"}}
+        try:
+            result = self._dispatch(request["method"], request.get("params", []))
+            return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+        except KeyError:
+            error = {"code": -32601, "message": f"method not found: {request['method']}"}
+        except Exception as e:
+            error = {"code": -32000, "message": str(e)}
+        return {"jsonrpc": "2.0", "id": request["id"], "error": error}
+
+    async def handle(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        self.http_requests += 1
+        methods = [item.get("method") for item in payload] if isinstance(payload, list) else [payload.get("method")]
+        delay = self.delay_for(methods)
+        if delay:
+            await asyncio.sleep(delay)
+        if self.http_error_rate and random.random() < self.http_error_rate:
+            return web.Response(status=503, text="injected outage")
+        if isinstance(payload, list):
+            return web.json_response([self._respond(item) for item in payload])
+        return web.json_response(self._respond(payload))
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/", self.handle)
+        return app
+
+    def serve_in_thread(self, host: str = "127.0.0.1", port: int = 8545) -> str:
+        """별도 스레드의 이벤트 루프에서 서버를 띄우고 RPC URL을 반환합니다."""
+        started = threading.Event()
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            runner = web.AppRunner(self.app())
+            loop.run_until_complete(runner.setup())
+            loop.run_until_complete(web.TCPSite(runner, host, port).start())
+            started.set()
+            loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        started.wait()
+        return f"http://{host}:{port}"
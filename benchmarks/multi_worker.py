@@ -0,0 +1,174 @@
+"""
+워커 프로세스 수(WEB_CONCURRENCY)를 바꿔 가며 읽기 처리량과 같은 지갑 전송의 nonce 충돌을 확인합니다.
+
+워커 수마다 새 SQLite DB 로 `python main.py` 를 띄우고
+1) 읽기: --clients 개의 부하 프로세스가 --duration 초 동안 GET /posts/ 를 보내 초당 요청 수를 잽니다.
+   워커 1개 대비 배율과 코어당 효율(배율 / min(워커 수, 코어 수))을 함께 보고합니다.
+2) 전송: 한 지갑에서 POST /blockchain/transfer-token/ 을 --transfers 건 동시에 보내고,
+   mock 노드가 받은 nonce 가 0..n-1 로 겹치지 않고 빈틈없는지, "nonce too low" 로 거절된 전송이 있는지 봅니다.
+
+--compare-unsafe 를 주면 워커가 2개 이상일 때 MULTI_PROCESS=false(지갑 lease 없음)로 한 번 더 실행해 비교합니다.
+
+    python -m benchmarks.multi_worker --workers 1,2,4 --duration 5 --transfers 100
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.cold_start import wait_for_ok  # noqa: E402
+from benchmarks.mock_rpc import MockSagaRPC  # noqa: E402
+from benchmarks.posts_latency_under_slow_rpc import percentile  # noqa: E402
+
+
+def start_server(workers: int, port: int, rpc_url: str, multi_process: bool | None, warmup: float) -> subprocess.Popen:
+    workdir = tempfile.mkdtemp(prefix="saga-workers-")
+    env = dict(
+        os.environ,
+        WEB_CONCURRENCY=str(workers),
+        HOST="127.0.0.1",
+        PORT=str(port),
+        SAGA_RPC_URL=rpc_url,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'database.db')}",
+        LOG_LEVEL="WARNING",
+    )
+    if multi_process is not None:
+        env["MULTI_PROCESS"] = str(multi_process).lower()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "main.py")],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    if not wait_for_ok(f"http://127.0.0.1:{port}/posts/", 60):
+        process.terminate()
+        raise RuntimeError("server did not start")
+    # 첫 워커가 응답해도 나머지 워커와 체인 서비스는 아직 시작 중일 수 있습니다.
+    time.sleep(warmup)
+    return process
+
+
+def read_load(url: str, duration: float, concurrency: int, results) -> None:
+    async def run():
+        latencies = []
+        deadline = time.perf_counter() + duration
+
+        async def worker(http):
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                async with http.get(url) as response:
+                    await response.read()
+                latencies.append(time.perf_counter() - started)
+
+        async with aiohttp.ClientSession() as http:
+            await asyncio.gather(*(worker(http) for _ in range(concurrency)))
+        return latencies
+
+    results.put(asyncio.run(run()))
+
+
+def measure_reads(port: int, args) -> dict:
+    url = f"http://127.0.0.1:{port}/posts/"
+    results = multiprocessing.Queue()
+    clients = [
+        multiprocessing.Process(target=read_load, args=(url, args.duration, args.concurrency, results))
+        for _ in range(args.clients)
+    ]
+    for client in clients:
+        client.start()
+    latencies = [latency for _ in clients for latency in results.get()]
+    for client in clients:
+        client.join()
+    return {"rps": len(latencies) / args.duration, "p99_ms": percentile(latencies, 99) * 1000}
+
+
+async def measure_transfers(port: int, rpc: MockSagaRPC, count: int) -> dict:
+    from eth_account import Account
+
+    base_url = f"http://127.0.0.1:{port}"
+    sender, recipient = Account.create(), Account.create()
+    rejections_before = rpc.nonce_rejections
+    async with aiohttp.ClientSession() as http:
+        async with http.post(f"{base_url}/external", json={
+            "personalData": {"walletAddress": sender.address, "data": ""},
+            "agentModel": "multi-worker",
+            "backendPrivateKey": sender.key.hex(),
+        }) as response:
+            response.raise_for_status()
+
+        async def transfer():
+            async with http.post(f"{base_url}/blockchain/transfer-token/", data={
+                "wallet_address": sender.address, "recipient_address": recipient.address, "amount": "0.001",
+            }) as response:
+                await response.read()
+                return response.status == 200
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(transfer() for _ in range(count)))
+        elapsed = time.perf_counter() - started
+
+    nonces = [int(tx["nonce"], 16) for tx in list(rpc.transactions.values()) if tx["from"] == sender.address.lower()]
+    return {
+        "sent": sum(statuses),
+        "errors": count - sum(statuses),
+        "tps": sum(statuses) / elapsed,
+        "contiguous": sorted(nonces) == list(range(len(nonces))),
+        "nonce_rejections": rpc.nonce_rejections - rejections_before,
+    }
+
+
+def run_case(label: str, workers: int, rpc: MockSagaRPC, rpc_url: str, args, multi_process=None) -> dict:
+    process = start_server(workers, args.app_port, rpc_url, multi_process, args.warmup)
+    try:
+        reads = measure_reads(args.app_port, args) if multi_process is None else None
+        transfers = asyncio.run(measure_transfers(args.app_port, rpc, args.transfers))
+    finally:
+        process.terminate()
+        process.wait()
+    print(
+        f"{label:<22} "
+        + (f"reads {reads['rps']:8.0f} req/s  p99={reads['p99_ms']:6.1f}ms  " if reads else " " * 39)
+        + f"transfers sent={transfers['sent']} errors={transfers['errors']} {transfers['tps']:6.1f} tx/s  "
+        f"nonces contiguous={transfers['contiguous']} nonce_rejections={transfers['nonce_rejections']}"
+    )
+    return {"reads": reads, "transfers": transfers}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="쉼표로 구분한 워커 수 목록")
+    parser.add_argument("--duration", type=float, default=5.0, help="읽기 부하 시간(초)")
+    parser.add_argument("--clients", type=int, default=os.cpu_count(), help="읽기 부하 프로세스 수")
+    parser.add_argument("--concurrency", type=int, default=16, help="부하 프로세스당 동시 요청 수")
+    parser.add_argument("--transfers", type=int, default=100)
+    parser.add_argument("--warmup", type=float, default=5.0, help="서버가 뜬 뒤 측정 전 대기 시간(초)")
+    parser.add_argument("--compare-unsafe", action="store_true", help="지갑 lease 없이도 실행해 비교")
+    parser.add_argument("--rpc-latency", type=float, default=0.01)
+    parser.add_argument("--rpc-port", type=int, default=18845)
+    parser.add_argument("--app-port", type=int, default=18800)
+    args = parser.parse_args()
+
+    rpc = MockSagaRPC(latency=args.rpc_latency)
+    rpc_url = rpc.serve_in_thread(port=args.rpc_port)
+    cores = os.cpu_count()
+    print(f"{cores} CPU cores")
+
+    baseline = None
+    for workers in (int(value) for value in args.workers.split(",")):
+        result = run_case(f"workers={workers}", workers, rpc, rpc_url, args)
+        baseline = baseline or result["reads"]["rps"]
+        scale = result["reads"]["rps"] / baseline
+        print(f"{'':<22} scaling x{scale:.2f}  per-core efficiency {scale / min(workers, cores):.0%}")
+        if args.compare_unsafe and workers > 1:
+            run_case(f"workers={workers} no lease", workers, rpc, rpc_url, args, multi_process=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+느린 Saga RPC 아래에서 `/posts/` 응답 지연이 유지되는지 확인하는 부하 테스트입니다.
+
+로컬 mock RPC에 지연을 넣은 상태에서 `/llm/llm/execute` 좋아요 요청을 계속 보내며,
+동시에 `/posts/` 를 호출해 p50/p99 지연을 전송이 없을 때와 비교합니다.
+
+    python -m benchmarks.posts_latency_under_slow_rpc --rpc-latency 1.0
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_rpc import MockSagaRPC  # noqa: E402
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def start_app(port: int):
+    import uvicorn
+    from main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def measure_posts(http, base_url, requests, concurrency):
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            started = time.perf_counter()
+            async with http.get(f"{base_url}/posts/") as response:
+                await response.read()
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def send_likes(http, base_url, wallet_address, post_id, count):
+    payload = {
+        "function": "increment_like",
+        "arguments": {"content_type": "post", "content_id": post_id, "wallet_address": wallet_address},
+    }
+
+    async def like():
+        async with http.post(f"{base_url}/llm/llm/execute", json=payload) as response:
+            await response.read()
+
+    await asyncio.gather(*(like() for _ in range(count)))
+
+
+def report(label, latencies):
+    print(
+        f"{label:<24} n={len(latencies):<5} "
+        f"p50={percentile(latencies, 50) * 1000:7.1f}ms  p99={percentile(latencies, 99) * 1000:7.1f}ms"
+    )
+
+
+async def run(args):
+    base_url = f"http://127.0.0.1:{args.app_port}"
+    from eth_account import Account
+
+    account = Account.create()
+    async with aiohttp.ClientSession() as http:
+        await http.post(f"{base_url}/external", json={
+            "personalData": {"walletAddress": account.address, "data": ""},
+            "agentModel": "benchmark",
+            "backendPrivateKey": account.key.hex(),
+        })
+        async with http.post(f"{base_url}/posts/write", data={
+            "agent_public_key": Account.create().address, "content": "benchmark", "hash": "benchmark",
+        }) as response:
+            post_id = (await response.json())["post"]["id"]
+
+        report("/posts/ (idle RPC)", await measure_posts(http, base_url, args.requests, args.concurrency))
+
+        likes = asyncio.create_task(send_likes(http, base_url, account.address, post_id, args.likes))
+        await asyncio.sleep(0.1)
+        report("/posts/ (slow transfers)", await measure_posts(http, base_url, args.requests, args.concurrency))
+        await likes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpc-latency", type=float, default=1.0, help="mock RPC 응답 지연(초)")
+    parser.add_argument("--rpc-port", type=int, default=18545)
+    parser.add_argument("--app-port", type=int, default=18000)
+    parser.add_argument("--requests", type=int, default=300, help="측정할 /posts/ 요청 수")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--likes", type=int, default=20, help="동시에 보낼 좋아요 요청 수")
+    args = parser.parse_args()
+
+    os.environ["SAGA_RPC_URL"] = MockSagaRPC(latency=args.rpc_latency).serve_in_thread(port=args.rpc_port)
+    os.chdir(tempfile.mkdtemp(prefix="saga-bench-"))
+    start_app(args.app_port)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Redis 응답 캐시 백엔드를 메모리 Redis 클라이언트(benchmarks/mock_redis.py)로 확인하고 지연을 비교합니다.
+
+1) 확인: RedisCacheBackend 로 /posts/ 를 호출해 캐시 적중, ETag/If-Modified-Since 304, 쓰기 후 무효화, TTL 만료,
+   종료 시 연결 닫기가 동작하는지 봅니다. 하나라도 어긋나면 0 이 아닌 코드로 끝납니다.
+2) 비교: 캐시 끔 / 메모리 캐시 / Redis 캐시(--redis-latency 초의 왕복 지연)에서 /posts/ 의 p50/p99 를 잽니다.
+
+    python -m benchmarks.response_cache --posts 2000 --requests 200 --redis-latency 0.0005
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from email.utils import formatdate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='saga-cache-'), 'database.db')}"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from benchmarks.mock_redis import FakeRedis  # noqa: E402
+from benchmarks.posts_latency_under_slow_rpc import percentile  # noqa: E402
+
+
+def seed(engine, posts: int) -> None:
+    from models.models import Post
+
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        connection.execute(insert(Post), [
+            {"agent_public_key": f"agent-{i % 50}", "content": f"post {i}", "hash": "benchmark",
+             "created_at": now - timedelta(seconds=posts - i), "liked": 0}
+            for i in range(posts)
+        ])
+
+
+def check(label: str, ok: bool, failures: list[str]) -> None:
+    print(f"{'ok  ' if ok else 'FAIL'} {label}")
+    if not ok:
+        failures.append(label)
+
+
+def run_checks(client, cache, redis: FakeRedis) -> list[str]:
+    failures = []
+    hits, misses = cache.hits, cache.misses
+
+    first = client.get("/posts/")
+    check("첫 조회는 캐시 미스 후 저장", first.status_code == 200 and cache.misses == misses + 1
+          and redis.calls["mget"] >= 1 and redis.calls["set"] == 1, failures)
+
+    second = client.get("/posts/")
+    check("두 번째 조회는 캐시 적중, 같은 본문/ETag", cache.hits == hits + 1 and second.content == first.content
+          and second.headers["etag"] == first.headers["etag"], failures)
+
+    etag = first.headers["etag"]
+    not_modified = client.get("/posts/", headers={"If-None-Match": etag})
+    check("같은 ETag 는 304", not_modified.status_code == 304 and not not_modified.content, failures)
+
+    written = client.post("/posts/write", data={"agent_public_key": "agent-new", "content": "new post", "hash": "benchmark"})
+    check("작성이 posts 버전을 올림", written.status_code == 200 and redis.calls["incr"] == 1, failures)
+
+    stale = client.get("/posts/", headers={"If-None-Match": etag})
+    check("작성 후 이전 ETag 는 200 과 새 본문", stale.status_code == 200 and stale.headers["etag"] != etag
+          and b"new post" in stale.content, failures)
+
+    # 작성 전 응답과 같은 초에 다시 만든 응답일 수 있으므로 이전 Last-Modified 로는 304 가 나오면 안 됩니다.
+    since = client.get("/posts/", headers={"If-Modified-Since": first.headers["last-modified"]})
+    check("작성 후 이전 Last-Modified 는 200", since.status_code == 200 and b"new post" in since.content, failures)
+    later = formatdate(time.time() + 3600, usegmt=True)
+    check("더 나중 날짜의 If-Modified-Since 는 304", client.get("/posts/", headers={"If-Modified-Since": later}).status_code == 304, failures)
+
+    cache.ttl, ttl = 0.2, cache.ttl
+    client.get("/posts/?limit=1")
+    time.sleep(0.3)
+    misses = cache.misses
+    client.get("/posts/?limit=1")
+    check("TTL 이 지나면 다시 읽음", cache.misses == misses + 1, failures)
+    cache.ttl = ttl
+    return failures
+
+
+def measure(client, requests: int) -> dict:
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        client.get("/posts/").raise_for_status()
+        latencies.append(time.perf_counter() - started)
+    return {"p50_ms": percentile(latencies, 50) * 1000, "p99_ms": percentile(latencies, 99) * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--redis-latency", type=float, default=0.0005, help="Redis 명령당 왕복 지연(초)")
+    args = parser.parse_args()
+
+    from main import app
+    from database.connection import engine
+    from services.response_cache import response_cache, MemoryCacheBackend, RedisCacheBackend, RESPONSE_CACHE_TTL
+
+    redis = FakeRedis()
+    response_cache.backend = RedisCacheBackend(redis)
+    response_cache.ttl = RESPONSE_CACHE_TTL or 30
+
+    with TestClient(app) as client:
+        seed(engine, args.posts)
+        failures = run_checks(client, response_cache, redis)
+
+        results = []
+        for label, backend, ttl in (
+            ("cache off", MemoryCacheBackend(), 0),
+            ("memory", MemoryCacheBackend(), 30),
+            ("redis", RedisCacheBackend(FakeRedis(latency=args.redis_latency)), 30),
+        ):
+            response_cache.backend, response_cache.ttl = backend, ttl
+            results.append((label, measure(client, args.requests)))
+        # 종료 시 lifespan 이 닫는 연결이 확인용 클라이언트가 되도록 되돌립니다.
+        response_cache.backend = RedisCacheBackend(redis)
+
+    check("종료 시 Redis 연결을 닫음", redis.closed, failures)
+    print(f"redis calls: {dict(redis.calls)}")
+    for label, result in results:
+        print(f"{label:<10} p50={result['p50_ms']:7.2f}ms  p99={result['p99_ms']:7.2f}ms")
+
+    if failures:
+        sys.exit(f"{len(failures)} check(s) failed")
+
+
+if __name__ == "__main__":
+    main()
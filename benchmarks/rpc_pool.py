@@ -0,0 +1,139 @@
+"""
+RPC 노드 여러 개를 묶은 RPCPoolProvider 를 노드 하나만 쓸 때와 비교합니다.
+
+체인 상태를 공유하는 mock 노드 세 개를 띄웁니다.
+  primary  기본 지연 + 큰 jitter (느린 꼬리 지연)
+  fast     짧은 지연
+  flaky    --flaky-error-rate 비율로 503
+
+1) 읽기: 같은 eth_getBalance 부하를 primary 하나 / pool 에 보내 p50/p95/p99 와 에러 수를 비교합니다.
+2) 장애: fast 노드를 중간에 완전히 내려도 pool 의 읽기가 계속 성공하는지 봅니다.
+3) 쓰기: 전송 도중 primary 를 내리면 다음 노드로 넘어가고, 같은 트랜잭션이 두 번 들어가지 않는지 확인합니다.
+
+    python -m benchmarks.rpc_pool --requests 500 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_rpc import MockSagaRPC  # noqa: E402
+from benchmarks.posts_latency_under_slow_rpc import percentile  # noqa: E402
+
+
+def create_client(urls):
+    from web3 import AsyncWeb3
+    from services.rpc_pool import RPCPoolProvider
+
+    return AsyncWeb3(RPCPoolProvider(urls))
+
+
+async def run_reads(w3, address: str, requests: int, concurrency: int, during=None) -> dict:
+    latencies, errors = [], 0
+    indexes = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for index in indexes:
+            if during and index == requests // 2:
+                during()
+            started = time.perf_counter()
+            try:
+                await w3.eth.get_balance(address)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "errors": errors,
+    }
+
+
+async def run_writes(w3, account, count: int, during=None) -> tuple[int, int]:
+    sent, errors = 0, 0
+    chain_id = await w3.eth.chain_id
+    nonce = await w3.eth.get_transaction_count(account.address, "pending")
+    for index in range(count):
+        if during and index == count // 2:
+            during()
+        tx = {"to": account.address, "value": 1, "nonce": nonce, "gas": 21000, "gasPrice": 10 ** 9, "chainId": chain_id}
+        try:
+            await w3.eth.send_raw_transaction(account.sign_transaction(tx).raw_transaction)
+            sent += 1
+            nonce += 1
+        except Exception:
+            errors += 1
+    return sent, errors
+
+
+def report(label: str, result: dict) -> None:
+    print(
+        f"{label:<28} p50={result['p50_ms']:7.1f}ms  p95={result['p95_ms']:7.1f}ms  "
+        f"p99={result['p99_ms']:7.1f}ms  errors={result['errors']}"
+    )
+
+
+async def run(args) -> None:
+    from eth_account import Account
+
+    primary = MockSagaRPC(latency=args.latency, jitter=args.jitter)
+    fast = primary.replica(latency=args.latency)
+    flaky = primary.replica(latency=args.latency, http_error_rate=args.flaky_error_rate)
+    urls = [
+        primary.serve_in_thread(port=args.base_port),
+        fast.serve_in_thread(port=args.base_port + 1),
+        flaky.serve_in_thread(port=args.base_port + 2),
+    ]
+    address = Account.create().address
+
+    single = create_client(urls[:1])
+    pool = create_client(urls)
+    report("single node (primary)", await run_reads(single, address, args.requests, args.concurrency))
+    report("pool", await run_reads(pool, address, args.requests, args.concurrency))
+
+    def fast_down():
+        fast.http_error_rate = 1.0
+
+    report("pool, fast node goes down", await run_reads(pool, address, args.requests, args.concurrency, during=fast_down))
+    for stats in pool.provider.stats():
+        print(f"  {stats}")
+
+    def primary_down():
+        primary.http_error_rate = 1.0
+
+    fast.http_error_rate = 0.0
+    flaky.http_error_rate = 0.0
+    transactions_before = len(primary.transactions)
+    sent, errors = await run_writes(pool, Account.create(), args.writes, during=primary_down)
+    print(
+        f"writes: sent={sent} errors={errors} accepted by chain={len(primary.transactions) - transactions_before} "
+        f"primary now {pool.provider.primary.name}"
+    )
+    await single.provider.disconnect()
+    await pool.provider.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--writes", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.01, help="노드 기본 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.3, help="primary 노드의 무작위 추가 지연 상한(초)")
+    parser.add_argument("--flaky-error-rate", type=float, default=0.3)
+    parser.add_argument("--base-port", type=int, default=18645)
+    args = parser.parse_args()
+    os.environ.setdefault("RPC_BREAKER_COOLDOWN", "5")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+전송 한 건당 서명 준비에 드는 CPU 시간 마이크로 벤치마크입니다.
+
+before: 전송마다 UserWallet 조회 + Account.from_key(공개 키 유도) + 서명
+after : services.signers.get_signer 캐시 적중 + 서명
+
+    python -m benchmarks.signer_cache --iterations 2000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from eth_account import Account  # noqa: E402
+from sqlmodel import SQLModel, select  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from database.connection import create_async_db_engine  # noqa: E402
+from models.models import UserWallet  # noqa: E402
+from services.signers import get_signer, signer_cache  # noqa: E402
+
+TX = {
+    "to": "0x000000000000000000000000000000000000dEaD",
+    "value": 3 * 10 ** 18,
+    "nonce": 0,
+    "gas": 21000,
+    "gasPrice": 10 ** 9,
+    "chainId": 2712,
+}
+
+
+async def before(session, wallet_address):
+    wallet = (await session.exec(select(UserWallet).where(UserWallet.wallet_address == wallet_address))).first()
+    account = Account.from_key(wallet.private_key)
+    return account.sign_transaction(TX)
+
+
+async def after(session, wallet_address):
+    account = await get_signer(session, wallet_address)
+    return account.sign_transaction(TX)
+
+
+async def measure(label, path, session, wallet_address, iterations):
+    cpu_started, wall_started = time.process_time(), time.perf_counter()
+    for _ in range(iterations):
+        await path(session, wallet_address)
+    cpu = (time.process_time() - cpu_started) / iterations
+    wall = (time.perf_counter() - wall_started) / iterations
+    print(f"{label:<7} cpu={cpu * 1e6:8.1f}us/transfer  wall={wall * 1e6:8.1f}us/transfer")
+
+
+async def run(iterations):
+    engine = create_async_db_engine(f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}", echo=False)
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+
+    account = Account.create()
+    async with AsyncSession(engine) as session:
+        session.add(UserWallet(wallet_address=account.address, private_key=account.key.hex()))
+        await session.commit()
+
+        signer_cache.clear()
+        await measure("before", before, session, account.address, iterations)
+        await measure("after", after, session, account.address, iterations)
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
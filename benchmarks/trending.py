@@ -0,0 +1,126 @@
+"""
+에이전트가 읽을 글을 고르는 두 방법의 지연 시간을 비교하는 벤치마크입니다.
+
+1) connect_db: 본문과 댓글을 모두 받아 클라이언트에서 좋아요, 댓글 수, 작성 시각으로 순위를 매깁니다.
+2) /posts/trending: 점수 인덱스에서 상위 --limit 개만 읽습니다.
+
+본문 수를 바꿔 가며 새 SQLite DB 에 본문/댓글/좋아요를 채운 뒤 각각 --requests 번 호출합니다.
+응답 캐시는 끄고(RESPONSE_CACHE_TTL=0) 매번 DB 를 읽게 합니다.
+
+    python -m benchmarks.trending --posts 1000,5000,20000 --limit 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='saga-trending-'), 'database.db')}"
+os.environ["RESPONSE_CACHE_TTL"] = "0"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import delete, insert  # noqa: E402
+
+from benchmarks.posts_latency_under_slow_rpc import percentile  # noqa: E402
+
+
+def seed(engine, posts: int, comments_per_post: int, likes_per_post: int) -> None:
+    from database.trending import backfill_trending
+    from models.models import Post, Comment, Like, PostTrend
+
+    now = datetime.utcnow()
+    rng = random.Random(posts)
+    with engine.begin() as connection:
+        for table in (PostTrend, Like, Comment, Post):
+            connection.execute(delete(table))
+        connection.execute(insert(Post), [
+            {"id": i, "agent_public_key": f"agent-{i % 50}", "content": f"post {i}", "hash": "benchmark",
+             "created_at": now - timedelta(minutes=rng.randrange(7 * 24 * 60)), "liked": 0}
+            for i in range(1, posts + 1)
+        ])
+        comments, likes = [], []
+        for post_id in range(1, posts + 1):
+            for _ in range(rng.randrange(comments_per_post * 2 + 1)):
+                comments.append({
+                    "agent_public_key": "agent-c", "content": "comment", "hash": "benchmark", "post_id": post_id,
+                    "created_at": now - timedelta(minutes=rng.randrange(7 * 24 * 60)), "liked": 0
+                })
+            for wallet in range(rng.randrange(likes_per_post * 2 + 1)):
+                likes.append({
+                    "wallet_address": f"wallet-{wallet}", "content_type": "post", "content_id": post_id,
+                    "created_at": now - timedelta(minutes=rng.randrange(7 * 24 * 60))
+                })
+        connection.execute(insert(Comment), comments)
+        connection.execute(insert(Like), likes)
+        connection.exec_driver_sql(
+            "UPDATE post SET liked = (SELECT count(*) FROM content_like "
+            "WHERE content_type = 'post' AND content_id = post.id)"
+        )
+        backfill_trending(connection)
+
+
+def rank_client_side(rows: list[dict], limit: int) -> list[int]:
+    # 에이전트가 connect_db 결과로 직접 하던 순위 계산
+    comment_counts: dict[int, int] = {}
+    for row in rows:
+        if row["type"] == "comment":
+            comment_counts[row["post_id"]] = comment_counts.get(row["post_id"], 0) + 1
+    posts = [row for row in rows if row["type"] == "post"]
+    posts.sort(key=lambda row: (row["liked"] + 2 * comment_counts.get(row["id"], 0), row["created_at"]), reverse=True)
+    return [row["id"] for row in posts[:limit]]
+
+
+def measure(call, requests: int) -> dict:
+    latencies = []
+    size = 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        size = call()
+        latencies.append(time.perf_counter() - started)
+    return {"p50_ms": percentile(latencies, 50) * 1000, "p99_ms": percentile(latencies, 99) * 1000, "bytes": size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", default="1000,5000,20000", help="쉼표로 구분한 본문 수 목록")
+    parser.add_argument("--comments-per-post", type=int, default=3)
+    parser.add_argument("--likes-per-post", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=5)
+    args = parser.parse_args()
+
+    from main import app
+    from database.connection import engine
+
+    with TestClient(app) as client:
+        def connect_db():
+            response = client.post("/llm/llm/execute", json={"function": "connect_db", "arguments": {}})
+            response.raise_for_status()
+            body = response.json()
+            rank_client_side([{"type": "post", **row} for row in body["post_data"]]
+                             + [{"type": "comment", **row} for row in body["comment_data"]], args.limit)
+            return len(response.content)
+
+        def trending():
+            response = client.get(f"/posts/trending?limit={args.limit}")
+            response.raise_for_status()
+            return len(response.content)
+
+        for posts in (int(value) for value in args.posts.split(",")):
+            seed(engine, posts, args.comments_per_post, args.likes_per_post)
+            for label, call in (("connect_db + rank", connect_db), ("/posts/trending", trending)):
+                result = measure(call, args.requests)
+                print(
+                    f"posts={posts:<7} {label:<18} p50={result['p50_ms']:8.1f}ms  p99={result['p99_ms']:8.1f}ms  "
+                    f"response={result['bytes'] / 1024:9.1f} KiB"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+SQLite 엔진 프로필별 동시 쓰기 처리량 벤치마크입니다.
+
+N 개의 writer 스레드가 각자 세션을 열어 Post 를 한 건씩 커밋하며,
+legacy(SQLite 기본 설정)와 tuned(WAL 등 pragma 적용) 프로필의 posts/sec 와
+"database is locked" 에러 수를 비교합니다.
+
+    python -m benchmarks.write_concurrency --writers 1 4 16 --posts 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlmodel import SQLModel, Session  # noqa: E402
+
+from database.connection import create_db_engine  # noqa: E402
+from models.models import Post  # noqa: E402
+
+
+def run_writers(engine, writers: int, posts_per_writer: int):
+    errors = []
+    barrier = threading.Barrier(writers)
+
+    def write(writer_id: int):
+        barrier.wait()
+        for i in range(posts_per_writer):
+            try:
+                with Session(engine) as session:
+                    session.add(Post(agent_public_key=f"writer-{writer_id}", content=f"post {i}", hash="benchmark"))
+                    session.commit()
+            except OperationalError as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    written = writers * posts_per_writer - len(errors)
+    return written / elapsed, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--posts", type=int, default=200, help="writer 한 개가 커밋할 본문 수")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="saga-bench-")
+    for profile in ("legacy", "tuned"):
+        for writers in args.writers:
+            url = f"sqlite:///{os.path.join(workdir, f'{profile}-{writers}.db')}"
+            engine = create_db_engine(url, profile=profile, echo=False)
+            SQLModel.metadata.create_all(engine)
+            rate, errors = run_writers(engine, writers, args.posts)
+            engine.dispose()
+            print(f"{profile:<7} writers={writers:<3} {rate:9.1f} posts/sec  locked errors={errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,211 @@
+import os
+import math
+import tempfile
+from contextlib import contextmanager
+from sqlalchemy import event, inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlmodel import create_engine, SQLModel, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from services.metrics import instrument_engine
+from services import settings  # noqa: F401  .env 를 읽습니다.
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///database.db")
+# 비동기 세션용 드라이버. 지정하지 않으면 DATABASE_URL 에서 만듭니다.
+#   sqlite:///database.db → sqlite+aiosqlite:///database.db
+#   postgresql://...      → postgresql+asyncpg://...
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg"}
+# SQL 로그 출력. 모든 쿼리를 동기적으로 찍으므로 디버깅할 때만 켭니다.
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+# tuned: WAL 등 동시 쓰기용 pragma 적용 / legacy: SQLite 기본 설정 그대로
+DB_PROFILE = os.getenv("DB_PROFILE", "tuned")
+
+# 연결마다 적용하는 SQLite pragma 설정
+SQLITE_PROFILES = {
+    "tuned": {
+        # 읽기와 쓰기가 서로를 막지 않도록 WAL 저널 사용
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        # WAL 에서는 NORMAL 로도 손상 없이 안전하며, 커밋마다 fsync 하지 않습니다.
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        # 잠금이 풀릴 때까지 기다리는 시간(ms). "database is locked" 대신 대기합니다.
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        # 음수는 KiB 단위 (기본 64MB)
+        "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-64000")),
+        "temp_store": "MEMORY",
+    },
+    "legacy": {},
+}
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: dict):
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def _null_on_error(fn):
+    # SQLite 내장 수학 함수처럼 정의역 밖의 값은 에러 대신 NULL 을 돌려줍니다.
+    def call(value):
+        try:
+            return None if value is None else fn(value)
+        except (ValueError, OverflowError):
+            return None
+    return call
+
+
+def register_sqlite_functions(dbapi_connection):
+    # trending 점수 upsert 가 쓰는 ln/exp. 수학 함수 없이 빌드된 SQLite 에서도 쓸 수 있도록 연결마다 등록합니다.
+    for name, fn in (("ln", math.log), ("exp", math.exp)):
+        dbapi_connection.create_function(name, 1, _null_on_error(fn), deterministic=True)
+
+
+def sqlite_connect_hook(pragmas: dict):
+    def on_connect(dbapi_connection, _):
+        register_sqlite_functions(dbapi_connection)
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+    return on_connect
+
+
+def create_db_engine(url: str = DATABASE_URL, profile: str = DB_PROFILE, echo: bool = DB_ECHO):
+    if not url.startswith("sqlite"):
+        return create_engine(url, echo=echo, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_pre_ping=True)
+
+    pragmas = SQLITE_PROFILES[profile]
+    if profile == "legacy":
+        engine = create_engine(url, echo=echo)
+        event.listen(engine, "connect", sqlite_connect_hook(pragmas))
+        return engine
+
+    engine = create_engine(
+        url,
+        echo=echo,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        # 풀의 연결은 여러 스레드(FastAPI threadpool)에서 번갈아 사용됩니다.
+        connect_args={"check_same_thread": False, "timeout": pragmas["busy_timeout"] / 1000},
+    )
+    event.listen(engine, "connect", sqlite_connect_hook(pragmas))
+    return engine
+
+
+def async_database_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+
+
+def create_async_db_engine(url: str = ASYNC_DATABASE_URL, profile: str = DB_PROFILE, echo: bool = DB_ECHO,
+                           pool_size: int = DB_POOL_SIZE, max_overflow: int = DB_MAX_OVERFLOW):
+    if not url.startswith("sqlite"):
+        return create_async_engine(url, echo=echo, pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=True)
+
+    pragmas = SQLITE_PROFILES[profile]
+    if profile == "legacy":
+        engine = create_async_engine(url, echo=echo)
+        event.listen(engine.sync_engine, "connect", sqlite_connect_hook(pragmas))
+        return engine
+
+    engine = create_async_engine(
+        url,
+        echo=echo,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        connect_args={"timeout": pragmas["busy_timeout"] / 1000},
+    )
+    event.listen(engine.sync_engine, "connect", sqlite_connect_hook(pragmas))
+    return engine
+
+
+engine = create_db_engine()
+async_engine = create_async_db_engine()
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+# 비동기 세션에서는 커밋 후 속성을 다시 읽으려고 암묵적 I/O 가 일어나지 않도록 만료시키지 않습니다.
+async_session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+# 스키마 생성을 직렬화하는 잠금. Postgres 는 advisory lock, 그 밖에는 이 파일에 flock 을 겁니다.
+# 지정하지 않으면 SQLite 파일 옆(메모리 DB 등은 임시 디렉터리)에 만듭니다.
+SCHEMA_LOCK_FILE = os.getenv("SCHEMA_LOCK_FILE")
+SCHEMA_LOCK_KEY = 0x5a6a5343
+
+
+def schema_lock_path() -> str:
+    if SCHEMA_LOCK_FILE:
+        return SCHEMA_LOCK_FILE
+    database = engine.url.database if engine.dialect.name == "sqlite" else None
+    if database and database != ":memory:":
+        return os.path.abspath(database) + ".schema.lock"
+    return os.path.join(tempfile.gettempdir(), "saga-backend-schema.lock")
+
+
+@contextmanager
+def schema_lock():
+    """
+    여러 워커 프로세스가 동시에 시작해도 스키마 생성과 마이그레이션이 한 번에 하나씩만 실행되게 합니다.
+    먼저 잡은 프로세스가 테이블을 만들고, 뒤의 프로세스는 이미 있는 것을 확인만 하고 지나갑니다.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as connection:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+            try:
+                yield
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        return
+
+    import fcntl
+
+    with open(schema_lock_path(), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
 
-engine = create_engine("sqlite:///database.db", echo=True)
 
 def conn():
-    from models.models import Post, Comment  # 모델 임포트
+    with schema_lock():
+        create_schema()
+
+
+def create_schema():
+    from models.models import Post, Comment, UserWallet, Like, TransferOutbox, PayoutLedger, TrackedTransaction, Lease, PostTrend  # 모델 임포트
+    trend_table_exists = inspect(engine).has_table(PostTrend.__tablename__)
     SQLModel.metadata.create_all(engine)
+    add_missing_columns()
+    # create_all 은 이미 있는 테이블의 인덱스를 만들지 않으므로, 새로 추가된 인덱스를 따로 만듭니다.
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    # SQLite 전문 검색 색인(FTS5)과 동기화 트리거
+    from database.search import create_search_index
+    create_search_index(engine)
+    # 인기 점수 테이블을 처음 만들었으면 기존 좋아요/댓글로 채웁니다.
+    if not trend_table_exists:
+        from database.trending import backfill_trending
+        with engine.begin() as connection:
+            backfill_trending(connection)
+
+def add_missing_columns():
+    # create_all 은 이미 있는 테이블에 컬럼을 추가하지 않으므로, 모델에 새로 생긴 nullable 컬럼을 붙입니다.
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+async def get_async_session():
+    async with async_session_factory() as session:
+        yield session
@@ -0,0 +1,65 @@
+import json
+import base64
+from datetime import datetime
+from typing import Literal
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlmodel import Session, select
+
+# 목록 조회 정렬 방식: 최신순(created_at, id) / 좋아요순(liked, id)
+Order = Literal["newest", "most_liked"]
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _sort_columns(model, order: Order):
+    if order == "most_liked":
+        return [("liked", model.liked), ("id", model.id)]
+    return [("created_at", model.created_at), ("id", model.id)]
+
+
+def encode_cursor(values: dict) -> str:
+    raw = json.dumps(values, default=lambda v: v.isoformat()).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str, order: Order) -> dict:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if order == "newest":
+            values["created_at"] = datetime.fromisoformat(values["created_at"])
+        return values
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(session: Session, model, order: Order = "newest", cursor: str | None = None,
+             limit: int = DEFAULT_PAGE_SIZE, filters=()):
+    """
+    (정렬 컬럼, id) 기준 keyset 페이지네이션입니다. OFFSET 없이 마지막으로 본 행 다음부터
+    인덱스를 타고 읽기 때문에 몇 번째 페이지든 비용이 같습니다.
+    """
+    columns = _sort_columns(model, order)
+    statement = select(model).where(*filters)
+
+    if cursor:
+        values = decode_cursor(cursor, order)
+        statement = statement.where(
+            tuple_(*(column for _, column in columns)) < tuple_(*(values[name] for name, _ in columns))
+        )
+
+    statement = statement.order_by(*(column.desc() for _, column in columns)).limit(limit + 1)
+    rows = session.exec(statement).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor({name: getattr(last, name) for name, _ in columns})
+
+    return {
+        "items": rows,
+        "next_cursor": next_cursor
+    }
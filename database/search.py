@@ -0,0 +1,161 @@
+import re
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.pagination import encode_cursor, decode_cursor
+
+# 본문/댓글 검색용 FTS5 테이블. rowid 는 본문이면 id * 2, 댓글이면 id * 2 + 1 입니다.
+# 검색 대상은 content 뿐이고 나머지 컬럼은 필터와 응답용으로만 저장합니다.
+SEARCH_TABLE = "content_search"
+
+SEARCH_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        content,
+        content_type UNINDEXED,
+        content_id UNINDEXED,
+        post_id UNINDEXED,
+        agent_public_key UNINDEXED,
+        tokenize = 'unicode61'
+    )
+    """,
+    # 작성 경로(단건, 일괄, 더미)와 무관하게 DB 에서 바로 색인을 맞춥니다.
+    f"""
+    CREATE TRIGGER IF NOT EXISTS post_search_insert AFTER INSERT ON post BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, content, content_type, content_id, post_id, agent_public_key)
+        VALUES (new.id * 2, new.content, 'post', new.id, new.id, new.agent_public_key);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS post_search_update AFTER UPDATE OF content, agent_public_key ON post BEGIN
+        UPDATE {SEARCH_TABLE} SET content = new.content, agent_public_key = new.agent_public_key
+        WHERE rowid = new.id * 2;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS post_search_delete AFTER DELETE ON post BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id * 2;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS comment_search_insert AFTER INSERT ON comment BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, content, content_type, content_id, post_id, agent_public_key)
+        VALUES (new.id * 2 + 1, new.content, 'comment', new.id, new.post_id, new.agent_public_key);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS comment_search_update AFTER UPDATE OF content, agent_public_key ON comment BEGIN
+        UPDATE {SEARCH_TABLE} SET content = new.content, agent_public_key = new.agent_public_key
+        WHERE rowid = new.id * 2 + 1;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS comment_search_delete AFTER DELETE ON comment BEGIN
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+]
+
+# 색인이 새로 만들어졌을 때 기존 행을 채웁니다.
+SEARCH_BACKFILL = [
+    f"""
+    INSERT INTO {SEARCH_TABLE}(rowid, content, content_type, content_id, post_id, agent_public_key)
+    SELECT id * 2, content, 'post', id, id, agent_public_key FROM post
+    """,
+    f"""
+    INSERT INTO {SEARCH_TABLE}(rowid, content, content_type, content_id, post_id, agent_public_key)
+    SELECT id * 2 + 1, content, 'comment', id, post_id, agent_public_key FROM comment
+    """,
+]
+
+
+def create_search_index(engine) -> None:
+    """SQLite 에서 FTS5 테이블과 동기화 트리거를 만듭니다. 다른 DB 에서는 아무것도 하지 않습니다."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as connection:
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": SEARCH_TABLE}
+        ).first()
+        for statement in SEARCH_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            for statement in SEARCH_BACKFILL:
+                connection.execute(text(statement))
+
+
+def match_expression(query: str) -> str:
+    """
+    일반 검색어를 FTS5 MATCH 식으로 바꿉니다. 단어마다 따옴표로 감싸고 접두어 검색(*)을 붙이므로
+    "게시글" 로 "게시글입니다" 도 찾습니다. 단어는 모두 포함되어야 합니다(AND).
+    """
+    terms = [term.replace('"', '""') for term in re.split(r"\s+", query.strip()) if term]
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+async def search_content(session: AsyncSession, query: str, content_type: str | None = None,
+                         author: str | None = None, cursor: str | None = None, limit: int = 20, raw: bool = False):
+    """
+    BM25 점수순(낮을수록 관련도가 높음) 검색입니다. (점수, rowid) 기준 keyset 페이지네이션을 사용합니다.
+    raw 면 query 를 FTS5 문법 그대로 MATCH 에 넘깁니다.
+    """
+    if session.bind.dialect.name != "sqlite":
+        raise HTTPException(status_code=501, detail="Search requires SQLite FTS5")
+
+    expression = query if raw else match_expression(query)
+    if not expression:
+        raise HTTPException(status_code=400, detail="Empty search query")
+
+    conditions = [f"{SEARCH_TABLE} MATCH :expression"]
+    params = {"expression": expression, "limit": limit + 1}
+    if content_type:
+        conditions.append("content_type = :content_type")
+        params["content_type"] = content_type
+    if author:
+        conditions.append("agent_public_key = :author")
+        params["author"] = author
+    if cursor:
+        values = decode_cursor(cursor, "search")
+        conditions.append(f"(bm25({SEARCH_TABLE}) > :score OR (bm25({SEARCH_TABLE}) = :score AND rowid > :rowid))")
+        params.update(score=values["score"], rowid=values["rowid"])
+
+    statement = text(f"""
+        SELECT rowid, content_type, content_id, post_id, agent_public_key, content,
+               bm25({SEARCH_TABLE}) AS score,
+               snippet({SEARCH_TABLE}, 0, '[', ']', '…', 16) AS snippet
+        FROM {SEARCH_TABLE}
+        WHERE {" AND ".join(conditions)}
+        ORDER BY score, rowid
+        LIMIT :limit
+    """)
+    try:
+        rows = [dict(row._mapping) for row in await session.exec(statement, params=params)]
+    except OperationalError as e:
+        # raw 검색어의 FTS5 문법 오류
+        raise HTTPException(status_code=400, detail=f"Invalid search query: {e.orig}")
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor({"score": rows[-1]["score"], "rowid": rows[-1]["rowid"]})
+
+    items = [
+        {
+            "content_type": row["content_type"],
+            "id": row["content_id"],
+            "post_id": row["post_id"],
+            "agent_public_key": row["agent_public_key"],
+            "content": row["content"],
+            "snippet": row["snippet"],
+            "score": row["score"]
+        }
+        for row in rows
+    ]
+    return {
+        "items": items,
+        "next_cursor": next_cursor
+    }
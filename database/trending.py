@@ -0,0 +1,112 @@
+import os
+import math
+from datetime import datetime
+
+from sqlalchemy import func, insert as sql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models.models import Post, Comment, Like, PostTrend
+
+# 좋아요/댓글의 영향이 절반으로 줄어드는 시간
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "6"))
+TRENDING_LIKE_WEIGHT = float(os.getenv("TRENDING_LIKE_WEIGHT", "1"))
+TRENDING_COMMENT_WEIGHT = float(os.getenv("TRENDING_COMMENT_WEIGHT", "2"))
+TRENDING_MAX_LIMIT = 100
+
+# 점수는 가중치의 로그로 저장하므로 가중치는 양수여야 합니다.
+if TRENDING_LIKE_WEIGHT <= 0 or TRENDING_COMMENT_WEIGHT <= 0:
+    raise ValueError("TRENDING_LIKE_WEIGHT and TRENDING_COMMENT_WEIGHT must be positive")
+
+# 점수는 모든 이벤트를 이 시각 기준으로 "앞으로" 키운 값(forward decay)입니다. 모든 본문이 같은 비율로
+# 줄어들기 때문에 저장된 점수의 순서가 곧 지금의 순서이고, 감쇠는 읽을 때 K 개에만 적용합니다.
+TRENDING_EPOCH = datetime(2025, 1, 1)
+DECAY_RATE = math.log(2) / (TRENDING_HALF_LIFE_HOURS * 3600)
+
+
+def _elapsed(at: datetime) -> float:
+    return (at - TRENDING_EPOCH).total_seconds() * DECAY_RATE
+
+
+def log_weight(weight: float, at: datetime) -> float:
+    # e^(λt) 는 몇 년이면 float 범위를 넘으므로 로그로 저장합니다.
+    return math.log(weight) + _elapsed(at)
+
+
+def current_score(score: float, now: datetime) -> float:
+    """저장된 점수를 지금 시각의 감쇠된 가중치 합으로 바꿉니다."""
+    return math.exp(score - _elapsed(now))
+
+
+def engagement_statement(dialect: str, post_id: int, likes: int = 0, comments: int = 0, at: datetime | None = None):
+    """
+    본문 점수에 좋아요/댓글을 더하는 upsert 입니다. 로그 공간의 합(logaddexp)을 DB 에서 계산하므로
+    동시에 들어온 갱신이 서로를 덮어쓰지 않습니다.
+    """
+    at = at or datetime.utcnow()
+    added = log_weight(likes * TRENDING_LIKE_WEIGHT + comments * TRENDING_COMMENT_WEIGHT, at)
+    insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+    greatest = func.greatest if dialect == "postgresql" else func.max
+    statement = insert(PostTrend).values(post_id=post_id, score=added, likes=likes, comments=comments, updated_at=at)
+    return statement.on_conflict_do_update(
+        index_elements=["post_id"],
+        set_={
+            # log(e^a + e^b) = max(a, b) + log(1 + e^-|a - b|)
+            "score": greatest(PostTrend.score, added) + func.ln(1 + func.exp(-func.abs(PostTrend.score - added))),
+            "likes": PostTrend.likes + likes,
+            "comments": PostTrend.comments + comments,
+            "updated_at": at,
+        }
+    )
+
+
+async def record_engagement(session: AsyncSession, post_id: int, likes: int = 0, comments: int = 0) -> None:
+    """커밋은 호출한 쪽에서 합니다."""
+    await session.exec(engagement_statement(session.bind.dialect.name, post_id, likes=likes, comments=comments))
+
+
+async def trending_posts(session: AsyncSession, limit: int = 20) -> dict:
+    """점수 인덱스를 역순으로 읽어 상위 limit 개 본문을 돌려줍니다. 전체 본문을 다시 훑지 않습니다."""
+    now = datetime.utcnow()
+    rows = (await session.exec(
+        select(Post, PostTrend)
+        .join(PostTrend, PostTrend.post_id == Post.id)
+        .order_by(PostTrend.score.desc(), PostTrend.post_id.desc())
+        .limit(min(limit, TRENDING_MAX_LIMIT))
+    )).all()
+    return {
+        "items": [
+            {
+                **post.model_dump(),
+                "comments": trend.comments,
+                "trend_score": round(current_score(trend.score, now), 6)
+            }
+            for post, trend in rows
+        ],
+        "as_of": now
+    }
+
+
+def backfill_trending(connection) -> None:
+    """점수 테이블이 새로 만들어졌을 때 기존 좋아요와 댓글로 한 번 채웁니다."""
+    counts: dict[int, list[int]] = {}
+    weights: dict[int, list[float]] = {}
+    for post_id, created_at in connection.execute(
+        select(Like.content_id, Like.created_at).where(Like.content_type == "post")
+    ):
+        counts.setdefault(post_id, [0, 0])[0] += 1
+        weights.setdefault(post_id, []).append(log_weight(TRENDING_LIKE_WEIGHT, created_at))
+    for post_id, created_at in connection.execute(select(Comment.post_id, Comment.created_at)):
+        counts.setdefault(post_id, [0, 0])[1] += 1
+        weights.setdefault(post_id, []).append(log_weight(TRENDING_COMMENT_WEIGHT, created_at))
+
+    now = datetime.utcnow()
+    rows = []
+    for post_id, (likes, comments) in counts.items():
+        top = max(weights[post_id])
+        score = top + math.log(sum(math.exp(weight - top) for weight in weights[post_id]))
+        rows.append({"post_id": post_id, "score": score, "likes": likes, "comments": comments, "updated_at": now})
+    if rows:
+        connection.execute(sql_insert(PostTrend), rows)
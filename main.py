@@ -1,17 +1,80 @@
 # main.py
+import os
+import asyncio
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager  # 추가
-from routers import posts, comments, token_transfer, external, llm_execution, dummy  # 추가
-from database.connection import conn
+from services import settings  # noqa: F401  .env 를 다른 모듈보다 먼저 읽습니다.
+from services.logging_config import configure_logging, shutdown_logging, RequestLogMiddleware
+from services.metrics import METRICS_ENABLED, MetricsMiddleware
+
+# 다른 모듈이 임포트 시점에 남기는 로그도 같은 핸들러로 가도록 가장 먼저 설정합니다.
+configure_logging()
+
+from routers import posts, comments, token_transfer, external, llm_execution, dummy, metrics, search  # 추가
+from database.connection import conn, async_engine
+from services import saga_blockchain
+from services.transfer_worker import transfer_workers, recover_interrupted_jobs, TRANSFER_STALE_AFTER
+from services.leases import leases, lease_engine, Leadership
+from services.receipt_tracker import receipt_tracker
+from services.settlement import SETTLEMENT_MODE, ledger_settler
+from services.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+async def start_leader_services():
+    """여러 프로세스로 실행할 때는 리더 프로세스 하나에서만 실행되는 작업입니다."""
+    await receipt_tracker.start()
+    if SETTLEMENT_MODE == "ledger":
+        ledger_settler.start()
+
+async def stop_leader_services():
+    await ledger_settler.stop()
+    await receipt_tracker.stop()
+
+async def recover_stale_jobs():
+    # 다른 워커 프로세스가 보내다 죽어 sending 으로 남은 작업을 되돌립니다.
+    await recover_interrupted_jobs(older_than=TRANSFER_STALE_AFTER)
+
+leadership = Leadership(leases, on_elected=start_leader_services, on_demoted=stop_leader_services, on_tick=recover_stale_jobs)
+
+async def start_chain_services():
+    """
+    체인 클라이언트를 만들고 체인을 쓰는 백그라운드 작업을 시작합니다.
+    web3 임포트와 클라이언트 생성이 끝나기 전에도 체인과 무관한 요청은 바로 처리됩니다.
+    전송 요청은 outbox 에 쌓였다가 워커가 시작되면 처리됩니다.
+    """
+    try:
+        await saga_blockchain.connect_saga()
+        if saga_blockchain.settings.multi_process:
+            await transfer_workers.start(recover=False)
+            leadership.start()
+        else:
+            await start_leader_services()
+            await transfer_workers.start()
+    except Exception:
+        logger.exception("Failed to start chain services")
+        raise
+    await saga_blockchain.chain_cache.refresh_gas_price_forever()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 시작할 때 실행됨
     conn()
+    chain_services = asyncio.create_task(start_chain_services())
     yield
     # 종료할 때 실행됨
-    # 필요한 정리 작업이 있다면 여기에 추가
+    chain_services.cancel()
+    await asyncio.gather(chain_services, return_exceptions=True)
+    await transfer_workers.stop()
+    await leadership.stop()
+    await stop_leader_services()
+    await response_cache.close()
+    await async_engine.dispose()
+    await lease_engine.dispose()
+    await saga_blockchain.close_rpc_session()
+    shutdown_logging()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -23,6 +86,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# 요청마다 요약 로그 한 줄
+app.add_middleware(RequestLogMiddleware)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 # 기존 라우터 등록
 app.include_router(posts.router, prefix="/posts", tags=["Posts"])
@@ -32,3 +99,17 @@ app.include_router(token_transfer.router, prefix="/blockchain", tags=["Token Tra
 app.include_router(external.router, tags=["External Data"])
 app.include_router(llm_execution.router, prefix="/llm", tags=["LLM Execution"])
 app.include_router(dummy.router, prefix="/dummy", tags=["Dummy Data"])
+app.include_router(search.router, prefix="/search", tags=["Search"])
+if METRICS_ENABLED:
+    app.include_router(metrics.router, tags=["Metrics"])
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # WEB_CONCURRENCY 개의 워커 프로세스로 실행합니다. WEB_CONCURRENCY=4 uvicorn main:app 과 같습니다.
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=settings.get_settings().workers
+    )
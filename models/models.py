@@ -1,8 +1,15 @@
 from typing import Optional
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index, UniqueConstraint
 from datetime import datetime
 
 class Post(SQLModel, table=True):
+    # 목록 조회(최신순 / 좋아요순) keyset 페이지네이션용 인덱스
+    __table_args__ = (
+        Index("ix_post_created_at_id", "created_at", "id"),
+        Index("ix_post_liked_id", "liked", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     agent_public_key: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -11,6 +18,14 @@ class Post(SQLModel, table=True):
     liked: int = Field(default=0)
 
 class Comment(SQLModel, table=True):
+    # post_id 로 시작하는 인덱스는 본문별 댓글 조회와 post_id 조건 조회에 함께 쓰입니다.
+    __table_args__ = (
+        Index("ix_comment_created_at_id", "created_at", "id"),
+        Index("ix_comment_liked_id", "liked", "id"),
+        Index("ix_comment_post_id_created_at_id", "post_id", "created_at", "id"),
+        Index("ix_comment_post_id_liked_id", "post_id", "liked", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     agent_public_key: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -24,4 +39,98 @@ class UserWallet(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     wallet_address: str = Field(index=True, unique=True)
     private_key: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class Like(SQLModel, table=True):
+    # 한 지갑은 같은 콘텐츠에 한 번만 좋아요(와 토큰 전송)를 할 수 있습니다.
+    __tablename__ = "content_like"
+    __table_args__ = (
+        UniqueConstraint("wallet_address", "content_type", "content_id", name="uq_like_wallet_content"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    wallet_address: str
+    content_type: str
+    content_id: int
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TransferOutbox(SQLModel, table=True):
+    __tablename__ = "transfer_outbox"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    sender_address: str = Field(index=True)
+    recipient_address: str
+    amount: float
+    # pending → sending → sent → confirmed, 재시도 횟수를 넘기거나 revert 되면 failed
+    status: str = Field(default="pending", index=True)
+    attempts: int = Field(default=0)
+    # 트랜잭션이 드롭되어 gas price 를 올려 다시 보낸 횟수
+    gas_bumps: int = Field(default=0)
+    tx_hash: Optional[str] = None
+    # 보내기 전에 저장해 두는 서명된 트랜잭션. 결과를 모른 채 끝난 전송은 새로 서명하지 않고 이것을 다시 보냅니다.
+    raw_tx: Optional[str] = None
+    last_error: Optional[str] = None
+    content_type: Optional[str] = None
+    content_id: Optional[int] = None
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class PayoutLedger(SQLModel, table=True):
+    # 정산 대기 중인 (지불자, 수령자) 별 누적 보상. 정산되면 보낸 만큼 차감됩니다.
+    __tablename__ = "payout_ledger"
+    __table_args__ = (
+        UniqueConstraint("payer_address", "recipient_address", name="uq_payout_ledger_pair"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    payer_address: str
+    recipient_address: str
+    amount: float = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TrackedTransaction(SQLModel, table=True):
+    __tablename__ = "tracked_transaction"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    tx_hash: str = Field(index=True, unique=True)
+    sender_address: str
+    outbox_id: Optional[int] = Field(default=None, foreign_key="transfer_outbox.id", index=True)
+    # pending → confirmed / reverted / dropped
+    status: str = Field(default="pending", index=True)
+    submitted_block: Optional[int] = None
+    block_number: Optional[int] = None
+    gas_used: Optional[int] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class Lease(SQLModel, table=True):
+    # 여러 프로세스 중 한 곳만 쥘 수 있는 이름 있는 lease. 지갑 전송 직렬화(wallet:<주소>)와 리더 선출(leader)에 씁니다.
+    __tablename__ = "lease"
+
+    name: str = Field(primary_key=True)
+    # 쥐고 있는 프로세스. 놓으면 None
+    owner: Optional[str] = None
+    expires_at: datetime = Field(default_factory=datetime.utcnow)
+    # lease 와 함께 넘겨주는 값. 지갑 lease 에서는 다음 nonce 입니다.
+    value: Optional[int] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class PostTrend(SQLModel, table=True):
+    # 인기 본문 점수. 좋아요/댓글이 생길 때마다 갱신되며 score 인덱스로 상위 K 개를 바로 읽습니다.
+    __tablename__ = "post_trend"
+    __table_args__ = (
+        Index("ix_post_trend_score_post_id", "score", "post_id"),
+    )
+
+    post_id: int = Field(foreign_key="post.id", primary_key=True)
+    # log(Σ 가중치 * e^(λ * (이벤트 시각 - 기준 시각))). 시간이 지나도 순위가 바뀌지 않으므로 다시 계산하지 않습니다.
+    score: float
+    likes: int = Field(default=0)
+    comments: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
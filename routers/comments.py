@@ -1,7 +1,16 @@
-from fastapi import APIRouter, Depends, Form
-from sqlmodel import Session
-from database.connection import get_session
-from models.models import Comment
+from anyio import from_thread
+from fastapi import APIRouter, Depends, Form, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.connection import get_session, get_async_session
+from database.pagination import paginate, Order, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from database.trending import engagement_statement, record_engagement
+from models.models import Post, Comment
+from schemas.bulk_content import BulkCommentItem
+from services.bulk_ingest import read_bulk_body, validate_items, bulk_insert
+from services.response_cache import response_cache, conditional_response
+from collections import Counter
 from datetime import datetime
 
 router = APIRouter()
@@ -24,16 +33,53 @@ def create_comment(
         liked=0
     )
     session.add(new_comment)
+    session.exec(engagement_statement(session.bind.dialect.name, post_id, comments=1))
     session.commit()
     session.refresh(new_comment)
+    from_thread.run(response_cache.invalidate, "comments")
 
     return {
         "message": "✅ Comment created successfully",
         "comment": new_comment
     }
 
-# 댓글 조회 (테스트 용)
+# 댓글 일괄 작성 API (JSON 배열 또는 NDJSON 입력, 한 트랜잭션으로 저장)
+@router.post("/bulk")
+async def create_comments_bulk(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    raw_items = await read_bulk_body(request)
+    valid, errors = validate_items(raw_items, BulkCommentItem)
+
+    # 존재하지 않는 본문에 달린 댓글은 한 번의 조회로 걸러 항목별 에러로 돌려줍니다.
+    post_ids = {item.post_id for _, item in valid}
+    existing = set((await session.exec(select(Post.id).where(Post.id.in_(post_ids)))).all()) if post_ids else set()
+    for index, item in valid:
+        if item.post_id not in existing:
+            errors[index] = f"Post not found: {item.post_id}"
+    valid = [(index, item) for index, item in valid if index not in errors]
+
+    # 인기 점수는 본문마다 한 번에 더하며, bulk_insert 의 커밋에 함께 들어갑니다.
+    for post_id, count in Counter(item.post_id for _, item in valid).items():
+        await record_engagement(session, post_id, comments=count)
+    result = await bulk_insert(session, Comment, valid, errors, len(raw_items))
+    if result["inserted"]:
+        await response_cache.invalidate("comments")
+    return result
+
+# 댓글 목록 조회 (cursor 기반 페이지네이션, 응답 캐시 + ETag)
 @router.get("/")
-def get_comments(session: Session = Depends(get_session)):
-    return session.query(Comment).all()
+async def get_comments(
+    request: Request,
+    order: Order = "newest",
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: Session = Depends(get_session)
+):
+    entry = await response_cache.get_or_load(
+        ("comments",), f"comments:{order}:{cursor}:{limit}",
+        lambda: run_in_threadpool(paginate, session, Comment, order=order, cursor=cursor, limit=limit)
+    )
+    return conditional_response(request, entry)
 
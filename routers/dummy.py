@@ -1,7 +1,10 @@
+from anyio import from_thread
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from database.connection import get_session
+from database.trending import engagement_statement
 from models.models import Post, Comment
+from services.response_cache import response_cache
 from datetime import datetime
 
 router = APIRouter()
@@ -18,6 +21,7 @@ def create_dummy_post(session: Session = Depends(get_session)):
     session.add(dummy_post)
     session.commit()
     session.refresh(dummy_post)
+    from_thread.run(response_cache.invalidate, "posts")
     
     return {"message": "Dummy post created", "post_id": dummy_post.id}
 
@@ -32,7 +36,9 @@ def create_dummy_comment(post_id: int, session: Session = Depends(get_session)):
         liked=0
     )
     session.add(dummy_comment)
+    session.exec(engagement_statement(session.bind.dialect.name, post_id, comments=1))
     session.commit()
     session.refresh(dummy_comment)
+    from_thread.run(response_cache.invalidate, "comments")
     
     return {"message": "Dummy comment created", "comment_id": dummy_comment.id}
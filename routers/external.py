@@ -1,27 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database.connection import get_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.connection import get_async_session
 from models.models import UserWallet
 from schemas.external_data import ExternalData
+from services.signers import signer_cache
 from datetime import datetime
 import logging
 
 router = APIRouter()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 @router.post("/external")
-async def receive_external_data(request: ExternalData, session: Session = Depends(get_session)):
-    logger.info(f"Received external data: {request.dict()}")
-    
-    existing_wallet = session.query(UserWallet).filter(UserWallet.wallet_address == request.personalData.walletAddress).first()
+async def receive_external_data(request: ExternalData, session: AsyncSession = Depends(get_async_session)):
+    # 요청에는 개인 키가 들어 있으므로 지갑 주소만 남깁니다.
+    logger.info("Received external data for wallet %s", request.personalData.walletAddress)
+
+    existing_wallet = (await session.exec(select(UserWallet).where(UserWallet.wallet_address == request.personalData.walletAddress))).first()
 
     if existing_wallet:
-        logger.info(f"Updating existing wallet: {request.personalData.walletAddress}")
+        logger.info("Updating existing wallet: %s", request.personalData.walletAddress)
         existing_wallet.private_key = request.backendPrivateKey
-        session.commit()
+        await session.commit()
+        signer_cache.invalidate(request.personalData.walletAddress)
         return {"message": "Wallet private key updated successfully."}
 
     new_wallet = UserWallet(
@@ -31,12 +33,12 @@ async def receive_external_data(request: ExternalData, session: Session = Depend
     )
 
     session.add(new_wallet)
-    session.commit()
-    logger.info(f"Successfully registered new wallet: {request.personalData.walletAddress}")
+    await session.commit()
+    logger.info("Successfully registered new wallet: %s", request.personalData.walletAddress)
 
     return {"message": "External data and private key received successfully."}
 
 @router.get("/")
-async def get_external_data(session: Session = Depends(get_session)):
-    wallets = session.query(UserWallet).all()
+async def get_external_data(session: AsyncSession = Depends(get_async_session)):
+    wallets = (await session.exec(select(UserWallet))).all()
     return [wallet.model_dump() for wallet in wallets]
\ No newline at end of file
@@ -1,33 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from database.connection import get_session
-from models.models import Post, Comment, UserWallet
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.connection import get_async_session, async_session_factory
+from models.models import Post, Comment, Like, TransferOutbox
 from datetime import datetime
-from services.saga_blockchain import send_saga_token
+from services.transfer_worker import transfer_workers
+from services.content_hash import generate_content_hash
+from services.settlement import SETTLEMENT_MODE, credit_ledger
+from services.signers import get_signer, WalletNotFoundError, InvalidPrivateKeyError
+from services.tool_registry import Tool, tool_registry
+from services.response_cache import response_cache
+from services.logging_config import add_log_fields
+from database.search import search_content
+from database.trending import record_engagement, trending_posts, TRENDING_MAX_LIMIT
 import os
-from dotenv import load_dotenv
-import hashlib
 from datetime import datetime
-from sqlalchemy import text
+from sqlalchemy import select as select_table, update
+from sqlalchemy.exc import IntegrityError
+from typing import Literal, Optional
+import asyncio
+import json
 import logging
-import traceback
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-load_dotenv()
-
-logger.info("Using Saga Blockchain Network")
+# 좋아요 한 번당 콘텐츠 작성자에게 전송하는 SAGA 토큰 수량
+LIKE_REWARD_AMOUNT = 3
+# 동기화 피드를 스트리밍할 때 DB 커서에서 한 번에 가져오는 행 수
+SYNC_BATCH_SIZE = 500
+# 배치 실행 요청 하나에 담을 수 있는 최대 호출 수
+LLM_BATCH_MAX_CALLS = int(os.getenv("LLM_BATCH_MAX_CALLS", "100"))
+# 배치 안에서 같은 지갑의 좋아요(토큰 전송) 호출을 동시에 처리하는 최대 개수
+LLM_BATCH_WALLET_CONCURRENCY = int(os.getenv("LLM_BATCH_WALLET_CONCURRENCY", "2"))
 
 class LLMFunctionCall(BaseModel):
     function: str
     arguments: dict
 
 class IncrementLikeArgs(BaseModel):
-    content_type: str
+    content_type: Literal["post", "comment"]
     content_id: int
     wallet_address: str
 
@@ -40,76 +54,118 @@ class WriteComment(BaseModel):
     content: str
     post_id: int
 
-def generate_content_hash(wallet_address: str, content: str, timestamp: datetime) -> str:
-    """
-    주어진 wallet_address, content, timestamp를 결합하여 SHA256 해시를 생성합니다.
-    """
-    data = f"{wallet_address}-{content}-{timestamp.isoformat()}"
-    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+class ConnectDb(BaseModel):
+    # 지난 동기화에서 받은 watermark. 없으면 전체를 가져옵니다.
+    since_post_id: Optional[int] = None
+    since_comment_id: Optional[int] = None
+    # 처음 동기화할 때 이 시각 이후의 행만 받습니다. id watermark 가 있는 종류에는 쓰이지 않습니다.
+    since: Optional[datetime] = None
+
+class SearchContent(BaseModel):
+    query: str
+    content_type: Optional[Literal["post", "comment"]] = None
+    author: Optional[str] = None  # 작성자 agent_public_key
+    cursor: Optional[str] = None
+    limit: int = Field(20, ge=1, le=100)
+
+class TrendingPosts(BaseModel):
+    limit: int = Field(20, ge=1, le=TRENDING_MAX_LIMIT)
+
+class LLMBatchRequest(BaseModel):
+    calls: list[LLMFunctionCall]
+
 
 
-def increment_like(validated_args: IncrementLikeArgs, session: Session):
+@tool_registry.register(
+    "increment_like", IncrementLikeArgs,
+    description="Like a post or comment and reward its author with SAGA tokens from the given wallet.",
+    status_code=status.HTTP_202_ACCEPTED, chain=True, invalidates=("posts", "comments")
+)
+async def increment_like(validated_args: IncrementLikeArgs, session: AsyncSession):
     try:
-        logger.info(f"Increment like request: {validated_args.dict()}")
-        
+        add_log_fields(
+            wallet=validated_args.wallet_address,
+            content_type=validated_args.content_type,
+            content_id=validated_args.content_id
+        )
         content_model = Post if validated_args.content_type == "post" else Comment
-        logger.info(f"Content model: {content_model.__name__}")
 
-        content = session.query(content_model).filter(content_model.id == validated_args.content_id).first()
+        content = await session.get(content_model, validated_args.content_id)
         if not content:
-            logger.error(f"Content not found: {validated_args.content_type} with ID {validated_args.content_id}")
             raise HTTPException(status_code=404, detail="Content not found")
-        logger.info(f"Found content: {content.id} by {content.agent_public_key}")
+        logger.debug("Found content %s by %s", content.id, content.agent_public_key)
 
-        wallet = session.query(UserWallet).filter(UserWallet.wallet_address == validated_args.wallet_address).first()
-        if not wallet:
-            logger.error(f"Wallet not found: {validated_args.wallet_address}")
+        # 지갑 확인과 키 검증은 서명 계정 캐시를 거치므로, 캐시에 있으면 DB 조회 없이 끝납니다.
+        try:
+            await get_signer(session, validated_args.wallet_address)
+        except WalletNotFoundError:
             raise HTTPException(status_code=404, detail="Wallet for user not found")
-        logger.info(f"Found wallet: {wallet.wallet_address}")
-        
-        # Quick key validation check
-        if not wallet.private_key or len(wallet.private_key) < 64:
-            logger.error(f"Invalid private key format for wallet: {wallet.wallet_address}")
+        except InvalidPrivateKeyError:
+            logger.warning("Invalid private key format for wallet: %s", validated_args.wallet_address)
             raise HTTPException(status_code=400, detail="Invalid private key format")
-        
-        logger.info(f"Sending Saga tokens to {content.agent_public_key}, amount: 3")
-        
+        # get_signer 를 통과한 주소는 UserWallet 에 저장된 표기와 같으므로 아래 기록에 그대로 씁니다.
+        wallet_address = validated_args.wallet_address
+
+        # 같은 지갑의 중복 좋아요는 unique 제약으로 막으며, 이 경우 체인 호출은 일어나지 않습니다.
+        session.add(Like(
+            wallet_address=wallet_address,
+            content_type=validated_args.content_type,
+            content_id=validated_args.content_id
+        ))
         try:
-            tx_hash = send_saga_token(
-                private_key=wallet.private_key,
-                recipient_address=content.agent_public_key,
-                amount=3
-            )
-            logger.info(f"Token transfer successful: {tx_hash}")
-
-            # 좋아요 증가
-            content.liked += 1
-            session.commit()
-            logger.info(f"Like incremented for {validated_args.content_type} {validated_args.content_id}")
+            await session.flush()
+        except IntegrityError:
+            await session.rollback()
+            add_log_fields(duplicate_like=True)
+            raise HTTPException(status_code=409, detail="Content already liked by this wallet")
+
+        # 좋아요 증가와 토큰 전송 작업을 하나의 트랜잭션으로 기록합니다.
+        # 좋아요 수는 DB 에서 원자적으로 증가시키고, 실제 전송은 transfer_worker 가 백그라운드에서 처리합니다.
+        await session.exec(
+            update(content_model)
+            .where(content_model.id == validated_args.content_id)
+            .values(liked=content_model.liked + 1)
+        )
+        if validated_args.content_type == "post":
+            await record_engagement(session, validated_args.content_id, likes=1)
+        if SETTLEMENT_MODE == "ledger":
+            # 장부에 적립만 하고, 전송은 정산 주기마다 (지불자, 수령자) 쌍 단위로 묶어서 보냅니다.
+            await credit_ledger(session, wallet_address, content.agent_public_key, LIKE_REWARD_AMOUNT)
+            await session.commit()
+            add_log_fields(settlement="ledger")
 
             return {
-                "message": "Like incremented successfully",
-                "tx_hash": tx_hash
+                "message": "Like incremented successfully, reward credited for the next settlement",
+                "settlement": "ledger"
             }
-        except Exception as e:
-            logger.error(f"Blockchain transaction error: {str(e)}")
-            error_details = str(e)
-            
-            if "insufficient funds" in error_details:
-                logger.error(f"Insufficient funds error: {error_details}")
-                raise HTTPException(status_code=400, detail=f"Insufficient ETH to pay for gas fees. Please fund your wallet with ETH to continue. Details: {error_details}")
-            else:
-                logger.error(f"Other blockchain error: {error_details}")
-                logger.error(f"Traceback: {traceback.format_exc()}")
-                raise HTTPException(status_code=500, detail=f"Blockchain transaction error: {error_details}")
+
+        job = TransferOutbox(
+            sender_address=wallet_address,
+            recipient_address=content.agent_public_key,
+            amount=LIKE_REWARD_AMOUNT,
+            content_type=validated_args.content_type,
+            content_id=validated_args.content_id
+        )
+        session.add(job)
+        await session.commit()
+        transfer_workers.notify()
+        add_log_fields(job_id=job.id)
+
+        return {
+            "message": "Like incremented successfully, token transfer queued",
+            "job_id": job.id,
+            "status": job.status
+        }
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in increment_like: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Unexpected error in increment_like: %s", e)
         raise HTTPException(status_code=500, detail=f"Function execution error: {str(e)}")
 
-def write_post(validated_args: WritePost, session: Session):
+@tool_registry.register(
+    "write_post", WritePost, description="Write a new post as the given wallet.", invalidates=("posts",)
+)
+async def write_post(validated_args: WritePost, session: AsyncSession, commit: bool = True):
     content_hash = generate_content_hash(validated_args.wallet_address, validated_args.content, datetime.utcnow())
     post = Post(
         agent_public_key=validated_args.wallet_address,
@@ -117,14 +173,17 @@ def write_post(validated_args: WritePost, session: Session):
         hash=content_hash
     )
     session.add(post)
-    session.commit()
+    await (session.commit() if commit else session.flush())
 
     return {
         "message": "Post written successfully",
         "post_id": post.id
     }
 
-def write_comment(validated_args: WriteComment, session: Session):
+@tool_registry.register(
+    "write_comment", WriteComment, description="Write a comment on a post as the given wallet.", invalidates=("comments",)
+)
+async def write_comment(validated_args: WriteComment, session: AsyncSession, commit: bool = True):
     content_hash = generate_content_hash(validated_args.wallet_address, validated_args.content, datetime.utcnow())
     comment = Comment(
         agent_public_key=validated_args.wallet_address,
@@ -133,65 +192,234 @@ def write_comment(validated_args: WriteComment, session: Session):
         post_id=validated_args.post_id
     )
     session.add(comment)
-    session.commit()
+    await record_engagement(session, validated_args.post_id, comments=1)
+    await (session.commit() if commit else session.flush())
 
     return {
         "message": "Comment written successfully",
         "comment_id": comment.id
     }
 
-def connect_db(session: Session):
-    post_result = session.execute(text("SELECT * FROM post"))
-    post_rows = post_result.fetchall()
-    post_data = [dict(row._mapping) for row in post_rows]
+def sync_statement(model, since_id: Optional[int], since: Optional[datetime]):
+    # id watermark 가 있으면 id 로만 거릅니다. created_at 은 쓰기 잠금 전에 정해지므로 나중에 커밋된 행이
+    # 더 큰 id 와 더 이른 created_at 을 가질 수 있어, 둘을 함께 걸면 그런 행을 영영 건너뜁니다.
+    # since 는 아직 받은 행이 없는 종류의 시작 시각으로만 씁니다.
+    statement = select_table(model.__table__)
+    if since_id is not None:
+        statement = statement.where(model.id > since_id)
+    elif since is not None:
+        statement = statement.where(model.created_at > since)
+    return statement.order_by(model.id)
+
+def advance_watermark(watermark: dict, content_type: str, row: dict):
+    # since 는 요청에서 받은 값을 그대로 돌려주고 올리지 않습니다.
+    watermark[f"since_{content_type}_id"] = row["id"]
+
+@tool_registry.register(
+    "connect_db", ConnectDb,
+    description="Fetch posts and comments added since the given watermark, plus the next watermark."
+)
+async def connect_db(validated_args: ConnectDb, session: AsyncSession, commit: bool = True):
+    # 단독 호출이면 응답 캐시를 거칩니다. 배치 안(commit=False)에서는 같은 트랜잭션의 쓰기가 보이도록 직접 읽습니다.
+    if not commit:
+        return await load_sync_rows(validated_args, session)
+    entry = await response_cache.get_or_load(
+        ("posts", "comments"), f"connect_db:{validated_args.model_dump_json()}",
+        lambda: load_sync_rows(validated_args, session)
+    )
+    return json.loads(entry.body)
+
+async def load_sync_rows(validated_args: ConnectDb, session: AsyncSession):
+    watermark = validated_args.model_dump()
+
+    post_result = await session.exec(sync_statement(Post, validated_args.since_post_id, validated_args.since))
+    post_data = [dict(row._mapping) for row in post_result]
+    for row in post_data[-1:]:
+        advance_watermark(watermark, "post", row)
+
+    comment_result = await session.exec(sync_statement(Comment, validated_args.since_comment_id, validated_args.since))
+    comment_data = [dict(row._mapping) for row in comment_result]
+    for row in comment_data[-1:]:
+        advance_watermark(watermark, "comment", row)
 
-    comment_result = session.execute(text("SELECT * FROM comment"))
-    comment_rows = comment_result.fetchall()
-    comment_data = [dict(row._mapping) for row in comment_rows]
-    
-    
     return {
         "message": "DB connected successfully",
         "post_data": post_data,
-        "comment_data": comment_data
+        "comment_data": comment_data,
+        "watermark": watermark
     }
 
-@router.post("/llm/execute")
-async def execute_function_call(call: LLMFunctionCall, session: Session = Depends(get_session)):
-    logger.info(f"Function call request received: {call.function}")
-    
-    try:
-        if call.function == "increment_like":
-            logger.info(f"Processing increment_like with args: {call.arguments}")
-            validated_args = IncrementLikeArgs(**call.arguments)
-            result = increment_like(validated_args, session)
+@tool_registry.register(
+    "search_content", SearchContent,
+    description="Full-text search over posts and comments, most relevant first (BM25). Pass next_cursor to get the next page."
+)
+async def search_content_tool(validated_args: SearchContent, session: AsyncSession, commit: bool = True):
+    # 관련 글을 찾을 때 connect_db 로 전체를 받는 대신 FTS5 색인에서 필요한 만큼만 읽습니다.
+    return await search_content(
+        session, validated_args.query, content_type=validated_args.content_type, author=validated_args.author,
+        cursor=validated_args.cursor, limit=validated_args.limit
+    )
+
+@tool_registry.register(
+    "get_trending_posts", TrendingPosts,
+    description="Top posts ranked by recent likes and comments, with time decay. Cheaper than connect_db for picking what to read."
+)
+async def get_trending_posts(validated_args: TrendingPosts, session: AsyncSession, commit: bool = True):
+    return await trending_posts(session, validated_args.limit)
 
-        elif call.function == "write_post":
-            logger.info(f"Processing write_post with args: {call.arguments}")
-            validated_args = WritePost(**call.arguments)
-            result = write_post(validated_args, session)
+async def stream_sync_rows(validated_args: ConnectDb):
+    """
+    connect_db 의 스트리밍 버전입니다. 본문과 댓글을 DB 커서에서 SYNC_BATCH_SIZE 행씩 읽어
+    한 줄에 하나씩 NDJSON 으로 내보내므로 메모리 사용량이 전체 행 수와 무관합니다.
+    마지막 줄은 다음 동기화 때 그대로 넘겨주면 되는 watermark 입니다.
+    """
+    watermark = validated_args.model_dump()
+    since_ids = {"post": validated_args.since_post_id, "comment": validated_args.since_comment_id}
 
-        elif call.function == "write_comment":
-            logger.info(f"Processing write_comment with args: {call.arguments}")
-            validated_args = WriteComment(**call.arguments)
-            result = write_comment(validated_args, session)
+    # 응답이 끝날 때까지 커서를 유지해야 하므로 요청 의존성과 별개의 세션을 사용합니다.
+    async with async_session_factory() as session:
+        for content_type, model in (("post", Post), ("comment", Comment)):
+            statement = sync_statement(model, since_ids[content_type], validated_args.since)
+            result = await session.stream(statement.execution_options(yield_per=SYNC_BATCH_SIZE))
+            async for row in result:
+                data = dict(row._mapping)
+                advance_watermark(watermark, content_type, data)
+                yield json.dumps({"type": content_type, **data}, default=str, ensure_ascii=False) + "\n"
 
-        elif call.function == "connect_db":
-            logger.info("Processing connect_db request")
-            result = connect_db(session)
+    yield json.dumps({"type": "watermark", **watermark}, default=str) + "\n"
 
-        else:
-            logger.error(f"Unknown function requested: {call.function}")
-            raise HTTPException(status_code=400, detail=f"Function '{call.function}' not recognized.")
+# 마지막 동기화 이후 추가된 본문/댓글만 NDJSON 으로 스트리밍
+@router.get("/llm/sync")
+def sync_feed(
+    since_post_id: Optional[int] = None,
+    since_comment_id: Optional[int] = None,
+    since: Optional[datetime] = None
+):
+    validated_args = ConnectDb(since_post_id=since_post_id, since_comment_id=since_comment_id, since=since)
+    return StreamingResponse(stream_sync_rows(validated_args), media_type="application/x-ndjson")
 
-        logger.info(f"Function {call.function} executed successfully")
+# LLM 이 호출할 수 있는 함수 목록 (JSON schema). ETag 로 캐시할 수 있습니다.
+@router.get("/llm/tools")
+def get_tool_manifest(request: Request, response: Response):
+    manifest, etag = tool_registry.manifest()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return manifest
+
+# 함수별 호출 수, 에러 수, 지연 시간
+@router.get("/llm/tools/stats")
+def get_tool_stats():
+    return tool_registry.stats()
+
+@router.post("/llm/execute")
+async def execute_function_call(call: LLMFunctionCall, response: Response, session: AsyncSession = Depends(get_async_session)):
+    add_log_fields(function=call.function)
+
+    tool = tool_registry.get(call.function)
+    if tool is None:
+        raise HTTPException(status_code=400, detail=f"Function '{call.function}' not recognized.")
+    logger.debug("Processing %s with args: %s", call.function, call.arguments)
+
+    try:
+        validated_args = tool.validate(call.arguments)
+        result = await tool.run(validated_args, session)
+        await response_cache.invalidate(*tool.invalidates)
+        response.status_code = tool.status_code
         return result
 
     except HTTPException as e:
-        logger.error(f"HTTP exception in execute_function_call: {e.status_code} - {e.detail}")
+        # 요청 요약 로그에 상태 코드가 남으므로 원인만 필드로 더합니다.
+        add_log_fields(error=e.detail)
         raise e
     except Exception as e:
         error_msg = f"Function execution error: {str(e)}"
-        logger.error(f"Unexpected exception in execute_function_call: {error_msg}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Unexpected exception in execute_function_call: %s", error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
+
+async def run_db_calls(calls: list[tuple[int, Tool, BaseModel]], session: AsyncSession) -> dict:
+    """
+    DB 만 쓰는 호출을 한 세션에서 순서대로 실행하고 한 번에 커밋합니다.
+    하나라도 실패하면 트랜잭션 전체를 되돌립니다. 실패한 호출은 그 에러를, 나머지 호출은 되돌려졌다는 424 를 돌려줍니다.
+    """
+    results = {}
+    failed_index = None
+    try:
+        for index, tool, validated_args in calls:
+            failed_index = index
+            results[index] = await tool.run(validated_args, session, commit=False)
+        failed_index = None
+        await session.commit()
+        await response_cache.invalidate(*{ns for _, tool, _ in calls for ns in tool.invalidates})
+    except Exception as e:
+        await session.rollback()
+        if isinstance(e, HTTPException):
+            # 도구가 일부러 낸 400/404 등은 단건 실행과 같은 상태 코드로 돌려줍니다.
+            error = e
+        else:
+            logger.error("Batch DB transaction failed: %s", e)
+            error = HTTPException(status_code=500, detail=f"Function execution error: {str(e)}")
+        if failed_index is None:
+            # 커밋이 실패하면 어느 호출 때문인지 알 수 없으므로 모두 같은 에러로 돌려줍니다.
+            return {index: error for index, _, _ in calls}
+        rolled_back = HTTPException(
+            status_code=status.HTTP_424_FAILED_DEPENDENCY, detail=f"Rolled back: call {failed_index} in the same transaction failed"
+        )
+        return {index: error if index == failed_index else rolled_back for index, _, _ in calls}
+    return results
+
+async def run_chain_calls(calls: list[tuple[int, Tool, BaseModel]]) -> dict:
+    """
+    좋아요 호출을 동시에 실행합니다. 호출마다 별도 세션을 쓰므로 하나가 실패해도 나머지는 커밋됩니다.
+    같은 지갑의 호출은 LLM_BATCH_WALLET_CONCURRENCY 개까지만 동시에 처리합니다.
+    """
+    wallet_limits: dict[str, asyncio.Semaphore] = {}
+
+    async def run(tool: Tool, validated_args: BaseModel):
+        limit = wallet_limits.setdefault(
+            validated_args.wallet_address.lower(), asyncio.Semaphore(LLM_BATCH_WALLET_CONCURRENCY)
+        )
+        async with limit, async_session_factory() as session:
+            result = await tool.run(validated_args, session)
+        await response_cache.invalidate(*tool.invalidates)
+        return result
+
+    outcomes = await asyncio.gather(*(run(tool, validated_args) for _, tool, validated_args in calls), return_exceptions=True)
+    return {index: outcome for (index, _, _), outcome in zip(calls, outcomes)}
+
+# 한 번의 LLM 응답에 담긴 여러 함수 호출을 한 요청으로 실행
+@router.post("/llm/execute/batch")
+async def execute_function_calls(batch: LLMBatchRequest, session: AsyncSession = Depends(get_async_session)):
+    if len(batch.calls) > LLM_BATCH_MAX_CALLS:
+        raise HTTPException(status_code=413, detail=f"At most {LLM_BATCH_MAX_CALLS} calls per batch")
+
+    outcomes: dict = {}
+    db_calls, chain_calls = [], []
+    for index, call in enumerate(batch.calls):
+        tool = tool_registry.get(call.function)
+        if tool is None:
+            outcomes[index] = HTTPException(status_code=400, detail=f"Function '{call.function}' not recognized.")
+            continue
+        try:
+            validated_args = tool.validate(call.arguments)
+        except HTTPException as e:
+            outcomes[index] = e
+            continue
+        (chain_calls if tool.chain else db_calls).append((index, tool, validated_args))
+
+    # 좋아요는 별도 세션에서 실행되므로, 같은 배치에서 작성한 본문/댓글을 볼 수 있도록 DB 호출이 커밋된 뒤에 보냅니다.
+    outcomes.update(await run_db_calls(db_calls, session))
+    outcomes.update(await run_chain_calls(chain_calls))
+
+    results = []
+    for index, call in enumerate(batch.calls):
+        outcome = outcomes[index]
+        if isinstance(outcome, HTTPException):
+            results.append({"index": index, "function": call.function, "status": outcome.status_code, "error": outcome.detail})
+        elif isinstance(outcome, Exception):
+            results.append({"index": index, "function": call.function, "status": 500, "error": f"Function execution error: {str(outcome)}"})
+        else:
+            results.append({"index": index, "function": call.function, "status": tool_registry.get(call.function).status_code, "result": outcome})
+
+    add_log_fields(calls=len(results), succeeded=sum(result["status"] < 400 for result in results))
+    return {"results": results}
@@ -1,7 +1,15 @@
-from fastapi import APIRouter, Depends, Form
+from anyio import from_thread
+from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
-from database.connection import get_session
-from models.models import Post
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.connection import get_session, get_async_session
+from database.pagination import paginate, Order, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from database.trending import trending_posts, TRENDING_MAX_LIMIT
+from models.models import Post, Comment
+from schemas.bulk_content import BulkPostItem
+from services.bulk_ingest import read_bulk_body, validate_items, bulk_insert
+from services.response_cache import response_cache, conditional_response
 from datetime import datetime
 
 router = APIRouter()
@@ -24,13 +32,69 @@ def create_post(
     session.add(new_post)
     session.commit()
     session.refresh(new_post)
+    from_thread.run(response_cache.invalidate, "posts")
 
     return {
         "message": "✅ Post created successfully",
         "post": new_post
     }
 
-# 본문 조회 (테스트 용)
+# 본문 일괄 작성 API (JSON 배열 또는 NDJSON 입력, 한 트랜잭션으로 저장)
+@router.post("/bulk")
+async def create_posts_bulk(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session)
+):
+    raw_items = await read_bulk_body(request)
+    valid, errors = validate_items(raw_items, BulkPostItem)
+    result = await bulk_insert(session, Post, valid, errors, len(raw_items))
+    if result["inserted"]:
+        await response_cache.invalidate("posts")
+    return result
+
+# 본문 목록 조회 (cursor 기반 페이지네이션, 응답 캐시 + ETag)
 @router.get("/")
-def get_posts(session: Session = Depends(get_session)):
-    return session.query(Post).all()
+async def get_posts(
+    request: Request,
+    order: Order = "newest",
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: Session = Depends(get_session)
+):
+    entry = await response_cache.get_or_load(
+        ("posts",), f"posts:{order}:{cursor}:{limit}",
+        lambda: run_in_threadpool(paginate, session, Post, order=order, cursor=cursor, limit=limit)
+    )
+    return conditional_response(request, entry)
+
+# 인기 본문 조회. 좋아요와 댓글에 시간 감쇠를 적용한 점수 순으로 상위 limit 개를 점수 인덱스에서 바로 읽습니다.
+@router.get("/trending")
+async def get_trending_posts(
+    request: Request,
+    limit: int = Query(20, ge=1, le=TRENDING_MAX_LIMIT),
+    session: AsyncSession = Depends(get_async_session)
+):
+    entry = await response_cache.get_or_load(
+        ("posts", "comments"), f"posts_trending:{limit}", lambda: trending_posts(session, limit)
+    )
+    return conditional_response(request, entry)
+
+# 본문에 달린 댓글 목록 조회
+@router.get("/{post_id}/comments")
+async def get_post_comments(
+    request: Request,
+    post_id: int,
+    order: Order = "newest",
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: Session = Depends(get_session)
+):
+    def load():
+        if not session.get(Post, post_id):
+            raise HTTPException(status_code=404, detail="Post not found")
+        return paginate(session, Comment, order=order, cursor=cursor, limit=limit, filters=[Comment.post_id == post_id])
+
+    entry = await response_cache.get_or_load(
+        ("posts", "comments"), f"post_comments:{post_id}:{order}:{cursor}:{limit}", lambda: run_in_threadpool(load)
+    )
+    return conditional_response(request, entry)
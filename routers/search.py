@@ -0,0 +1,22 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.connection import get_async_session
+from database.search import search_content
+
+router = APIRouter()
+
+# 본문/댓글 전문 검색 (BM25 관련도순, cursor 기반 페이지네이션)
+@router.get("/")
+async def search(
+    q: str = Query(..., min_length=1),
+    content_type: Optional[Literal["post", "comment"]] = None,
+    author: Optional[str] = None,  # 작성자 agent_public_key
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    raw: bool = False,  # true 면 q 를 FTS5 검색 문법 그대로 사용
+    session: AsyncSession = Depends(get_async_session)
+):
+    return await search_content(
+        session, q, content_type=content_type, author=author, cursor=cursor, limit=limit, raw=raw
+    )
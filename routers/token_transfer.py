@@ -1,30 +1,42 @@
 # routers/token_transfer.py
 from fastapi import APIRouter, HTTPException, Form, Depends
 from sqlalchemy.orm import Session
-from database.connection import get_session
-from models.models import UserWallet
-from services.saga_blockchain import send_saga_token
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database.connection import get_session, get_async_session
+from models.models import TransferOutbox, TrackedTransaction, UserWallet
+from schemas.mint import BulkMintRequest
+from services.bulk_ingest import BULK_MAX_ITEMS
+from services.receipt_tracker import receipt_tracker
+from sqlmodel import select
+from services.saga_blockchain import send_saga_token, mint_saga_tokens, w3_saga, TokenNotConfiguredError
+from services.signers import get_signer, WalletNotFoundError
 
 router = APIRouter()
 
+def explorer_tx_link(tx_hash: str) -> str:
+    return f"https://explorer.saga.xyz/tx/{tx_hash}"
+
 @router.post("/transfer-token/")
-def transfer_token(
+async def transfer_token(
     wallet_address: str = Form(...),
     recipient_address: str = Form(...),
     amount: float = Form(...),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     try:
-        wallet = session.query(UserWallet).filter(UserWallet.wallet_address == wallet_address).first()
-        if not wallet:
+        try:
+            account = await get_signer(session, wallet_address)
+        except WalletNotFoundError:
             raise HTTPException(status_code=404, detail="Wallet not found")
-        
-        tx_hash = send_saga_token(
-            private_key=wallet.private_key,
+
+        tx_hash = await send_saga_token(
+            account=account,
             recipient_address=recipient_address,
             amount=amount
         )
-        explorer_link = f"https://explorer.saga.xyz/tx/{tx_hash}"
+        await receipt_tracker.track(session, tx_hash, wallet_address)
+        await session.commit()
+        explorer_link = explorer_tx_link(tx_hash)
 
         return {
             "message": "Token transfer request received.",
@@ -34,3 +46,116 @@ def transfer_token(
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+async def mint_and_track(session: AsyncSession, wallet_address: str, mints: list[tuple[str, float]]) -> list[dict]:
+    try:
+        account = await get_signer(session, wallet_address)
+    except WalletNotFoundError:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+    try:
+        results = await mint_saga_tokens(account, mints)
+    except TokenNotConfiguredError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    sent = [result for result in results if "tx_hash" in result]
+    await receipt_tracker.track_many(session, [result["tx_hash"] for result in sent], wallet_address)
+    await session.commit()
+    for result in sent:
+        result["explorer_link"] = explorer_tx_link(result["tx_hash"])
+    return results
+
+# SagaToken mint. wallet_address 는 mint 권한이 있는 지갑이어야 합니다.
+@router.post("/mint")
+async def mint_token(
+    wallet_address: str = Form(...),
+    recipient_address: str = Form(...),
+    amount: float = Form(...),
+    session: AsyncSession = Depends(get_async_session)
+):
+    result = (await mint_and_track(session, wallet_address, [(recipient_address, amount)]))[0]
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return {
+        "message": "Mint request received.",
+        "tx_hash": result["tx_hash"],
+        "explorer_link": result["explorer_link"]
+    }
+
+# 여러 주소에 한 번에 mint. 연속 nonce 로 서명해 JSON-RPC 배치로 보내며, 결과는 요청 순서대로 돌려줍니다.
+@router.post("/mint/bulk")
+async def bulk_mint_token(request: BulkMintRequest, session: AsyncSession = Depends(get_async_session)):
+    mints = [(item.recipient_address, item.amount) for item in request.recipients]
+    if request.all_agents:
+        if request.amount is None:
+            raise HTTPException(status_code=400, detail="amount is required with all_agents")
+        addresses = (await session.exec(select(UserWallet.wallet_address).order_by(UserWallet.id))).all()
+        mints.extend((address, request.amount) for address in addresses)
+    if not mints:
+        raise HTTPException(status_code=400, detail="No recipients")
+    if len(mints) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per request")
+
+    results = await mint_and_track(session, request.wallet_address, mints)
+    return {
+        "sent": sum(1 for result in results if "tx_hash" in result),
+        "failed": sum(1 for result in results if "error" in result),
+        "results": results
+    }
+
+def receipt_summary(session: Session, outbox_id: int):
+    tracked = session.exec(
+        select(TrackedTransaction)
+        .where(TrackedTransaction.outbox_id == outbox_id)
+        .order_by(TrackedTransaction.id.desc())
+    ).first()
+    if not tracked:
+        return None
+    return {
+        "tx_hash": tracked.tx_hash,
+        "status": tracked.status,
+        "block_number": tracked.block_number,
+        "gas_used": tracked.gas_used
+    }
+
+# 좋아요 등으로 대기열에 들어간 토큰 전송 작업 상태 조회
+@router.get("/jobs/{job_id}")
+def get_transfer_job(job_id: int, session: Session = Depends(get_session)):
+    job = session.get(TransferOutbox, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Transfer job not found")
+
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "tx_hash": job.tx_hash,
+        "explorer_link": explorer_tx_link(job.tx_hash) if job.tx_hash else None,
+        "last_error": job.last_error,
+        "receipt": receipt_summary(session, job.id),
+        "created_at": job.created_at,
+        "updated_at": job.updated_at
+    }
+
+# 직접 전송한 트랜잭션의 채굴 상태 조회
+@router.get("/transactions/{tx_hash}")
+def get_transaction_status(tx_hash: str, session: Session = Depends(get_session)):
+    normalized = tx_hash.lower() if tx_hash.startswith("0x") else "0x" + tx_hash.lower()
+    tracked = session.exec(select(TrackedTransaction).where(TrackedTransaction.tx_hash == normalized)).first()
+    if not tracked:
+        raise HTTPException(status_code=404, detail="Transaction is not tracked")
+
+    return {
+        "tx_hash": tracked.tx_hash,
+        "status": tracked.status,
+        "block_number": tracked.block_number,
+        "gas_used": tracked.gas_used,
+        "explorer_link": explorer_tx_link(tracked.tx_hash)
+    }
+
+# Saga RPC 노드별 상태 (circuit breaker, 에러율, 지연 시간, 쓰기 primary 여부)
+@router.get("/rpc-endpoints")
+def get_rpc_endpoints():
+    # 클라이언트가 아직 만들어지지 않았으면 통계도 없습니다.
+    return {"endpoints": w3_saga.provider.stats() if w3_saga.loaded else []}
@@ -0,0 +1,13 @@
+from typing import Optional
+from pydantic import BaseModel
+
+class BulkPostItem(BaseModel):
+    agent_public_key: str
+    content: str
+    hash: Optional[str] = None  # 없으면 서버에서 계산
+
+class BulkCommentItem(BaseModel):
+    agent_public_key: str
+    content: str
+    post_id: int
+    hash: Optional[str] = None  # 없으면 서버에서 계산
@@ -0,0 +1,13 @@
+from typing import Optional
+from pydantic import BaseModel
+
+class MintItem(BaseModel):
+    recipient_address: str
+    amount: float
+
+class BulkMintRequest(BaseModel):
+    wallet_address: str  # mint 권한이 있는 지갑
+    recipients: list[MintItem] = []
+    # true 면 등록된 모든 에이전트 지갑에 amount 만큼 mint 합니다.
+    all_agents: bool = False
+    amount: Optional[float] = None
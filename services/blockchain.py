@@ -1,20 +1,14 @@
 # services/blockchain.py
-import os
 import json
-from web3 import Web3
-from web3.middleware import ExtraDataToPOAMiddleware
 import logging
-from dotenv import load_dotenv
 from decimal import Decimal
+from functools import lru_cache
+from services.metrics import instrument_provider, transfer_stage_duration, tx_outcomes, tx_outcome
+from services.settings import get_settings, LazyClient
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-load_dotenv()
-
-NODE_RPC_URL = os.getenv("RPC_URL")
-logger.info(f"Using RPC URL: {NODE_RPC_URL}")
+NODE_RPC_URL = get_settings().rpc_url
 
 ERC20_ABI = json.loads("""
 [
@@ -24,57 +18,86 @@ ERC20_ABI = json.loads("""
 ]
 """)
 
-w3 = Web3(Web3.HTTPProvider(NODE_RPC_URL))
-w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
+
+def create_client():
+    # web3 는 임포트 비용이 크므로 클라이언트를 처음 만들 때 가져옵니다.
+    from web3 import Web3
+    from web3.middleware import ExtraDataToPOAMiddleware
+
+    logger.info("Using RPC URL: %s", NODE_RPC_URL)
+    client = Web3(Web3.HTTPProvider(NODE_RPC_URL))
+    client.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
+    instrument_provider(client.provider, "erc20")
+    return client
+
+
+w3 = LazyClient(create_client)
+
+
+@lru_cache(maxsize=1)
+def get_chain_id() -> int:
+    # chain id 는 프로세스가 살아있는 동안 바뀌지 않습니다.
+    return w3.eth.chain_id
+
+
+@lru_cache(maxsize=128)
+def get_token_contract(token_address: str):
+    return w3.eth.contract(address=w3.to_checksum_address(token_address), abi=ERC20_ABI)
+
+
+@lru_cache(maxsize=128)
+def get_token_decimals(token_address: str) -> int:
+    return get_token_contract(token_address).functions.decimals().call()
+
+def read_batch(requests: list) -> list[int]:
+    """정수 결과를 돌려주는 JSON-RPC 요청들을 한 번의 배치로 보내고, 요청 순서대로 결과를 돌려줍니다."""
+    responses = w3.provider.make_batch_request(requests)
+    if not isinstance(responses, list):
+        raise Exception(f"Batch request failed: {responses.get('error')}")
+    errors = [response["error"] for response in responses if "error" in response]
+    if errors:
+        raise Exception(f"RPC error: {errors[0].get('message', errors[0])}")
+    return [int(response["result"], 16) for response in sorted(responses, key=lambda response: response["id"])]
 
 def send_erc20_token(private_key, token_address, recipient_address, amount):
     try:
         account = w3.eth.account.from_key(private_key)
         wallet_address = account.address
-        logger.info(f"Sender wallet address: {wallet_address}")
-        logger.info(f"Token contract address: {token_address}")
-        logger.info(f"Recipient address: {recipient_address}")
-        
-        # Check ETH balance first
-        eth_balance = w3.eth.get_balance(wallet_address)
-        logger.info(f"ETH balance: {w3.from_wei(eth_balance, 'ether')} ETH")
-        
-        token_contract = w3.eth.contract(address=w3.to_checksum_address(token_address), abi=ERC20_ABI)
-        
-        # Check token balance
-        try:
-            token_balance = token_contract.functions.balanceOf(wallet_address).call()
-            decimals = token_contract.functions.decimals().call()
-            logger.info(f"Token decimals: {decimals}")
-            logger.info(f"Token balance: {token_balance / (10 ** decimals)}")
-        except Exception as e:
-            logger.error(f"Error checking token balance: {str(e)}")
-        
+        logger.debug("ERC20 transfer %s -> %s, token %s, amount %s", wallet_address, recipient_address, token_address, amount)
+
+        token_contract = get_token_contract(token_address)
+        decimals = get_token_decimals(token_address)
+
+        # ETH 잔액, 토큰 잔액, nonce, gas price 를 한 번의 배치 요청으로 조회
+        # w3.batch_requests() 는 공유 provider 전체를 배치 모드로 바꾸므로, threadpool 에서 동시에 도는 다른 전송의
+        # 요청까지 배치로 끌려 들어갑니다. provider 배치를 직접 보내 요청마다 독립적으로 읽습니다.
+        eth_balance, token_balance, nonce, gas_price = read_batch([
+            ("eth_getBalance", [wallet_address, "latest"]),
+            ("eth_call", [{"to": token_contract.address, "data": token_contract.encode_abi("balanceOf", args=[wallet_address])}, "latest"]),
+            ("eth_getTransactionCount", [wallet_address, "pending"]),
+            ("eth_gasPrice", []),
+        ])
+
         amount_in_wei = int(Decimal(amount) * (10 ** decimals))
-        logger.info(f"Amount to send in token units: {amount_in_wei}")
-
-        nonce = w3.eth.get_transaction_count(wallet_address)
-        logger.info(f"Nonce: {nonce}")
-        
-        gas_price = w3.eth.gas_price
-        logger.info(f"Gas price: {w3.from_wei(gas_price, 'gwei')} gwei")
-        
+        logger.debug(
+            "ETH balance %s wei, token balance %s, amount %s units, nonce %s, gas price %s wei",
+            eth_balance, token_balance, amount_in_wei, nonce, gas_price
+        )
+
         # Estimate gas
         try:
             estimated_gas = token_contract.functions.transfer(
                 w3.to_checksum_address(recipient_address),
                 amount_in_wei
             ).estimate_gas({'from': wallet_address})
-            logger.info(f"Estimated gas: {estimated_gas}")
         except Exception as e:
-            logger.error(f"Gas estimation failed: {str(e)}")
             estimated_gas = 100000  # Default fallback
-            logger.info(f"Using default gas limit: {estimated_gas}")
-        
+            logger.warning("Gas estimation failed, using default gas limit %s: %s", estimated_gas, e)
+
         # Calculate transaction cost
         tx_cost_wei = estimated_gas * gas_price
-        logger.info(f"Estimated transaction cost: {w3.from_wei(tx_cost_wei, 'ether')} ETH")
-        
+        logger.debug("Estimated gas %s, cost %s wei", estimated_gas, tx_cost_wei)
+
         # Check if enough ETH for gas
         if eth_balance < tx_cost_wei:
             error_msg = f"Insufficient ETH for gas: have {w3.from_wei(eth_balance, 'ether')} ETH, need {w3.from_wei(tx_cost_wei, 'ether')} ETH"
@@ -89,21 +112,34 @@ def send_erc20_token(private_key, token_address, recipient_address, amount):
             'nonce': nonce,
             'gasPrice': gas_price,
             'gas': estimated_gas,
-            'chainId': w3.eth.chain_id
+            'chainId': get_chain_id()
         })
-        
-        logger.info(f"Chain ID: {w3.eth.chain_id}")
-        logger.info(f"Transaction built: {tx}")
-
-        signed_tx = w3.eth.account.sign_transaction(tx, private_key)
-        logger.info("Transaction signed successfully")
-        
-        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        logger.debug("Transaction built: %s", tx)
+
+        with transfer_stage_duration.time("sign"):
+            signed_tx = w3.eth.account.sign_transaction(tx, private_key)
+        with transfer_stage_duration.time("broadcast"):
+            tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
         tx_hash_hex = tx_hash.hex()
-        logger.info(f"Transaction sent successfully. Hash: {tx_hash_hex}")
+        tx_outcomes.inc("erc20", "sent")
+        # 전송 한 건당 요약 로그 한 줄
+        logger.info(
+            "ERC20 transfer sent %s", tx_hash_hex,
+            extra={
+                "event": "erc20_transfer",
+                "sender": wallet_address,
+                "recipient": recipient_address,
+                "token": token_address,
+                "amount": str(amount),
+                "nonce": nonce,
+                "gas": estimated_gas,
+                "gas_price": gas_price,
+                "tx_hash": tx_hash_hex
+            }
+        )
 
         return tx_hash_hex
     except Exception as e:
-        logger.error(f"Error in send_erc20_token: {str(e)}")
+        tx_outcomes.inc("erc20", tx_outcome(e))
+        logger.error("Error in send_erc20_token: %s", e)
         raise
-
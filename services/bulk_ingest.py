@@ -0,0 +1,93 @@
+import os
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from services.content_hash import generate_content_hashes
+
+# 요청 하나에 담을 수 있는 최대 항목 수
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "5000"))
+
+
+async def read_bulk_body(request: Request) -> list:
+    """
+    JSON 배열 또는 NDJSON(한 줄에 객체 하나) 본문을 항목 목록으로 읽습니다.
+    NDJSON 은 도착하는 대로 한 줄씩 파싱하며, 파싱할 수 없는 줄은 None 으로 남겨 항목별 에러로 보고합니다.
+    """
+    content_type = request.headers.get("content-type", "")
+    items = []
+
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            items.extend(_parse_line(line) for line in lines if line.strip())
+            if len(items) > BULK_MAX_ITEMS:
+                break
+        if buffer.strip():
+            items.append(_parse_line(buffer))
+    else:
+        try:
+            items = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per request")
+    return items
+
+
+def _parse_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def validate_items(raw_items: list, schema: type[BaseModel]):
+    """항목마다 검증해 (유효한 (index, 모델) 목록, {index: 에러 메시지}) 를 돌려줍니다."""
+    valid, errors = [], {}
+    for index, raw in enumerate(raw_items):
+        if not isinstance(raw, dict):
+            errors[index] = "Item must be a JSON object"
+            continue
+        try:
+            valid.append((index, schema.model_validate(raw)))
+        except ValidationError as e:
+            errors[index] = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+    return valid, errors
+
+
+async def bulk_insert(session: AsyncSession, model, valid: list, errors: dict, total: int):
+    """
+    검증을 통과한 항목을 한 트랜잭션에서 multi-row INSERT 로 넣고, 입력 순서대로 항목별 결과를 돌려줍니다.
+    hash 가 없는 항목은 배치 단위로 한 번에 계산합니다.
+    """
+    now = datetime.utcnow()
+    missing = [item for _, item in valid if not item.hash]
+    for item, content_hash in zip(missing, generate_content_hashes([(i.agent_public_key, i.content) for i in missing], now)):
+        item.hash = content_hash
+
+    ids = []
+    if valid:
+        rows = [{**item.model_dump(), "created_at": now, "liked": 0} for _, item in valid]
+        result = await session.exec(insert(model).returning(model.id, sort_by_parameter_order=True), params=rows)
+        ids = result.scalars().all()
+        await session.commit()
+
+    results = [{"index": index, "error": message} for index, message in errors.items()]
+    results += [{"index": index, "id": new_id} for (index, _), new_id in zip(valid, ids)]
+    results.sort(key=lambda result: result["index"])
+
+    return {
+        "inserted": len(ids),
+        "failed": total - len(ids),
+        "results": results
+    }
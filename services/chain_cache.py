@@ -0,0 +1,60 @@
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ChainMetadataCache:
+    """
+    체인 상수와 자주 바뀌지 않는 값을 캐시합니다.
+
+    chain_id 는 프로세스가 살아있는 동안 변하지 않으므로 한 번만 조회하고,
+    gas price 는 짧은 TTL 동안 재사용하며 백그라운드 태스크가 미리 갱신합니다.
+    """
+
+    def __init__(self, w3, gas_price_ttl: float = 15.0):
+        self.w3 = w3
+        self.gas_price_ttl = gas_price_ttl
+        self._chain_id: int | None = None
+        self._gas_price: int | None = None
+        self._gas_price_at = 0.0
+
+    @property
+    def cached_chain_id(self) -> int | None:
+        return self._chain_id
+
+    def set_chain_id(self, chain_id: int) -> None:
+        self._chain_id = chain_id
+
+    async def chain_id(self) -> int:
+        if self._chain_id is None:
+            self._chain_id = await self.w3.eth.chain_id
+        return self._chain_id
+
+    @property
+    def cached_gas_price(self) -> int | None:
+        """TTL 안의 gas price 를 반환하고, 만료되었으면 None 을 반환합니다."""
+        if self._gas_price is None or time.monotonic() - self._gas_price_at > self.gas_price_ttl:
+            return None
+        return self._gas_price
+
+    def set_gas_price(self, gas_price: int) -> None:
+        self._gas_price = gas_price
+        self._gas_price_at = time.monotonic()
+
+    async def gas_price(self) -> int:
+        gas_price = self.cached_gas_price
+        if gas_price is None:
+            gas_price = await self.w3.eth.gas_price
+            self.set_gas_price(gas_price)
+        return gas_price
+
+    async def refresh_gas_price_forever(self) -> None:
+        """TTL 이 만료되기 전에 gas price 를 갱신합니다. lifespan 에서 태스크로 실행됩니다."""
+        while True:
+            try:
+                self.set_gas_price(await self.w3.eth.gas_price)
+            except Exception as e:
+                logger.warning("Gas price refresh failed: %s", e)
+            await asyncio.sleep(self.gas_price_ttl / 2)
@@ -0,0 +1,19 @@
+import hashlib
+from datetime import datetime
+
+
+def generate_content_hash(wallet_address: str, content: str, timestamp: datetime) -> str:
+    """
+    주어진 wallet_address, content, timestamp를 결합하여 SHA256 해시를 생성합니다.
+    """
+    data = f"{wallet_address}-{content}-{timestamp.isoformat()}"
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def generate_content_hashes(items: list[tuple[str, str]], timestamp: datetime) -> list[str]:
+    """
+    (wallet_address, content) 목록의 해시를 한 번에 계산합니다. 배치 전체에 같은 timestamp 를 사용합니다.
+    """
+    suffix = f"-{timestamp.isoformat()}"
+    sha256 = hashlib.sha256
+    return [sha256(f"{wallet_address}-{content}{suffix}".encode('utf-8')).hexdigest() for wallet_address, content in items]
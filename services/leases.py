@@ -0,0 +1,199 @@
+import os
+import time
+import uuid
+import random
+import socket
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import update, or_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.connection import create_async_db_engine
+from services.metrics import instrument_engine
+from models.models import Lease
+
+logger = logging.getLogger(__name__)
+
+# lease 유지 시간(초). 쥔 프로세스가 죽으면 이 시간이 지난 뒤 다른 프로세스가 가져갑니다.
+LEASE_TTL = float(os.getenv("LEASE_TTL", "30"))
+# 다른 프로세스가 쥔 lease 를 기다리는 최대 시간(초)
+LEASE_WAIT_TIMEOUT = float(os.getenv("LEASE_WAIT_TIMEOUT", "30"))
+# 기다리는 동안 다시 시도하는 간격(초). 실패할수록 LEASE_POLL_MAX 까지 늘립니다.
+LEASE_POLL_MIN = float(os.getenv("LEASE_POLL_MIN", "0.01"))
+LEASE_POLL_MAX = float(os.getenv("LEASE_POLL_MAX", "0.2"))
+# lease 전용 연결 수. 전송 요청은 자기 세션 연결을 쥔 채 지갑 lock 을 기다리므로, lease 가 같은 풀을 쓰면
+# 풀이 바닥났을 때 lock 을 쥔 쪽이 연결을 못 얻어 모두 멈춥니다.
+LEASE_POOL_SIZE = int(os.getenv("LEASE_POOL_SIZE", "2"))
+
+lease_engine = create_async_db_engine(pool_size=LEASE_POOL_SIZE, max_overflow=LEASE_POOL_SIZE)
+instrument_engine(lease_engine.sync_engine, "lease")
+lease_session_factory = async_sessionmaker(lease_engine, class_=AsyncSession, expire_on_commit=False)
+
+# release 에서 value 를 바꾸지 않을 때 쓰는 값
+KEEP = object()
+
+
+class LeaseUnavailableError(Exception):
+    pass
+
+
+class LeaseManager:
+    """
+    lease 테이블로 여러 프로세스(와 호스트) 사이의 상호 배제를 구현합니다.
+
+    lease 는 조건부 UPDATE(비어 있거나, 만료되었거나, 이미 내 것인 행)나 INSERT ... ON CONFLICT DO NOTHING
+    한 번으로 잡으므로 SQLite 와 Postgres 에서 모두 원자적입니다. 만료 시간은 DB 에 적고,
+    이 프로세스가 쥔 lease 의 만료 시각은 메모리에도 두어 갱신이 필요할 때만 DB 에 씁니다.
+    """
+
+    def __init__(self, ttl: float = LEASE_TTL):
+        self.ttl = ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # name → 로컬 만료 시각(monotonic)
+        self._expires: dict[str, float] = {}
+
+    def held(self, name: str) -> bool:
+        return self._expires.get(name, 0) > time.monotonic()
+
+    async def try_acquire(self, name: str) -> tuple[bool, int | None]:
+        """lease 를 한 번 잡아 봅니다. (성공 여부, 저장된 value) 를 돌려줍니다."""
+        started = time.monotonic()
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl)
+        async with lease_session_factory() as session:
+            result = await session.exec(
+                update(Lease)
+                .where(Lease.name == name, or_(Lease.owner.is_(None), Lease.owner == self.owner, Lease.expires_at < now))
+                .values(owner=self.owner, expires_at=expires_at, updated_at=now)
+            )
+            if result.rowcount != 1:
+                insert = postgresql_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+                result = await session.exec(
+                    insert(Lease)
+                    .values(name=name, owner=self.owner, expires_at=expires_at, updated_at=now)
+                    .on_conflict_do_nothing(index_elements=["name"])
+                )
+                if result.rowcount != 1:
+                    await session.rollback()
+                    return False, None
+            value = (await session.exec(select(Lease.value).where(Lease.name == name))).one()
+            await session.commit()
+        self._expires[name] = started + self.ttl
+        return True, value
+
+    async def acquire(self, name: str, timeout: float = LEASE_WAIT_TIMEOUT) -> int | None:
+        """lease 를 잡을 때까지 기다립니다. 저장된 value 를 돌려줍니다."""
+        deadline = time.monotonic() + timeout
+        delay = LEASE_POLL_MIN
+        while True:
+            acquired, value = await self.try_acquire(name)
+            if acquired:
+                return value
+            if time.monotonic() >= deadline:
+                raise LeaseUnavailableError(f"Lease {name} is held by another process")
+            await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            delay = min(delay * 2, LEASE_POLL_MAX)
+
+    async def renew(self, name: str) -> bool:
+        """
+        쥔 lease 의 만료를 늦춥니다. 남은 시간이 ttl 의 절반보다 많으면 DB 에 쓰지 않습니다.
+        이미 만료되어 다른 프로세스가 가져갔으면 False 입니다.
+        """
+        remaining = self._expires.get(name, 0) - time.monotonic()
+        if remaining > self.ttl / 2:
+            return True
+        started = time.monotonic()
+        now = datetime.utcnow()
+        async with lease_session_factory() as session:
+            result = await session.exec(
+                update(Lease)
+                .where(Lease.name == name, Lease.owner == self.owner)
+                .values(expires_at=now + timedelta(seconds=self.ttl), updated_at=now)
+            )
+            await session.commit()
+        if result.rowcount != 1:
+            self._expires.pop(name, None)
+            logger.warning("Lost lease %s", name)
+            return False
+        self._expires[name] = started + self.ttl
+        return True
+
+    async def release(self, name: str, value=KEEP) -> None:
+        self._expires.pop(name, None)
+        values = {"owner": None, "updated_at": datetime.utcnow()}
+        if value is not KEEP:
+            values["value"] = value
+        async with lease_session_factory() as session:
+            await session.exec(update(Lease).where(Lease.name == name, Lease.owner == self.owner).values(**values))
+            await session.commit()
+
+    async def set_value(self, name: str, value: int | None) -> None:
+        """쥔 프로세스와 상관없이 저장된 value 를 바꿉니다."""
+        async with lease_session_factory() as session:
+            await session.exec(update(Lease).where(Lease.name == name).values(value=value, updated_at=datetime.utcnow()))
+            await session.commit()
+
+
+class Leadership:
+    """
+    여러 프로세스 중 한 곳에서만 돌아야 하는 작업(영수증 추적, 장부 정산, 멈춘 전송 복구)을 맡을 리더를 뽑습니다.
+    모든 프로세스가 ttl/3 마다 leader lease 를 잡거나 갱신하며, 리더가 죽으면 ttl 이 지난 뒤 다른 프로세스가 넘겨받습니다.
+    """
+
+    def __init__(self, leases: LeaseManager, on_elected, on_demoted, on_tick=None, name: str = "leader"):
+        self.leases = leases
+        self.name = name
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.on_tick = on_tick
+        self.is_leader = False
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.is_leader:
+            self.is_leader = False
+            await self.on_demoted()
+            await self.leases.release(self.name)
+            logger.info("Process %s released leadership", self.leases.owner)
+
+    async def _demote(self) -> None:
+        self.is_leader = False
+        logger.warning("Process %s lost leadership", self.leases.owner)
+        await self.on_demoted()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if self.is_leader:
+                    if not await self.leases.renew(self.name):
+                        await self._demote()
+                elif (await self.leases.try_acquire(self.name))[0]:
+                    self.is_leader = True
+                    logger.info("Process %s elected leader", self.leases.owner)
+                    await self.on_elected()
+                if self.is_leader and self.on_tick:
+                    await self.on_tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Leader election failed: %s", e)
+                # 갱신하지 못한 채 만료되었다면 다른 프로세스가 리더가 되었을 수 있습니다.
+                if self.is_leader and not self.leases.held(self.name):
+                    await self._demote()
+            await asyncio.sleep(self.leases.ttl / 3)
+
+
+leases = LeaseManager()
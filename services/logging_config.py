@@ -0,0 +1,205 @@
+import os
+import re
+import sys
+import json
+import time
+import queue
+import random
+import logging
+import logging.handlers
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from uuid import uuid4
+
+# 로그 레벨과 출력 형식(json | text)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# DEBUG 상세 로그를 남길 요청/전송의 비율(0~1). 0 이면 DEBUG 로그를 만들지 않습니다.
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0"))
+
+# 값이 가려지는 필드 이름 (소문자, 구분자 무시)
+REDACTED_FIELDS = {"privatekey", "backendprivatekey", "secret", "rawtransaction", "mnemonic"}
+# 메시지 안의 "private_key=..." / "'backendPrivateKey': '...'" 형태 개인 키
+REDACT_PATTERN = re.compile(
+    r"""((?:private_?key|backendPrivateKey|secret|mnemonic)['"]?\s*[:=]\s*['"]?)(?:0x)?[0-9a-fA-F]{64}""",
+    re.IGNORECASE
+)
+REDACTED = "***"
+
+# 요청 하나(또는 백그라운드 작업 하나)에 대한 로그 문맥
+_log_context: ContextVar[dict | None] = ContextVar("log_context", default=None)
+
+# LogRecord 의 기본 속성. 나머지는 extra 로 넘어온 구조화 필드입니다.
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+
+def redact(value):
+    if isinstance(value, str):
+        return REDACT_PATTERN.sub(lambda m: m.group(1) + REDACTED, value)
+    if isinstance(value, dict):
+        return {
+            k: REDACTED if k.replace("_", "").lower() in REDACTED_FIELDS else redact(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    return value
+
+
+def begin_context(**fields) -> dict:
+    """
+    새 로그 문맥을 엽니다. 요청 시작 시 미들웨어에서, 백그라운드 작업 시작 시 작업 쪽에서 호출합니다.
+    LOG_DEBUG_SAMPLE_RATE 비율로 이 문맥의 DEBUG 로그를 남길지 정합니다.
+    """
+    context = {
+        "request_id": uuid4().hex[:16],
+        "sampled": LOG_DEBUG_SAMPLE_RATE > 0 and random.random() < LOG_DEBUG_SAMPLE_RATE,
+        "fields": dict(fields)
+    }
+    _log_context.set(context)
+    return context
+
+
+def add_log_fields(**fields) -> None:
+    """현재 요청의 요약 로그에 필드를 더합니다. 문맥 밖에서는 아무것도 하지 않습니다."""
+    context = _log_context.get()
+    if context is not None:
+        context["fields"].update(fields)
+
+
+class ContextFilter(logging.Filter):
+    """요청 id 를 붙이고, 샘플링되지 않은 문맥의 DEBUG 로그를 버립니다."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        if record.levelno <= logging.DEBUG and not (context and context["sampled"]):
+            return False
+        if context is not None:
+            record.request_id = context["request_id"]
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": redact(record.getMessage()),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRS:
+                event[name] = value
+        event = redact(event)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            event["exc"] = record.exc_text
+        return json.dumps(event, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = {name: value for name, value in vars(record).items() if name not in _RECORD_ATTRS}
+        if fields:
+            line += " " + " ".join(f"{name}={value}" for name, value in redact(fields).items())
+        return redact(line)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler 는 기본적으로 호출한 스레드에서 메시지를 포맷합니다.
+    여기서는 레코드를 그대로 넘겨, 포맷과 stderr 쓰기를 모두 QueueListener 스레드에서 처리합니다.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            # traceback 객체는 다른 스레드에서 읽는 동안 바뀔 수 있으므로 여기서 문자열로 만듭니다.
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT) -> None:
+    """
+    루트 로거를 큐 핸들러 하나로 바꿉니다. 여러 번 호출해도 한 번만 설정됩니다.
+    DEBUG 는 LOG_DEBUG_SAMPLE_RATE 가 0 보다 클 때만 켜지며, 샘플링된 문맥에서만 기록됩니다.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(logging.DEBUG if LOG_DEBUG_SAMPLE_RATE > 0 else level)
+    # 라이브러리의 DEBUG 로그는 샘플링 대상이 아닙니다.
+    for name in ("web3", "urllib3", "aiosqlite", "asyncio", "httpx", "httpcore"):
+        logging.getLogger(name).setLevel(max(logging.INFO, logging.getLevelName(level)))
+    # SQLAlchemy 는 로거가 INFO 면 모든 쿼리를 찍습니다. 쿼리 로그는 DB_ECHO 로만 켭니다.
+    logging.getLogger("sqlalchemy").setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """남은 로그를 모두 쓰고 listener 스레드를 멈춥니다."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestLogMiddleware:
+    """
+    요청마다 로그 문맥을 열고, 끝나면 메서드/경로/상태/소요 시간과 add_log_fields 로 더해진 필드를
+    요약 로그 한 줄로 남깁니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.logger = logging.getLogger("saga.request")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        context = begin_context()
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.logger.info(
+                "%s %s %s", scope["method"], scope["path"], status_code,
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                    **context["fields"]
+                }
+            )
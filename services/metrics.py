@@ -0,0 +1,261 @@
+import os
+import time
+import inspect
+import bisect
+import threading
+from contextlib import contextmanager, nullcontext
+
+from sqlalchemy import event
+
+# false 면 계측을 설치하지 않고 /metrics 도 등록하지 않습니다.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# 기본 지연 시간 버킷(초)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{str(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # label 값 → [버킷별 개수..., 합계, 전체 개수]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values) -> None:
+        if not METRICS_ENABLED:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def time(self, *label_values):
+        """with 블록의 소요 시간을 기록합니다. 계측이 꺼져 있으면 아무것도 하지 않습니다."""
+        if not METRICS_ENABLED:
+            return nullcontext()
+        return self._timer(label_values)
+
+    @contextmanager
+    def _timer(self, label_values: tuple):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_items = sorted((key, list(series)) for key, series in self._series.items())
+        for label_values, series in series_items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {series[-1]}")
+        return lines
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route", "status")
+)
+rpc_request_duration = Histogram(
+    "rpc_request_duration_seconds", "JSON-RPC request latency", ("network", "method")
+)
+rpc_request_errors = Counter(
+    "rpc_request_errors_total", "JSON-RPC requests that raised", ("network", "method")
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds", "Database statement latency", ("engine", "operation")
+)
+llm_function_duration = Histogram(
+    "llm_function_duration_seconds", "LLM tool function latency", ("function", "outcome")
+)
+transfer_stage_duration = Histogram(
+    "transfer_stage_duration_seconds", "Token transfer latency by stage", ("stage",)
+)
+tx_outcomes = Counter(
+    "tx_outcomes_total", "Token transfer outcomes", ("network", "outcome")
+)
+rpc_hedged_requests = Counter(
+    "rpc_hedged_requests_total", "Reads re-sent to a second RPC endpoint after the hedge delay", ("network",)
+)
+rpc_failovers = Counter(
+    "rpc_failovers_total", "Requests moved to another RPC endpoint after a failure", ("network", "kind")
+)
+rpc_breaker_trips = Counter(
+    "rpc_breaker_trips_total", "Times an RPC endpoint circuit breaker opened", ("endpoint",)
+)
+
+REGISTRY = [
+    http_request_duration, rpc_request_duration, rpc_request_errors, db_query_duration,
+    llm_function_duration, transfer_stage_duration, tx_outcomes, rpc_hedged_requests, rpc_failovers,
+    rpc_breaker_trips
+]
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def tx_outcome(error: Exception | None) -> str:
+    """전송 결과를 tx_outcomes_total 의 outcome 값으로 분류합니다."""
+    if error is None:
+        return "sent"
+    message = str(error).lower()
+    if "insufficient" in message:
+        return "insufficient_funds"
+    if "nonce" in message:
+        return "nonce_error"
+    return "error"
+
+
+def instrument_provider(provider, network: str) -> None:
+    """
+    web3 provider 의 make_request / make_batch_request 를 감싸 RPC 메서드별 지연 시간을 기록합니다.
+    web3 가 요청 함수를 캐시하기 전에, provider 를 만든 직후 호출해야 합니다.
+    """
+    if not METRICS_ENABLED:
+        return
+
+    make_request = provider.make_request
+    make_batch_request = provider.make_batch_request
+
+    def record(method: str, started: float, failed: bool) -> None:
+        rpc_request_duration.observe(time.perf_counter() - started, network, method)
+        if failed:
+            rpc_request_errors.inc(network, method)
+
+    if inspect.iscoroutinefunction(make_request):
+        async def timed_request(method, params):
+            started, failed = time.perf_counter(), True
+            try:
+                response = await make_request(method, params)
+                failed = False
+                return response
+            finally:
+                record(str(method), started, failed)
+
+        async def timed_batch(requests):
+            started, failed = time.perf_counter(), True
+            try:
+                response = await make_batch_request(requests)
+                failed = False
+                return response
+            finally:
+                record("batch", started, failed)
+    else:
+        def timed_request(method, params):
+            started, failed = time.perf_counter(), True
+            try:
+                response = make_request(method, params)
+                failed = False
+                return response
+            finally:
+                record(str(method), started, failed)
+
+        def timed_batch(requests):
+            started, failed = time.perf_counter(), True
+            try:
+                response = make_batch_request(requests)
+                failed = False
+                return response
+            finally:
+                record("batch", started, failed)
+
+    provider.make_request = timed_request
+    provider.make_batch_request = timed_batch
+
+
+def instrument_engine(engine, label: str) -> None:
+    """SQLAlchemy 엔진의 모든 statement 실행 시간을 기록합니다. 비동기 엔진은 sync_engine 을 넘깁니다."""
+    if not METRICS_ENABLED:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+        db_query_duration.observe(time.perf_counter() - started, label, operation)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # 실패한 statement 는 after_cursor_execute 가 호출되지 않으므로 시작 시각만 치웁니다.
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+class MetricsMiddleware:
+    """요청마다 라우트 템플릿(/posts/{post_id}/comments 등) 단위로 지연 시간을 기록합니다."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            http_request_duration.observe(time.perf_counter() - started, scope["method"], path, status_code)
@@ -0,0 +1,184 @@
+import os
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+# 지갑 lease 를 쓸 때, 이 프로세스에 기다리는 전송이 남아 있어도 이 시간(초)이 지나면 lease 를 놓아
+# 다른 프로세스도 같은 지갑으로 보낼 수 있게 합니다.
+WALLET_LEASE_MAX_HOLD = float(os.getenv("WALLET_LEASE_MAX_HOLD", "1"))
+
+# 노드가 nonce 충돌을 알릴 때 사용하는 에러 메시지 (geth / cosmos-evm 계열)
+NONCE_ERROR_MARKERS = (
+    "nonce too low",
+    "replacement transaction underpriced",
+    "replacement underpriced",
+    "invalid nonce",
+)
+
+
+def is_nonce_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(marker in message for marker in NONCE_ERROR_MARKERS)
+
+
+def is_already_known(error) -> bool:
+    # 노드의 트랜잭션 풀에 이 트랜잭션이 이미 있다는 뜻입니다. nonce 충돌이 아니라 전송 성공으로 다룹니다.
+    return "already known" in str(error).lower()
+
+
+class NonceBlock:
+    """reserve_many 로 예약한 연속 nonce. 실패한 전송 수를 failed 에 기록합니다."""
+
+    def __init__(self, start: int, count: int):
+        self.start = start
+        self.count = count
+        self.failed = 0
+
+
+class NonceManager:
+    """
+    발신 주소별로 nonce를 프로세스 내부에서 할당합니다.
+
+    처음 한 번만 노드의 pending 트랜잭션 수로 초기화하고, 이후에는 주소별 lock 아래에서
+    로컬 카운터를 증가시킵니다. 노드가 nonce 충돌을 알리면 다시 동기화합니다.
+    leases 를 주면 지갑 lease 를 쥔 동안만 로컬 카운터를 믿고, lease 를 새로 잡을 때마다 다시 맞춥니다.
+    """
+
+    def __init__(self, w3, leases=None):
+        self.w3 = w3
+        self._nonces: dict[str, int] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        # 여러 프로세스가 같은 지갑으로 보낼 때 쓰는 services.leases.LeaseManager.
+        # None 이면 이 프로세스만 보낸다고 보고 로컬 카운터만 씁니다.
+        self.leases = leases
+        # 주소별 lock 을 기다리는 전송 수와 lease 를 잡은 시각
+        self._waiting: dict[str, int] = {}
+        self._leased_at: dict[str, float] = {}
+
+    def _lock_for(self, address: str) -> asyncio.Lock:
+        # 이벤트 루프 안에서만 호출되므로 별도의 guard가 필요 없습니다.
+        lock = self._locks.get(address)
+        if lock is None:
+            lock = self._locks[address] = asyncio.Lock()
+        return lock
+
+    async def _pending_count(self, address: str) -> int:
+        # pending 수는 방금 트랜잭션을 보낸 노드(primary)에서 읽어야 합니다. 뒤처진 replica 는 더 작은 값을 줍니다.
+        with self.w3.provider.pinned_to_primary():
+            return await self.w3.eth.get_transaction_count(address, "pending")
+
+    async def _seed(self, address: str) -> int:
+        nonce = await self._pending_count(address)
+        self._nonces[address] = nonce
+        logger.info("Nonce seeded for %s: %s", address, nonce)
+        return nonce
+
+    def needs_seed(self, address: str) -> bool:
+        # lease 를 쓰면 lease 를 잡을 때 노드와 다시 맞추므로 미리 읽어 둘 필요가 없습니다.
+        return self.leases is None and self.w3.to_checksum_address(address) not in self._nonces
+
+    def seed(self, address: str, pending_count: int) -> None:
+        """
+        배치 요청 등으로 이미 조회한 pending 트랜잭션 수로 초기화합니다.
+        이미 초기화된 주소는 로컬 카운터가 더 정확하므로 무시합니다.
+        """
+        self._nonces.setdefault(self.w3.to_checksum_address(address), pending_count)
+
+    @asynccontextmanager
+    async def _locked(self, address: str):
+        """주소의 lock(과 lease 를 쓰면 지갑 lease)을 잡고 다음 nonce 를 돌려줍니다."""
+        lock = self._lock_for(address)
+        self._waiting[address] = self._waiting.get(address, 0) + 1
+        try:
+            await lock.acquire()
+        finally:
+            self._waiting[address] -= 1
+        try:
+            if self.leases is not None:
+                await self._acquire_lease(address)
+            nonce = self._nonces.get(address)
+            if nonce is None:
+                nonce = await self._seed(address)
+            yield nonce
+        finally:
+            try:
+                if self.leases is not None:
+                    await self._release_lease(address)
+            finally:
+                lock.release()
+
+    async def _acquire_lease(self, address: str) -> None:
+        name = f"wallet:{address}"
+        if self.leases.held(name):
+            if await self.leases.renew(name):
+                return
+            # lease 를 잃은 사이 다른 프로세스가 보냈을 수 있습니다.
+            self._nonces.pop(address, None)
+        stored = await self.leases.acquire(name)
+        self._leased_at[address] = time.monotonic()
+        # 앞서 쥐었던 프로세스가 넘겨준 nonce 와 노드의 pending 수 중 큰 값을 씁니다.
+        # 노드(풀의 다른 replica)가 방금 보낸 트랜잭션을 아직 모를 수 있기 때문입니다.
+        pending = await self._pending_count(address)
+        self._nonces[address] = max(pending, stored or 0)
+
+    async def _release_lease(self, address: str) -> None:
+        name = f"wallet:{address}"
+        # 이 프로세스에 기다리는 전송이 있으면 lease 를 넘기지 않고 이어서 보냅니다.
+        if self._waiting.get(address) and time.monotonic() - self._leased_at.get(address, 0) < WALLET_LEASE_MAX_HOLD:
+            return
+        nonce = self._nonces.pop(address, None)
+        try:
+            await self.leases.release(name, value=nonce)
+        except Exception as e:
+            # 놓지 못한 lease 는 ttl 이 지나면 만료됩니다.
+            logger.warning("Failed to release wallet lease for %s: %s", address, e)
+
+    @asynccontextmanager
+    async def reserve(self, address: str):
+        """
+        다음 nonce를 예약합니다. with 블록이 정상 종료되면 nonce가 소비되고,
+        예외가 발생하면 소비되지 않습니다. nonce 관련 에러였다면 노드와 다시 동기화합니다.
+        블록이 끝날 때까지 같은 주소의 다른 전송은 대기합니다.
+        """
+        address = self.w3.to_checksum_address(address)
+        async with self._locked(address) as nonce:
+            try:
+                yield nonce
+            except Exception as e:
+                if is_nonce_error(e):
+                    logger.warning("Nonce conflict for %s at %s, resyncing: %s", address, nonce, e)
+                    await self._seed(address)
+                raise
+            self._nonces[address] = nonce + 1
+
+    @asynccontextmanager
+    async def reserve_many(self, address: str, count: int):
+        """
+        연속된 nonce count 개를 한 번에 예약해 NonceBlock 으로 돌려줍니다. 일괄 전송용입니다.
+        블록 안의 전송이 하나라도 실패하면 어느 nonce 까지 노드에 들어갔는지 알 수 없으므로
+        블록이 끝난 뒤 노드와 다시 동기화합니다. 실패가 없으면 count 개가 모두 소비됩니다.
+        """
+        address = self.w3.to_checksum_address(address)
+        async with self._locked(address) as nonce:
+            block = NonceBlock(nonce, count)
+            try:
+                yield block
+            except Exception:
+                await self._seed(address)
+                raise
+            if block.failed:
+                logger.warning("Bulk send from %s had %s failures, resyncing nonce", address, block.failed)
+                await self._seed(address)
+            else:
+                self._nonces[address] = nonce + count
+
+    async def resync(self, address: str) -> None:
+        address = self.w3.to_checksum_address(address)
+        async with self._lock_for(address):
+            await self._seed(address)
+        if self.leases is not None:
+            # 드롭된 nonce 를 다시 쓰도록 다음에 lease 를 잡는 프로세스가 노드 값을 따르게 합니다.
+            await self.leases.set_value(f"wallet:{address}", None)
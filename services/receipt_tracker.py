@@ -0,0 +1,265 @@
+import os
+import asyncio
+import logging
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.connection import async_session_factory
+from models.models import TrackedTransaction, TransferOutbox
+from services.saga_blockchain import w3_saga, nonce_manager, settings
+
+logger = logging.getLogger(__name__)
+
+# 새 블록을 확인하는 주기(초)
+RECEIPT_POLL_INTERVAL = float(os.getenv("RECEIPT_POLL_INTERVAL", "2"))
+# 한 번에 블록 단위로 훑을 최대 블록 수. 더 많이 밀렸으면 해시 단위 배치 조회로 따라잡습니다.
+RECEIPT_MAX_BLOCK_SCAN = int(os.getenv("RECEIPT_MAX_BLOCK_SCAN", "20"))
+# 해시 단위 배치 조회 시 JSON-RPC 배치 하나에 담을 요청 수
+RECEIPT_BATCH_SIZE = int(os.getenv("RECEIPT_BATCH_SIZE", "200"))
+# 전송 후 이 블록 수가 지나도록 채굴되지 않고 노드에서도 사라졌으면 드롭으로 판단합니다.
+TX_DROP_AFTER_BLOCKS = int(os.getenv("TX_DROP_AFTER_BLOCKS", "30"))
+# 드롭된 전송을 다시 보낼 때 올리는 gas price 비율(%)
+GAS_BUMP_PERCENT = float(os.getenv("GAS_BUMP_PERCENT", "12.5"))
+MAX_GAS_BUMPS = int(os.getenv("MAX_GAS_BUMPS", "3"))
+
+
+def gas_price_multiplier(gas_bumps: int) -> float:
+    return (1 + GAS_BUMP_PERCENT / 100) ** gas_bumps
+
+
+def _normalize_hash(tx_hash) -> str:
+    tx_hash = tx_hash if isinstance(tx_hash, str) else tx_hash.hex()
+    tx_hash = tx_hash.lower()
+    return tx_hash if tx_hash.startswith("0x") else "0x" + tx_hash
+
+
+def _to_int(value) -> int:
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+class ReceiptTracker:
+    """
+    전송한 트랜잭션의 채굴 여부를 한 곳에서 추적합니다.
+
+    트랜잭션마다 영수증을 폴링하지 않고, 새 블록마다 eth_getBlockReceipts 한 번으로
+    그 블록의 영수증을 모두 받아 추적 중인 해시와 맞춰봅니다. 노드가 이 메서드를 지원하지
+    않거나 많은 블록이 밀렸으면 eth_getTransactionReceipt 를 배치로 묶어 조회합니다.
+    """
+
+    def __init__(self, w3, shared: bool = False):
+        self.w3 = w3
+        # 여러 프로세스 모드에서는 리더 프로세스 하나만 추적하며, 다른 프로세스가 등록한 트랜잭션도
+        # 보도록 폴링할 때마다 추적 대상을 DB 에서 다시 읽습니다.
+        self.shared = shared
+        self.latest_block: int | None = None
+        self.block_receipts_supported = True
+        # tx_hash → (tracked id, 보낸 블록)
+        self._pending: dict[str, tuple[int, int | None]] = {}
+        self._task: asyncio.Task | None = None
+
+    async def _load_pending(self, head: int | None = None) -> None:
+        async with async_session_factory() as session:
+            if head is not None:
+                # 리더가 아닌 프로세스는 블록 높이를 모르므로 보낸 블록 없이 등록합니다.
+                # 리더가 처음 본 블록을 보낸 블록으로 채워야 드롭 판단 대상이 됩니다.
+                await session.exec(
+                    update(TrackedTransaction)
+                    .where(TrackedTransaction.status == "pending", TrackedTransaction.submitted_block.is_(None))
+                    .values(submitted_block=head)
+                )
+                await session.commit()
+            rows = (await session.exec(
+                select(TrackedTransaction.tx_hash, TrackedTransaction.id, TrackedTransaction.submitted_block)
+                .where(TrackedTransaction.status == "pending")
+            )).all()
+        self._pending = {tx_hash: (tracked_id, submitted_block) for tx_hash, tracked_id, submitted_block in rows}
+
+    async def start(self) -> None:
+        await self._load_pending()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Receipt tracker started with %s pending transactions", len(self._pending))
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def track(self, session: AsyncSession, tx_hash, sender_address: str, outbox_id: int | None = None) -> TrackedTransaction:
+        """전송한 트랜잭션을 추적 대상으로 등록합니다. 커밋은 호출한 쪽에서 합니다."""
+        tracked = TrackedTransaction(
+            tx_hash=_normalize_hash(tx_hash),
+            sender_address=sender_address,
+            outbox_id=outbox_id,
+            submitted_block=self.latest_block
+        )
+        session.add(tracked)
+        await session.flush()
+        if not self.shared:
+            self._pending[tracked.tx_hash] = (tracked.id, tracked.submitted_block)
+        return tracked
+
+    async def track_many(self, session: AsyncSession, tx_hashes: list, sender_address: str) -> list[TrackedTransaction]:
+        """여러 트랜잭션을 한 번의 flush 로 등록합니다. 커밋은 호출한 쪽에서 합니다."""
+        tracked = [
+            TrackedTransaction(tx_hash=_normalize_hash(tx_hash), sender_address=sender_address, submitted_block=self.latest_block)
+            for tx_hash in tx_hashes
+        ]
+        session.add_all(tracked)
+        await session.flush()
+        if not self.shared:
+            for item in tracked:
+                self._pending[item.tx_hash] = (item.id, item.submitted_block)
+        return tracked
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Receipt tracker poll failed: %s", e)
+            await asyncio.sleep(RECEIPT_POLL_INTERVAL)
+
+    async def poll(self) -> None:
+        # 보낸 노드(primary)와 블록 높이가 다른 노드에서 읽으면 아직 없는 블록을 빈 블록으로 보거나
+        # 채굴 전 트랜잭션을 드롭으로 오판하므로, 추적 중의 읽기는 모두 primary 로 보냅니다.
+        with self.w3.provider.pinned_to_primary():
+            await self._poll()
+
+    async def _poll(self) -> None:
+        head = await self.w3.eth.block_number
+        if self.latest_block is None:
+            self.latest_block = head - 1
+        if head <= self.latest_block:
+            return
+
+        if self.shared:
+            await self._load_pending(head)
+        if self._pending:
+            if self.block_receipts_supported and head - self.latest_block <= RECEIPT_MAX_BLOCK_SCAN:
+                receipts, head = await self._receipts_by_block(self.latest_block + 1, head)
+            else:
+                receipts = await self._receipts_by_hash(list(self._pending))
+            await self._resolve(receipts)
+            await self._detect_dropped(head)
+
+        self.latest_block = head
+
+    async def _receipts_by_block(self, first: int, last: int) -> tuple[list[dict], int]:
+        """first..last 블록의 영수증과, 실제로 읽은 마지막 블록 번호를 돌려줍니다."""
+        requests = [("eth_getBlockReceipts", [hex(number)]) for number in range(first, last + 1)]
+        responses = sorted(await self._batch(requests), key=lambda response: response["id"])
+        receipts = []
+        for number, response in zip(range(first, last + 1), responses):
+            if "error" in response:
+                logger.info("eth_getBlockReceipts unavailable, falling back to per-hash batches: %s", response["error"])
+                self.block_receipts_supported = False
+                return await self._receipts_by_hash(list(self._pending)), last
+            if response.get("result") is None:
+                # 노드가 아직 이 블록을 모릅니다. 빈 블록으로 보고 넘어가면 그 영수증을 영영 놓치므로
+                # 여기서 멈추고 다음 폴링에서 이 블록부터 다시 읽습니다.
+                logger.debug("Block %s not available yet, resuming from it on the next poll", number)
+                return receipts, number - 1
+            receipts.extend(response["result"])
+        return receipts, last
+
+    async def _receipts_by_hash(self, tx_hashes: list[str]) -> list[dict]:
+        responses = await self._batch([("eth_getTransactionReceipt", [tx_hash]) for tx_hash in tx_hashes])
+        return [response["result"] for response in responses if response.get("result")]
+
+    async def _batch(self, requests: list) -> list[dict]:
+        responses = []
+        for start in range(0, len(requests), RECEIPT_BATCH_SIZE):
+            chunk = await self.w3.provider.make_batch_request(requests[start:start + RECEIPT_BATCH_SIZE])
+            if not isinstance(chunk, list):
+                # 배치 전체가 거부되면 노드는 에러 객체 하나만 돌려줍니다.
+                raise Exception(f"Batch request failed: {chunk.get('error')}")
+            responses.extend(chunk)
+        return responses
+
+    async def _resolve(self, receipts: list[dict]) -> None:
+        matched = [r for r in receipts if _normalize_hash(r["transactionHash"]) in self._pending]
+        if not matched:
+            return
+
+        now = datetime.utcnow()
+        async with async_session_factory() as session:
+            for receipt in matched:
+                tx_hash = _normalize_hash(receipt["transactionHash"])
+                tracked_id, _ = self._pending.pop(tx_hash)
+                tracked = await session.get(TrackedTransaction, tracked_id)
+                tracked.status = "confirmed" if _to_int(receipt["status"]) == 1 else "reverted"
+                tracked.block_number = _to_int(receipt["blockNumber"])
+                tracked.gas_used = _to_int(receipt["gasUsed"])
+                tracked.updated_at = now
+                session.add(tracked)
+
+                if tracked.outbox_id:
+                    job = await session.get(TransferOutbox, tracked.outbox_id)
+                    if job and job.tx_hash and _normalize_hash(job.tx_hash) == tx_hash:
+                        job.status = "confirmed" if tracked.status == "confirmed" else "failed"
+                        if tracked.status == "reverted":
+                            job.last_error = "Transaction reverted"
+                        job.updated_at = now
+                        session.add(job)
+            await session.commit()
+        logger.info("Resolved %s transaction receipts", len(matched))
+
+    async def _detect_dropped(self, head: int) -> None:
+        stale = [
+            tx_hash for tx_hash, (_, submitted_block) in self._pending.items()
+            if submitted_block is not None and head - submitted_block >= TX_DROP_AFTER_BLOCKS
+        ]
+        if not stale:
+            return
+
+        responses = await self._batch([("eth_getTransactionByHash", [tx_hash]) for tx_hash in stale])
+        dropped = [tx_hash for tx_hash, response in zip(stale, responses) if response.get("result") is None]
+        if dropped:
+            await self._requeue_dropped(dropped)
+
+    async def _requeue_dropped(self, dropped: list[str]) -> None:
+        now = datetime.utcnow()
+        senders = set()
+        async with async_session_factory() as session:
+            for tx_hash in dropped:
+                tracked_id, _ = self._pending.pop(tx_hash)
+                tracked = await session.get(TrackedTransaction, tracked_id)
+                tracked.status = "dropped"
+                tracked.updated_at = now
+                session.add(tracked)
+                senders.add(tracked.sender_address)
+
+                job = await session.get(TransferOutbox, tracked.outbox_id) if tracked.outbox_id else None
+                if not job:
+                    continue
+                if job.gas_bumps >= MAX_GAS_BUMPS:
+                    job.status = "failed"
+                    job.last_error = f"Transaction dropped {job.gas_bumps + 1} times"
+                else:
+                    # gas price 를 올려 다시 보내도록 대기열에 넣습니다.
+                    job.status = "pending"
+                    job.gas_bumps += 1
+                    job.tx_hash = None
+                    job.raw_tx = None
+                    job.next_attempt_at = now
+                job.updated_at = now
+                session.add(job)
+            await session.commit()
+        logger.warning("Re-queued %s dropped transactions", len(dropped))
+
+        # 드롭된 nonce 가 다시 쓰이도록 노드와 nonce 를 맞춥니다.
+        for sender in senders:
+            await nonce_manager.resync(sender)
+
+
+receipt_tracker = ReceiptTracker(w3_saga, shared=settings.multi_process)
@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from services.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# 캐시된 응답을 유지하는 시간(초). 0 이면 캐시를 사용하지 않습니다.
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+# 메모리 캐시에 보관할 최대 응답 수
+RESPONSE_CACHE_MAXSIZE = int(os.getenv("RESPONSE_CACHE_MAXSIZE", "1024"))
+# 지정하면 Redis 호환 서버를 캐시로 사용합니다. (예: redis://localhost:6379/0)
+# 여러 프로세스로 실행할 때 쓰기에 따른 무효화가 모든 프로세스에 반영됩니다.
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "")
+RESPONSE_CACHE_PREFIX = "saga:cache:"
+
+
+class MemoryCacheBackend:
+    """프로세스 안의 TTL + LRU 캐시입니다."""
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get_counters(self, keys: list[str]) -> list[int]:
+        return [self._counters.get(key, 0) for key in keys]
+
+    async def incr(self, key: str) -> None:
+        self._counters[key] = self._counters.get(key, 0) + 1
+
+    async def close(self) -> None:
+        self._entries.clear()
+
+
+class RedisCacheBackend:
+    """Redis 호환 서버(redis.asyncio 클라이언트 인터페이스)를 쓰는 캐시입니다."""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(key, value, px=int(ttl * 1000))
+
+    async def get_counters(self, keys: list[str]) -> list[int]:
+        return [int(value or 0) for value in await self.client.mget(keys)]
+
+    async def incr(self, key: str) -> None:
+        await self.client.incr(key)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class CachedResponse:
+    def __init__(self, body: bytes, etag: str, last_modified: float):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def pack(self) -> bytes:
+        return f"{self.etag}\n{self.last_modified}\n".encode("ascii") + self.body
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "CachedResponse":
+        etag, last_modified, body = data.split(b"\n", 2)
+        return cls(body, etag.decode("ascii"), float(last_modified))
+
+
+class ResponseCache:
+    """
+    목록 조회 응답을 직렬화된 JSON 으로 캐시합니다.
+
+    캐시 키에는 응답이 의존하는 이름공간("posts", "comments")의 버전이 들어갑니다.
+    쓰기가 일어나면 invalidate 로 버전을 올리므로, 이전 응답은 다시 조회되지 않고 TTL/LRU 로 사라집니다.
+    """
+
+    def __init__(self, backend, ttl: float = RESPONSE_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    async def _versioned_key(self, namespaces: tuple[str, ...], key: str) -> str:
+        versions = await self.backend.get_counters([f"{RESPONSE_CACHE_PREFIX}version:{ns}" for ns in namespaces])
+        tag = ",".join(f"{ns}={version}" for ns, version in zip(namespaces, versions))
+        return f"{RESPONSE_CACHE_PREFIX}{tag}:{key}"
+
+    async def get_or_load(self, namespaces: tuple[str, ...], key: str,
+                          loader: Callable[[], Awaitable]) -> CachedResponse:
+        """캐시에 있으면 그대로, 없으면 loader 결과를 JSON 으로 직렬화해 저장하고 돌려줍니다."""
+        if not self.enabled:
+            return self._serialize(await loader())
+
+        try:
+            cache_key = await self._versioned_key(namespaces, key)
+            data = await self.backend.get(cache_key)
+        except Exception as e:
+            logger.warning("Response cache read failed: %s", e)
+            return self._serialize(await loader())
+
+        if data is not None:
+            self.hits += 1
+            return CachedResponse.unpack(data)
+
+        self.misses += 1
+        entry = self._serialize(await loader())
+        try:
+            await self.backend.set(cache_key, entry.pack(), self.ttl)
+        except Exception as e:
+            logger.warning("Response cache write failed: %s", e)
+        return entry
+
+    async def invalidate(self, *namespaces: str) -> None:
+        try:
+            for ns in namespaces:
+                await self.backend.incr(f"{RESPONSE_CACHE_PREFIX}version:{ns}")
+        except Exception as e:
+            logger.warning("Response cache invalidation failed: %s", e)
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    @staticmethod
+    def _serialize(content) -> CachedResponse:
+        # FastAPI 의 기본 JSONResponse 와 같은 형식으로 직렬화합니다.
+        body = json.dumps(
+            jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+        return CachedResponse(body, f'"{hashlib.sha256(body).hexdigest()[:32]}"', time.time())
+
+
+def conditional_response(request: Request, entry: CachedResponse) -> Response:
+    """If-None-Match / If-Modified-Since 가 맞으면 304, 아니면 캐시된 본문을 돌려줍니다."""
+    headers = {
+        "ETag": entry.etag,
+        "Last-Modified": formatdate(entry.last_modified, usegmt=True),
+        "Cache-Control": "no-cache"
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match 가 있으면 If-Modified-Since 는 보지 않습니다. (RFC 7232 §6)
+        if entry.etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+    elif request.headers.get("if-modified-since"):
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"]).timestamp()
+        except (TypeError, ValueError):
+            since = None
+        # HTTP 날짜는 초 단위라, 클라이언트가 받은 응답과 같은 초에 다시 만든 응답도 같은 값이 됩니다.
+        # 그 초가 시작되기 전에 만든 응답일 때만 304 를 돌려줍니다.
+        if since is not None and entry.last_modified < since:
+            return Response(status_code=304, headers=headers)
+
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def create_response_cache() -> ResponseCache:
+    if not RESPONSE_CACHE_URL:
+        if get_settings().multi_process:
+            # 메모리 캐시의 무효화는 쓰기를 처리한 프로세스에만 반영되어, 다른 프로세스는 TTL 동안
+            # 이전 응답(과 304)을 돌려줍니다. 공유 캐시가 없으면 캐시를 끕니다.
+            logger.warning("Multi-process mode without RESPONSE_CACHE_URL, response cache disabled")
+            return ResponseCache(MemoryCacheBackend(), ttl=0)
+        return ResponseCache(MemoryCacheBackend())
+
+    try:
+        import redis.asyncio as redis
+    except ImportError:
+        raise RuntimeError("RESPONSE_CACHE_URL is set but the 'redis' package is not installed")
+    return ResponseCache(RedisCacheBackend(redis.from_url(RESPONSE_CACHE_URL)))
+
+
+response_cache = create_response_cache()
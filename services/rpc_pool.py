@@ -0,0 +1,301 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import urlparse
+
+from web3 import AsyncHTTPProvider
+from web3.providers.async_base import AsyncJSONBaseProvider
+
+from services.metrics import rpc_hedged_requests, rpc_failovers, rpc_breaker_trips
+
+logger = logging.getLogger(__name__)
+
+# 엔드포인트별로 지연 시간과 성공/실패를 기억하는 최근 요청 수
+RPC_STATS_WINDOW = int(os.getenv("RPC_STATS_WINDOW", "200"))
+# 읽기 요청이 이 시간 안에 끝나지 않으면 두 번째 노드에 같은 요청을 보냅니다(hedge).
+# 기준은 첫 노드의 p95 이며 아래 범위로 자릅니다.
+RPC_HEDGE_MIN_DELAY = float(os.getenv("RPC_HEDGE_MIN_DELAY", "0.05"))
+RPC_HEDGE_MAX_DELAY = float(os.getenv("RPC_HEDGE_MAX_DELAY", "2"))
+# 연속 실패가 이 횟수에 이르면 circuit breaker 를 열고 RPC_BREAKER_COOLDOWN 초 동안 보내지 않습니다.
+# cooldown 이 지나면 시험 요청 하나를 보내 성공하면 다시 닫습니다.
+RPC_BREAKER_FAILURES = int(os.getenv("RPC_BREAKER_FAILURES", "3"))
+RPC_BREAKER_COOLDOWN = float(os.getenv("RPC_BREAKER_COOLDOWN", "30"))
+# 가장 빠른 노드가 아닌 노드에 읽기를 보내 통계를 갱신하는 비율
+RPC_PROBE_RATE = float(os.getenv("RPC_PROBE_RATE", "0.02"))
+
+# 항상 sticky primary 로 보내는 쓰기 요청. 실패하면 다음 노드로 넘어가고 그 노드가 primary 가 됩니다.
+WRITE_METHODS = {"eth_sendRawTransaction", "eth_sendTransaction"}
+# 노드 과부하(rate limit)를 알리는 JSON-RPC 에러
+OVERLOAD_ERROR_CODES = {-32005, 429}
+
+
+# pinned_to_primary 블록 안인지 여부. 태스크마다 따로 유지됩니다.
+_pin_primary: ContextVar[bool] = ContextVar("rpc_pin_primary", default=False)
+
+
+class EndpointOverloaded(Exception):
+    pass
+
+
+def _is_overloaded(response) -> bool:
+    error = response.get("error") if isinstance(response, dict) else None
+    if not isinstance(error, dict):
+        return False
+    return error.get("code") in OVERLOAD_ERROR_CODES or "rate limit" in str(error.get("message", "")).lower()
+
+
+class Endpoint:
+    def __init__(self, provider: AsyncHTTPProvider):
+        self.provider = provider
+        # 지표와 로그에는 호스트만 남깁니다. URL 경로에 API 키가 들어가는 경우가 많습니다.
+        parsed = urlparse(str(provider.endpoint_uri))
+        self.name = (f"{parsed.hostname}:{parsed.port}" if parsed.port else parsed.hostname) or str(provider.endpoint_uri)
+        self.latencies: deque[float] = deque(maxlen=RPC_STATS_WINDOW)
+        self.failures: deque[bool] = deque(maxlen=RPC_STATS_WINDOW)
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.trial_in_flight = False
+
+    @property
+    def available(self) -> bool:
+        if self.opened_at is None:
+            return True
+        # half-open: cooldown 이 지나면 시험 요청 하나만 보냅니다.
+        return time.monotonic() - self.opened_at >= RPC_BREAKER_COOLDOWN and not self.trial_in_flight
+
+    @property
+    def error_rate(self) -> float:
+        return sum(self.failures) / len(self.failures) if self.failures else 0.0
+
+    def percentile(self, pct: float) -> float | None:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+    def score(self) -> float:
+        # 중앙값 지연에 에러율만큼 벌점을 줍니다. 아직 통계가 없는 노드는 먼저 시도됩니다.
+        return (self.percentile(50) or 0.0) * (1 + 4 * self.error_rate)
+
+    def hedge_delay(self) -> float:
+        p95 = self.percentile(95)
+        return min(max(p95 if p95 is not None else RPC_HEDGE_MAX_DELAY, RPC_HEDGE_MIN_DELAY), RPC_HEDGE_MAX_DELAY)
+
+    def record_success(self, latency: float) -> None:
+        self.latencies.append(latency)
+        self.failures.append(False)
+        self.consecutive_failures = 0
+        self.trial_in_flight = False
+        if self.opened_at is not None:
+            self.opened_at = None
+            self.failures.clear()
+            logger.info("RPC endpoint %s recovered, closing circuit breaker", self.name)
+
+    def record_failure(self, error: Exception) -> None:
+        self.failures.append(True)
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.consecutive_failures >= RPC_BREAKER_FAILURES:
+            if self.opened_at is None:
+                rpc_breaker_trips.inc(self.name)
+                logger.warning("RPC endpoint %s failed %s times, opening circuit breaker: %s",
+                               self.name, self.consecutive_failures, error)
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "endpoint": self.name,
+            "state": "closed" if self.opened_at is None else ("half_open" if self.available else "open"),
+            "requests": len(self.failures),
+            "error_rate": round(self.error_rate, 4),
+            "p50_ms": round(self.percentile(50) * 1000, 2) if self.latencies else None,
+            "p95_ms": round(self.percentile(95) * 1000, 2) if self.latencies else None,
+        }
+
+
+class RPCPoolProvider(AsyncJSONBaseProvider):
+    """
+    여러 RPC 노드를 하나의 web3 provider 로 묶습니다.
+
+    - 읽기는 circuit breaker 가 닫힌 노드 중 가장 빠른 노드로 보내고, p95 안에 응답이 없으면
+      다음 노드에도 보내(hedge) 먼저 온 응답을 씁니다. 실패하면 바로 다음 노드로 넘어갑니다.
+    - 쓰기는 nonce 순서가 섞이지 않도록 sticky primary 한 곳으로만 보내고, 연결이 실패하면
+      다음 노드로 넘어가 그 노드를 새 primary 로 삼습니다.
+    - 노드마다 블록 높이가 다를 수 있으므로, 방금 보낸 트랜잭션을 봐야 하는 읽기(pending nonce, 영수증 추적)는
+      pinned_to_primary 블록 안에서 primary 로 보냅니다.
+    """
+
+    def __init__(self, urls, network: str = "saga", **provider_kwargs):
+        super().__init__()
+        # 재시도는 pool 이 다른 노드로 넘기는 것으로 대신하므로 web3 자체 재시도는 끕니다.
+        self.endpoints = [
+            Endpoint(AsyncHTTPProvider(url, exception_retry_configuration=None, **provider_kwargs))
+            for url in urls
+        ]
+        self.primary = self.endpoints[0]
+        self.network = network
+        # hedge 에 져서 응답을 기다리지 않는 요청
+        self._background: set[asyncio.Future] = set()
+
+    @property
+    def endpoint_uri(self) -> str:
+        return ",".join(endpoint.name for endpoint in self.endpoints)
+
+    def __str__(self) -> str:
+        return f"RPC pool: {self.endpoint_uri}"
+
+    async def cache_async_session(self, session):
+        for endpoint in self.endpoints:
+            await endpoint.provider.cache_async_session(session)
+        return session
+
+    async def disconnect(self) -> None:
+        for endpoint in self.endpoints:
+            await endpoint.provider.disconnect()
+
+    @contextmanager
+    def pinned_to_primary(self):
+        """이 블록 안에서 현재 태스크의 읽기를 쓰기와 같은 primary 노드로 보냅니다."""
+        token = _pin_primary.set(True)
+        try:
+            yield
+        finally:
+            _pin_primary.reset(token)
+
+    def stats(self) -> list[dict]:
+        return [{**endpoint.stats(), "primary": endpoint is self.primary} for endpoint in self.endpoints]
+
+    def _ranked(self) -> list[Endpoint]:
+        """
+        요청을 보낼 순서입니다. breaker 가 닫힌 노드를 빠른 순으로 두고, 열린 노드는 다른 노드가 모두
+        실패했을 때를 위해 가장 먼저 열린 것부터 뒤에 붙입니다.
+        """
+        candidates = sorted((endpoint for endpoint in self.endpoints if endpoint.available), key=Endpoint.score)
+        if len(candidates) > 1 and random.random() < RPC_PROBE_RATE:
+            candidates.insert(0, candidates.pop(random.randrange(1, len(candidates))))
+        tripped = sorted((endpoint for endpoint in self.endpoints if not endpoint.available), key=lambda e: e.opened_at)
+        return candidates + tripped
+
+    async def _call(self, endpoint: Endpoint, send):
+        if endpoint.opened_at is not None:
+            endpoint.trial_in_flight = True
+        started = time.perf_counter()
+        request = asyncio.ensure_future(send(endpoint.provider))
+        try:
+            response = await asyncio.shield(request)
+        except asyncio.CancelledError:
+            # hedge 에 진 요청입니다. web3 의 세션 관리자는 요청이 취소되면 프로세스 전역 잠금을 놓친 채
+            # 멈출 수 있으므로 요청은 끝까지 두고, 끝났을 때 통계만 남깁니다.
+            self._background.add(request)
+            request.add_done_callback(lambda _: self._record_late(endpoint, started, request))
+            raise
+        except Exception as e:
+            endpoint.record_failure(e)
+            raise
+        if _is_overloaded(response):
+            error = EndpointOverloaded(response["error"].get("message"))
+            endpoint.record_failure(error)
+            raise error
+        endpoint.record_success(time.perf_counter() - started)
+        return response
+
+    def _record_late(self, endpoint: Endpoint, started: float, request: asyncio.Future) -> None:
+        self._background.discard(request)
+        if request.cancelled():
+            endpoint.trial_in_flight = False
+        elif request.exception() is not None or _is_overloaded(request.result()):
+            endpoint.record_failure(request.exception() or EndpointOverloaded("rate limited"))
+        else:
+            endpoint.record_success(time.perf_counter() - started)
+
+    async def _read_primary(self, send):
+        # primary 가 실패하면 다른 노드로 넘어가지만, 읽기이므로 primary 를 바꾸지는 않습니다.
+        order = [self.primary] + [endpoint for endpoint in self._ranked() if endpoint is not self.primary]
+        error = None
+        for index, endpoint in enumerate(order):
+            if index:
+                rpc_failovers.inc(self.network, "read")
+            try:
+                return await self._call(endpoint, send)
+            except Exception as e:
+                error = e
+        raise error
+
+    async def _read(self, send):
+        if _pin_primary.get():
+            return await self._read_primary(send)
+        candidates = self._ranked()
+        hedge_delay = candidates[0].hedge_delay()
+        pending = {asyncio.create_task(self._call(candidates.pop(0), send))}
+        hedged = False
+        error = None
+        try:
+            while pending:
+                timeout = hedge_delay if candidates and not hedged else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    rpc_hedged_requests.inc(self.network)
+                    pending.add(asyncio.create_task(self._call(candidates.pop(0), send)))
+                    continue
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                if not pending and candidates:
+                    rpc_failovers.inc(self.network, "read")
+                    pending.add(asyncio.create_task(self._call(candidates.pop(0), send)))
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _write(self, send, method: str, params):
+        if not self.primary.available:
+            self._promote(self._ranked()[0], "circuit breaker open")
+        order = [self.primary] + [endpoint for endpoint in self._ranked() if endpoint is not self.primary]
+        error = None
+        for index, endpoint in enumerate(order):
+            if index:
+                rpc_failovers.inc(self.network, "write")
+                self._promote(endpoint, error)
+            try:
+                response = await self._call(endpoint, send)
+            except Exception as e:
+                error = e
+                continue
+            if index and method == "eth_sendRawTransaction" and "already known" in str(response.get("error", "")).lower():
+                # 앞 노드가 실패를 알리기 전에 트랜잭션을 이미 전파했다면, 새 노드는 이미 알고 있다고 답합니다.
+                # nonce 를 새로 받아 다시 보내면 같은 전송이 두 번 나가므로 성공으로 처리합니다.
+                return {"jsonrpc": "2.0", "id": response.get("id"), "result": _raw_transaction_hash(params[0])}
+            return response
+        raise error
+
+    def _promote(self, endpoint: Endpoint, reason) -> None:
+        if endpoint is not self.primary:
+            logger.warning("Switching RPC write primary %s -> %s: %s", self.primary.name, endpoint.name, reason)
+            self.primary = endpoint
+
+    async def make_request(self, method, params):
+        send = lambda provider: provider.make_request(method, params)  # noqa: E731
+        if method in WRITE_METHODS:
+            return await self._write(send, method, params)
+        return await self._read(send)
+
+    async def make_batch_request(self, requests):
+        send = lambda provider: provider.make_batch_request(requests)  # noqa: E731
+        if any(method in WRITE_METHODS for method, _ in requests):
+            return await self._write(send, "batch", None)
+        return await self._read(send)
+
+
+def _raw_transaction_hash(raw_transaction) -> str:
+    from eth_utils import keccak
+
+    raw = bytes.fromhex(raw_transaction[2:]) if isinstance(raw_transaction, str) else bytes(raw_transaction)
+    return "0x" + keccak(raw).hex()
@@ -1,99 +1,398 @@
 import os
 import json
-from web3 import Web3
-from web3.middleware import ExtraDataToPOAMiddleware
+import asyncio
 import logging
-from dotenv import load_dotenv
 from decimal import Decimal
+from functools import lru_cache
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
+from services.nonce_manager import NonceManager, is_nonce_error, is_already_known
+from services.chain_cache import ChainMetadataCache
+from services.metrics import instrument_provider, transfer_stage_duration, tx_outcomes, tx_outcome
+from services.settings import get_settings, LazyClient
+from services.leases import leases as wallet_leases
+
+if TYPE_CHECKING:
+    from eth_account.signers.local import LocalAccount
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-load_dotenv()
+settings = get_settings()
+
+
+def create_saga_client():
+    # web3 는 임포트 비용이 크므로 클라이언트를 처음 만들 때 가져옵니다.
+    from web3 import AsyncWeb3
+    from web3.middleware import ExtraDataToPOAMiddleware
+    from services.rpc_pool import RPCPoolProvider
+
+    # URL 이 없으면 web3 기본 엔드포인트(localhost:8545)를 씁니다.
+    provider = RPCPoolProvider(settings.saga_rpc_urls or [None], network="saga")
+    logger.info("Using Saga RPC endpoints: %s", provider.endpoint_uri)
+    w3 = AsyncWeb3(provider)
+    w3.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
+    instrument_provider(w3.provider, "saga")
+    return w3
+
+
+# 처음 사용할 때(또는 lifespan 의 connect_saga 에서) 만들어집니다.
+w3_saga = LazyClient(create_saga_client)
+
+# 여러 프로세스로 실행하면 같은 지갑의 전송을 DB lease 로 프로세스 사이에서도 직렬화합니다.
+nonce_manager = NonceManager(w3_saga, leases=wallet_leases if settings.multi_process else None)
+chain_cache = ChainMetadataCache(w3_saga, gas_price_ttl=settings.saga_gas_price_ttl)
+
+# nonce 충돌 시 재동기화 후 다시 시도하는 횟수
+NONCE_RETRIES = 1
+# 한 번의 JSON-RPC 배치에 담아 보내는 mint 트랜잭션 수
+SAGA_MINT_BATCH_SIZE = int(os.getenv("SAGA_MINT_BATCH_SIZE", "100"))
+ABI_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "abi")
+
+
+async def connect_saga():
+    """
+    Saga 클라이언트를 만들고 RPC 세션을 엽니다. lifespan 에서 백그라운드 태스크로 실행되며,
+    web3 임포트는 이벤트 루프를 막지 않도록 스레드에서 합니다.
+    """
+    await asyncio.to_thread(w3_saga.load)
+    await open_rpc_session()
+
+
+async def open_rpc_session():
+    """
+    모든 RPC 요청이 공유하는 aiohttp 세션(커넥션 풀)을 만들어 provider에 등록합니다.
+    호출되지 않았다면 web3가 기본 세션을 만들어 사용합니다.
+    """
+    import aiohttp
 
-SAGA_RPC_URL = os.getenv("SAGA_RPC_URL")
-logger.info(f"Using Saga RPC URL: {SAGA_RPC_URL}")
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=settings.saga_rpc_pool_size),
+        timeout=aiohttp.ClientTimeout(total=settings.saga_rpc_timeout),
+    )
+    await w3_saga.provider.cache_async_session(session)
+    return session
 
-w3_saga = Web3(Web3.HTTPProvider(SAGA_RPC_URL))
-w3_saga.middleware_onion.inject(ExtraDataToPOAMiddleware, layer=0)
 
+async def close_rpc_session():
+    if w3_saga.loaded:
+        await w3_saga.provider.disconnect()
 
-def send_saga_token(private_key: str, recipient_address: str, amount: float):
+
+async def read_transfer_state(wallet_address: str):
+    """
+    전송 준비에 필요한 값(잔액, gas price, pending nonce, chain id)을 한 번의 JSON-RPC 배치로 읽습니다.
+    캐시에 있는 값은 배치에서 제외되므로, 캐시가 채워진 뒤에는 잔액 조회만 나갑니다.
+    """
+    gas_price = chain_cache.cached_gas_price
+    needs_nonce = nonce_manager.needs_seed(wallet_address)
+    needs_chain_id = chain_cache.cached_chain_id is None
+
+    # w3_saga.batch_requests() 는 provider 전체를 배치 모드로 바꾸므로, 동시에 진행 중인 다른 전송의
+    # 요청까지 배치로 끌려 들어갑니다. 여러 전송이 동시에 읽을 수 있도록 provider 배치를 직접 보냅니다.
+    requests = [("eth_getBalance", [wallet_address, "latest"])]
+    if gas_price is None:
+        requests.append(("eth_gasPrice", []))
+    if needs_nonce:
+        requests.append(("eth_getTransactionCount", [wallet_address, "pending"]))
+    if needs_chain_id:
+        requests.append(("eth_chainId", []))
+    if needs_nonce:
+        # pending nonce 는 트랜잭션을 보내는 primary 에서 읽어야 하므로 배치 전체를 primary 로 보냅니다.
+        with w3_saga.provider.pinned_to_primary():
+            responses = await w3_saga.provider.make_batch_request(requests)
+    else:
+        responses = await w3_saga.provider.make_batch_request(requests)
+    if not isinstance(responses, list):
+        raise Exception(f"Batch request failed: {responses.get('error')}")
+    errors = [response["error"] for response in responses if "error" in response]
+    if errors:
+        raise Exception(f"RPC error: {errors[0].get('message', errors[0])}")
+    results = [int(response["result"], 16) for response in sorted(responses, key=lambda response: response["id"])]
+
+    balance = results.pop(0)
+    if gas_price is None:
+        gas_price = results.pop(0)
+        chain_cache.set_gas_price(gas_price)
+    if needs_nonce:
+        nonce_manager.seed(wallet_address, results.pop(0))
+    if needs_chain_id:
+        chain_cache.set_chain_id(results.pop(0))
+
+    return balance, gas_price
+
+
+async def send_saga_token(
+    account: "LocalAccount",
+    recipient_address: str,
+    amount: float,
+    gas_price_multiplier: float = 1.0,
+    on_signed: Optional[Callable[[str, str], Awaitable[None]]] = None
+):
+    """
+    account 는 services.signers.get_signer 로 얻은 서명 계정입니다.
+    on_signed 를 주면 보내기 직전에 (tx_hash, 서명된 raw 트랜잭션) 으로 호출합니다. 여기서 저장해 두면
+    보내는 도중 실패해 결과를 모르더라도 rebroadcast_saga_transaction 으로 같은 트랜잭션을 다시 보낼 수 있습니다.
+    """
     try:
-        account = w3_saga.eth.account.from_key(private_key)
         wallet_address = account.address
-        logger.info(f"Sender wallet address: {wallet_address}")
-        logger.info(f"Recipient address: {recipient_address}")
-        
-        token_balance = w3_saga.eth.get_balance(wallet_address)
-        logger.info(f"Saga token balance: {w3_saga.from_wei(token_balance, 'ether')} SAGA")
-        
+        logger.debug("Saga transfer %s -> %s, amount %s SAGA", wallet_address, recipient_address, amount)
+
+        with transfer_stage_duration.time("read_state"):
+            token_balance, gas_price = await read_transfer_state(wallet_address)
+        # 드롭된 트랜잭션을 다시 보낼 때는 gas price 를 올려서 보냅니다.
+        gas_price = int(gas_price * gas_price_multiplier)
         amount_in_wei = w3_saga.to_wei(amount, 'ether')
-        logger.info(f"Amount to send in wei: {amount_in_wei}")
-        
+
         if token_balance < amount_in_wei:
             error_msg = f"Insufficient Saga tokens: have {w3_saga.from_wei(token_balance, 'ether')} SAGA, need {amount} SAGA"
             logger.error(error_msg)
             raise Exception(error_msg)
-        
-        nonce = w3_saga.eth.get_transaction_count(wallet_address)
-        logger.info(f"Nonce: {nonce}")
-        
-        gas_price = w3_saga.eth.gas_price
-        logger.info(f"Gas price: {w3_saga.from_wei(gas_price, 'gwei')} gwei")
-        
+
         gas_limit = 21000
-        
+
         tx_cost_wei = gas_limit * gas_price
-        logger.info(f"Estimated transaction cost: {w3_saga.from_wei(tx_cost_wei, 'ether')} SAGA")
-        
+        logger.debug("Balance %s wei, gas price %s wei, estimated cost %s wei", token_balance, gas_price, tx_cost_wei)
+
         if token_balance < (amount_in_wei + tx_cost_wei):
             error_msg = f"Insufficient balance for transfer + gas: have {w3_saga.from_wei(token_balance, 'ether')} SAGA, need {w3_saga.from_wei(amount_in_wei + tx_cost_wei, 'ether')} SAGA"
             logger.error(error_msg)
             raise Exception(error_msg)
-        
-        tx = {
-            'from': wallet_address,
-            'to': w3_saga.to_checksum_address(recipient_address),
-            'value': amount_in_wei,
-            'nonce': nonce,
-            'gas': gas_limit,
-            'gasPrice': gas_price,
-            'chainId': w3_saga.eth.chain_id
-        }
-        
-        logger.info(f"Chain ID: {w3_saga.eth.chain_id}")
-        logger.info(f"Transaction built: {tx}")
-        
-        signed_tx = w3_saga.eth.account.sign_transaction(tx, private_key)
-        logger.info("Transaction signed successfully")
-        
-        tx_hash = w3_saga.eth.send_raw_transaction(signed_tx.rawTransaction)
-        tx_hash_hex = tx_hash.hex()
-        logger.info(f"Transaction sent successfully. Hash: {tx_hash_hex}")
-        
+
+        for attempt in range(NONCE_RETRIES + 1):
+            try:
+                async with nonce_manager.reserve(wallet_address) as nonce:
+                    tx = {
+                        'from': wallet_address,
+                        'to': w3_saga.to_checksum_address(recipient_address),
+                        'value': amount_in_wei,
+                        'nonce': nonce,
+                        'gas': gas_limit,
+                        'gasPrice': gas_price,
+                        'chainId': await chain_cache.chain_id()
+                    }
+                    logger.debug("Transaction built: %s", tx)
+
+                    with transfer_stage_duration.time("sign"):
+                        signed_tx = account.sign_transaction(tx)
+                    if on_signed is not None:
+                        await on_signed(signed_tx.hash.to_0x_hex(), signed_tx.raw_transaction.to_0x_hex())
+                    with transfer_stage_duration.time("broadcast"):
+                        try:
+                            tx_hash = await w3_saga.eth.send_raw_transaction(signed_tx.raw_transaction)
+                        except Exception as e:
+                            # 앞선 요청이 노드에 닿은 뒤 응답만 실패했으면 노드는 같은 트랜잭션을 이미 알고 있습니다.
+                            # 새 nonce 로 다시 서명하면 두 번 나가므로 보낸 트랜잭션의 해시로 성공 처리합니다.
+                            if not is_already_known(e):
+                                raise
+                            tx_hash = signed_tx.hash
+                break
+            except Exception as e:
+                if attempt < NONCE_RETRIES and is_nonce_error(e):
+                    tx_outcomes.inc("saga", "nonce_retry")
+                    logger.warning("Nonce conflict, retrying with resynced nonce: %s", e)
+                    continue
+                raise
+
+        tx_hash_hex = tx_hash.to_0x_hex()
+        tx_outcomes.inc("saga", "sent")
+        # 전송 한 건당 요약 로그 한 줄
+        logger.info(
+            "Saga transfer sent %s", tx_hash_hex,
+            extra={
+                "event": "saga_transfer",
+                "sender": wallet_address,
+                "recipient": recipient_address,
+                "amount": amount,
+                "nonce": nonce,
+                "gas_price": gas_price,
+                "tx_hash": tx_hash_hex
+            }
+        )
+
         return tx_hash_hex
     except Exception as e:
-        logger.error(f"Error in send_saga_token: {str(e)}")
+        tx_outcomes.inc("saga", tx_outcome(e))
+        logger.error("Error in send_saga_token: %s", e)
         raise
 
-def mint_saga_nft(private_key: str, token_uri: str):
-    account = w3_saga.eth.account.from_key(private_key)
-    wallet_address = account.address
+async def rebroadcast_saga_transaction(raw_tx: str, tx_hash: str) -> str | None:
+    """
+    앞선 시도에서 서명해 둔 트랜잭션을 그대로 다시 보냅니다. 노드가 받아들였거나 이미 알고 있거나 채굴했으면
+    tx_hash 를 돌려줍니다. 그 nonce 를 다른 트랜잭션이 차지해 이 트랜잭션이 더 이상 채굴될 수 없으면 None 이며,
+    이때만 새로 서명해서 보내도 두 번 나가지 않습니다.
+    """
+    try:
+        with transfer_stage_duration.time("broadcast"):
+            await w3_saga.eth.send_raw_transaction(raw_tx)
+        return tx_hash
+    except Exception as e:
+        if is_already_known(e):
+            return tx_hash
+        if not is_nonce_error(e):
+            raise
+        logger.info("Stored transaction %s was not accepted again, checking whether it was mined: %s", tx_hash, e)
+
+    # 보낸 노드(primary)가 아닌 뒤처진 노드는 채굴된 트랜잭션도 모른다고 답할 수 있습니다.
+    with w3_saga.provider.pinned_to_primary():
+        response = await w3_saga.provider.make_request("eth_getTransactionByHash", [tx_hash])
+    if response.get("result"):
+        return tx_hash
+    logger.warning("Nonce of stored transaction %s was used by another transaction, signing again", tx_hash)
+    return None
+
+
+class TokenNotConfiguredError(Exception):
+    pass
+
+
+@lru_cache(maxsize=None)
+def load_abi(name: str) -> list:
+    with open(os.path.join(ABI_DIR, f"{name}.json")) as f:
+        return json.load(f)
+
 
-    nonce = w3_saga.eth.get_transaction_count(wallet_address)
+@lru_cache(maxsize=1)
+def get_saga_token_contract():
+    """SagaToken 컨트랙트 인스턴스. ABI 는 처음 한 번만 읽습니다."""
+    if not settings.saga_token_address:
+        raise TokenNotConfiguredError("SAGA_TOKEN_ADDRESS is not configured")
+    return w3_saga.eth.contract(address=w3_saga.to_checksum_address(settings.saga_token_address), abi=load_abi("SagaToken"))
 
-    tx = saga_token_contract.functions.mintNFT(
-        wallet_address, token_uri
-    ).build_transaction({
-        'from': wallet_address,
-        'nonce': nonce,
-        'gasPrice': w3_saga.eth.gas_price,
-        'gas': 300000,
-        'chainId': w3_saga.eth.chain_id
+
+async def _fill_nonce_gap(account: "LocalAccount", nonce: int, gas_price: int, chain_id: int) -> bool:
+    """
+    거절된 nonce 자리를 자기 자신에게 보내는 0 전송으로 채워, 그 뒤 nonce 로 이미 보낸 트랜잭션이 실행되게 합니다.
+    자리가 채워졌으면(이미 다른 트랜잭션이 쓴 경우 포함) True 를 돌려줍니다.
+    """
+    signed = account.sign_transaction({
+        "to": account.address,
+        "value": 0,
+        "nonce": nonce,
+        "gas": 21000,
+        "gasPrice": gas_price,
+        "chainId": chain_id
     })
+    try:
+        await w3_saga.eth.send_raw_transaction(signed.raw_transaction)
+    except Exception as e:
+        if not (is_already_known(e) or is_nonce_error(e)):
+            logger.error("Failed to fill nonce gap %s for %s: %s", nonce, account.address, e)
+            return False
+    logger.warning("Filled nonce gap %s for %s with a self-transfer", nonce, account.address)
+    return True
+
+
+async def mint_saga_tokens(account: "LocalAccount", mints: list[tuple[str, float]]) -> list[dict]:
+    """
+    SagaToken.mint(to, amount) 를 여러 건 보냅니다. account 는 mint 권한이 있는 서명 계정입니다.
+
+    연속된 nonce 를 한 번에 예약해 모두 서명한 뒤, SAGA_MINT_BATCH_SIZE 개씩 eth_sendRawTransaction
+    JSON-RPC 배치로 이어서 보냅니다. gas price 와 chain id 는 캐시를 쓰고 gas 는 고정값이므로
+    건마다 추가 RPC 왕복이 없습니다. 결과는 mints 와 같은 순서로 tx_hash 또는 error 를 담습니다.
+    한 건이라도 거절되면 남은 배치는 보내지 않고, 같은 배치에서 그 뒤 nonce 로 이미 보낸 건이 실행되도록
+    거절된 nonce 자리를 채웁니다.
+    """
+    contract = get_saga_token_contract()
+    unit = 10 ** settings.saga_token_decimals
+    results: list[dict] = []
+    calls = []
+    for recipient, amount in mints:
+        result = {"recipient": recipient, "amount": amount}
+        try:
+            calls.append((result, w3_saga.to_checksum_address(recipient), int(Decimal(str(amount)) * unit)))
+        except ValueError as e:
+            result["error"] = f"Invalid recipient: {e}"
+        results.append(result)
+    if not calls:
+        return results
 
-    signed_tx = w3_saga.eth.account.sign_transaction(tx, private_key)
-    tx_hash = w3_saga.eth.send_raw_transaction(signed_tx.rawTransaction)
+    gas_price = await chain_cache.gas_price()
+    chain_id = await chain_cache.chain_id()
 
-    return tx_hash.hex()
+    async with nonce_manager.reserve_many(account.address, len(calls)) as block:
+        def sign_all():
+            return [
+                "0x" + bytes(account.sign_transaction({
+                    "to": contract.address,
+                    "data": contract.encode_abi("mint", args=[recipient, value]),
+                    "value": 0,
+                    "nonce": block.start + index,
+                    "gas": settings.saga_mint_gas_limit,
+                    "gasPrice": gas_price,
+                    "chainId": chain_id
+                }).raw_transaction).hex()
+                for index, (_, recipient, value) in enumerate(calls)
+            ]
+
+        # 서명은 건당 CPU 를 쓰므로 이벤트 루프 밖에서 합니다.
+        with transfer_stage_duration.time("mint_sign"):
+            raw_transactions = await asyncio.to_thread(sign_all)
+
+        for start in range(0, len(calls), SAGA_MINT_BATCH_SIZE):
+            chunk = list(zip(calls[start:start + SAGA_MINT_BATCH_SIZE], raw_transactions[start:start + SAGA_MINT_BATCH_SIZE]))
+            try:
+                with transfer_stage_duration.time("mint_broadcast"):
+                    responses = await w3_saga.provider.make_batch_request(
+                        [("eth_sendRawTransaction", [raw]) for _, raw in chunk]
+                    )
+                if not isinstance(responses, list):
+                    raise Exception(f"Batch request failed: {responses.get('error')}")
+            except Exception as e:
+                # 이 배치의 어느 트랜잭션이 노드에 들어갔는지 알 수 없고, 뒤의 nonce 는 이어질 수 없으므로 멈춥니다.
+                for (result, _, _), _ in chunk:
+                    result["error"] = str(e)
+                for result, _, _ in calls[start + len(chunk):]:
+                    result["error"] = "Not sent: an earlier batch failed"
+                block.failed += len(calls) - start
+                break
+
+            rejected = False
+            # 거절된 nonce 중 노드에 빈자리로 남은 첫 nonce 와, 그 뒤 nonce 로 노드가 받은 결과
+            gap = None
+            queued: list[dict] = []
+            responses = sorted(responses, key=lambda response: response["id"])
+            for index, (((result, _, _), raw), response) in enumerate(zip(chunk, responses), start):
+                if "error" in response and is_already_known(response["error"]):
+                    # 쓰기 failover 로 배치가 다시 보내지면 앞 노드가 이미 받은 트랜잭션은 이렇게 답합니다.
+                    result["tx_hash"] = w3_saga.keccak(hexstr=raw).to_0x_hex()
+                elif "error" in response:
+                    result["error"] = response["error"].get("message", str(response["error"]))
+                    block.failed += 1
+                    rejected = True
+                    # nonce 에러는 그 nonce 가 이미 다른 트랜잭션으로 채워졌다는 뜻이라 빈자리가 생기지 않습니다.
+                    if gap is None and not is_nonce_error(result["error"]):
+                        gap = block.start + index
+                    continue
+                else:
+                    result["tx_hash"] = response["result"]
+                if gap is not None:
+                    queued.append(result)
+
+            if queued and not await _fill_nonce_gap(account, gap, gas_price, chain_id):
+                # 빈자리 뒤의 트랜잭션은 그 nonce 가 쓰일 때까지 실행되지 않으므로 성공으로 알리지 않습니다.
+                for result in queued:
+                    result["error"] = f"Queued as {result.pop('tx_hash')} behind rejected nonce {gap}; runs once that nonce is used"
+                block.failed += len(queued)
+            if rejected:
+                # 실패 뒤로 nonce 를 더 쌓지 않도록 남은 배치는 보내지 않고, 블록이 끝나면 노드와 다시 맞춥니다.
+                for result, _, _ in calls[start + len(chunk):]:
+                    result["error"] = "Not sent: an earlier transaction failed"
+                block.failed += len(calls) - start - len(chunk)
+                break
+
+    failed = block.failed + len(results) - len(calls)
+    tx_outcomes.inc("saga", "minted", amount=len(results) - failed)
+    if failed:
+        tx_outcomes.inc("saga", "mint_error", amount=failed)
+    # mint 요청 한 번당 요약 로그 한 줄
+    logger.info(
+        "Saga mint sent %s/%s transactions", len(results) - failed, len(results),
+        extra={
+            "event": "saga_mint",
+            "minter": account.address,
+            "count": len(results),
+            "failed": failed,
+            "first_nonce": block.start,
+            "gas_price": gas_price
+        }
+    )
+    return results
@@ -0,0 +1,80 @@
+import os
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+
+from dotenv import load_dotenv
+
+# .env 는 프로세스에서 한 번만 읽습니다. 이 모듈을 먼저 임포트하면 이후 모듈의 os.getenv 에도 반영됩니다.
+load_dotenv()
+
+
+@dataclass(frozen=True)
+class Settings:
+    # Saga 체인 RPC 노드 목록. 첫 번째가 쓰기(sendRawTransaction)를 받는 primary 입니다.
+    saga_rpc_urls: tuple[str, ...]
+    # RPC 연결 풀 크기와 요청 타임아웃(초)
+    saga_rpc_pool_size: int
+    saga_rpc_timeout: float
+    # gas price 캐시 유지 시간(초)
+    saga_gas_price_ttl: float
+    # ERC20 전송용 RPC
+    rpc_url: str | None
+    # SagaToken 컨트랙트 주소와 소수 자릿수
+    saga_token_address: str | None
+    saga_token_decimals: int
+    # mint 트랜잭션 gas limit. 매번 estimateGas 를 부르지 않고 고정값을 씁니다.
+    saga_mint_gas_limit: int
+    # uvicorn 워커 프로세스 수
+    workers: int
+    # 여러 프로세스가 같은 DB 를 쓰는 모드. 지갑 전송을 DB lease 로 직렬화하고 단일 작업은 리더만 실행합니다.
+    multi_process: bool
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    # uvicorn 도 WEB_CONCURRENCY 를 --workers 기본값으로 읽으므로 워커 프로세스가 같은 값을 봅니다.
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    return Settings(
+        # SAGA_RPC_URLS 는 쉼표로 구분한 여러 노드, 하나만 쓸 때는 SAGA_RPC_URL
+        saga_rpc_urls=tuple(
+            url.strip() for url in (os.getenv("SAGA_RPC_URLS") or os.getenv("SAGA_RPC_URL") or "").split(",") if url.strip()
+        ),
+        saga_rpc_pool_size=int(os.getenv("SAGA_RPC_POOL_SIZE", "100")),
+        saga_rpc_timeout=float(os.getenv("SAGA_RPC_TIMEOUT", "30")),
+        saga_gas_price_ttl=float(os.getenv("SAGA_GAS_PRICE_TTL", "15")),
+        rpc_url=os.getenv("RPC_URL"),
+        saga_token_address=os.getenv("SAGA_TOKEN_ADDRESS"),
+        saga_token_decimals=int(os.getenv("SAGA_TOKEN_DECIMALS", "18")),
+        saga_mint_gas_limit=int(os.getenv("SAGA_MINT_GAS_LIMIT", "120000")),
+        workers=workers,
+        # 여러 호스트가 한 DB 를 쓸 때는 워커가 하나여도 MULTI_PROCESS=true 로 켭니다.
+        multi_process=os.getenv("MULTI_PROCESS", str(workers > 1)).lower() == "true",
+    )
+
+
+class LazyClient:
+    """
+    처음 속성에 접근할 때 factory 로 클라이언트를 만드는 프록시입니다.
+    web3 는 임포트만 1초 넘게 걸리므로, 체인을 쓰지 않는 요청과 프로세스 시작이 그 비용을 내지 않게 합니다.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._client is not None
+
+    def load(self):
+        # 동기 ERC20 경로는 threadpool 에서 호출되므로 한 번만 만들어지도록 잠급니다.
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
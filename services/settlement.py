@@ -0,0 +1,117 @@
+import os
+import asyncio
+import logging
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.connection import async_session_factory
+from models.models import PayoutLedger, TransferOutbox
+from services.transfer_worker import transfer_workers
+
+logger = logging.getLogger(__name__)
+
+# immediate: 좋아요마다 전송 작업 생성 / ledger: 장부에 적립 후 주기적으로 묶어서 정산
+SETTLEMENT_MODE = os.getenv("SETTLEMENT_MODE", "immediate")
+# 정산 주기(초)
+SETTLEMENT_WINDOW = float(os.getenv("SETTLEMENT_WINDOW", "60"))
+# 이 금액 이상 쌓인 (지불자, 수령자) 쌍만 정산합니다. 나머지는 다음 주기로 넘어갑니다.
+SETTLEMENT_THRESHOLD = float(os.getenv("SETTLEMENT_THRESHOLD", "0"))
+
+
+async def credit_ledger(session: AsyncSession, payer_address: str, recipient_address: str, amount: float) -> None:
+    """(지불자, 수령자) 장부에 금액을 원자적으로 더합니다. 커밋은 호출한 쪽에서 합니다."""
+    dialect = session.bind.dialect.name
+    insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+    statement = insert(PayoutLedger).values(
+        payer_address=payer_address,
+        recipient_address=recipient_address,
+        amount=amount,
+        updated_at=datetime.utcnow()
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["payer_address", "recipient_address"],
+        set_={"amount": PayoutLedger.amount + statement.excluded.amount, "updated_at": statement.excluded.updated_at}
+    )
+    await session.exec(statement)
+
+
+def net_balances(rows: list[PayoutLedger]) -> list[tuple[str, str, float, list[PayoutLedger]]]:
+    """
+    A→B 와 B→A 장부를 상계해 쌍마다 (지불자, 수령자, 순액, 관련 장부 행) 하나를 돌려줍니다.
+    """
+    pairs: dict[tuple[str, str], list[PayoutLedger]] = {}
+    for row in rows:
+        key = tuple(sorted((row.payer_address, row.recipient_address)))
+        pairs.setdefault(key, []).append(row)
+
+    settlements = []
+    for (first, second), pair_rows in pairs.items():
+        balance = sum(row.amount if row.payer_address == first else -row.amount for row in pair_rows)
+        if balance > 0:
+            settlements.append((first, second, balance, pair_rows))
+        elif balance < 0:
+            settlements.append((second, first, -balance, pair_rows))
+    return settlements
+
+
+async def settle_once() -> int:
+    """
+    장부를 상계해 기준액 이상인 쌍마다 전송 작업 하나를 만듭니다. 만든 작업 수를 반환합니다.
+    장부는 읽은 금액만큼만 차감하므로, 정산 중에 들어온 적립은 다음 주기에 반영됩니다.
+    """
+    async with async_session_factory() as session:
+        rows = (await session.exec(select(PayoutLedger).where(PayoutLedger.amount > 0))).all()
+        jobs = 0
+        for payer, recipient, amount, pair_rows in net_balances(rows):
+            if amount < SETTLEMENT_THRESHOLD:
+                continue
+            session.add(TransferOutbox(sender_address=payer, recipient_address=recipient, amount=amount))
+            for row in pair_rows:
+                await session.exec(
+                    update(PayoutLedger)
+                    .where(PayoutLedger.id == row.id)
+                    .values(amount=PayoutLedger.amount - row.amount, updated_at=datetime.utcnow())
+                )
+            jobs += 1
+        await session.commit()
+
+    if jobs:
+        transfer_workers.notify()
+        logger.info("Settlement created %s transfer jobs from %s ledger entries", jobs, len(rows))
+    return jobs
+
+
+class LedgerSettler:
+    """SETTLEMENT_WINDOW 마다 장부를 정산하는 백그라운드 태스크입니다. main.py 의 lifespan 에서 실행됩니다."""
+
+    def __init__(self, window: float = SETTLEMENT_WINDOW):
+        self.window = window
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+        logger.info("Ledger settler started, window %ss, threshold %s", self.window, SETTLEMENT_THRESHOLD)
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.window)
+            try:
+                await settle_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Ledger settlement failed: %s", e)
+
+
+ledger_settler = LedgerSettler()
@@ -0,0 +1,118 @@
+import os
+import logging
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models.models import UserWallet
+from services.metrics import transfer_stage_duration
+from services.settings import get_settings
+
+if TYPE_CHECKING:
+    from eth_account.signers.local import LocalAccount
+
+logger = logging.getLogger(__name__)
+
+# 메모리에 유지할 서명 계정 수
+SIGNER_CACHE_SIZE = int(os.getenv("SIGNER_CACHE_SIZE", "1024"))
+
+
+class WalletNotFoundError(Exception):
+    pass
+
+
+class InvalidPrivateKeyError(Exception):
+    pass
+
+
+class SignerCache:
+    """
+    지갑 주소별로 개인 키에서 만든 LocalAccount 를 보관하는 LRU 캐시입니다.
+
+    secp256k1 공개 키 유도와 UserWallet 조회는 전송마다 반복할 필요가 없으므로 한 번만 수행합니다.
+    /external 에서 키가 바뀌면 invalidate 로 해당 주소를 비웁니다.
+
+    키는 UserWallet 에 저장된 주소 문자열 그대로입니다. 대소문자만 다른 주소는 캐시에서도 DB 조회에서도
+    다른 지갑으로 취급되므로, 캐시를 통과한 주소는 좋아요/전송 기록에 그대로 써도 한 지갑에 한 가지 표기만 남습니다.
+
+    verify_stored_key 이면 다른 프로세스의 /external 이 키를 바꿨을 수 있으므로 매번 UserWallet 을 읽고,
+    저장된 키가 계정을 만들 때와 같을 때만 캐시된 계정을 씁니다. 이때는 키 유도만 아낍니다.
+
+    invalidate 는 주소별 세대를 올립니다. 조회 전에 받은 세대를 put 에 넘기면, 조회하는 동안 키가 바뀐 경우
+    이전 키로 만든 계정을 다시 넣지 않습니다.
+    """
+
+    def __init__(self, maxsize: int = SIGNER_CACHE_SIZE, verify_stored_key: bool = False):
+        self.maxsize = maxsize
+        self.verify_stored_key = verify_stored_key
+        # 주소 → (계정을 만든 개인 키, 계정)
+        self._accounts: OrderedDict[str, tuple[str, "LocalAccount"]] = OrderedDict()
+        # 주소 → invalidate 횟수. 키가 바뀐 주소만 남습니다.
+        self._generations: dict[str, int] = {}
+
+    def generation(self, wallet_address: str) -> int:
+        return self._generations.get(wallet_address, 0)
+
+    def get(self, wallet_address: str, private_key: str | None = None) -> "LocalAccount | None":
+        """private_key 를 주면 그 키로 만든 계정일 때만 돌려줍니다."""
+        entry = self._accounts.get(wallet_address)
+        if entry is None:
+            return None
+        if private_key is not None and entry[0] != private_key:
+            del self._accounts[wallet_address]
+            return None
+        self._accounts.move_to_end(wallet_address)
+        return entry[1]
+
+    def put(self, wallet_address: str, account: "LocalAccount", private_key: str, generation: int | None = None) -> None:
+        if generation is not None and generation != self.generation(wallet_address):
+            return
+        self._accounts[wallet_address] = (private_key, account)
+        self._accounts.move_to_end(wallet_address)
+        while len(self._accounts) > self.maxsize:
+            self._accounts.popitem(last=False)
+
+    def invalidate(self, wallet_address: str) -> None:
+        self._accounts.pop(wallet_address, None)
+        self._generations[wallet_address] = self.generation(wallet_address) + 1
+
+    def clear(self) -> None:
+        self._accounts.clear()
+
+
+# 여러 프로세스 모드에서는 키 교체가 다른 프로세스에서 일어날 수 있으므로 저장된 키를 확인합니다.
+signer_cache = SignerCache(verify_stored_key=get_settings().multi_process)
+
+
+async def get_signer(session: AsyncSession, wallet_address: str) -> "LocalAccount":
+    """지갑 주소에 등록된 개인 키로 서명 계정을 돌려줍니다. 캐시에 있으면 DB 를 조회하지 않습니다."""
+    if not signer_cache.verify_stored_key:
+        account = signer_cache.get(wallet_address)
+        if account is not None:
+            return account
+
+    # 아래 조회를 기다리는 동안 /external 이 키를 바꾸면 세대가 올라가 이전 키의 계정을 캐시하지 않습니다.
+    generation = signer_cache.generation(wallet_address)
+    wallet = (await session.exec(select(UserWallet).where(UserWallet.wallet_address == wallet_address))).first()
+    if not wallet:
+        raise WalletNotFoundError(f"Wallet not found: {wallet_address}")
+    if not wallet.private_key or len(wallet.private_key) < 64:
+        raise InvalidPrivateKeyError(f"Invalid private key format for wallet: {wallet_address}")
+    if signer_cache.verify_stored_key:
+        account = signer_cache.get(wallet_address, wallet.private_key)
+        if account is not None:
+            return account
+
+    # eth_account 는 web3 와 함께 임포트 비용이 커서 처음 서명 계정을 만들 때 가져옵니다.
+    from eth_account import Account
+
+    try:
+        with transfer_stage_duration.time("derive_key"):
+            account = Account.from_key(wallet.private_key)
+    except Exception as e:
+        raise InvalidPrivateKeyError(f"Invalid private key for wallet {wallet_address}: {e}")
+
+    signer_cache.put(wallet_address, account, wallet.private_key, generation)
+    return account
@@ -0,0 +1,108 @@
+import json
+import time
+import hashlib
+import logging
+from typing import Awaitable, Callable
+
+from fastapi import HTTPException
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from services.metrics import llm_function_duration
+
+logger = logging.getLogger(__name__)
+
+
+class Tool:
+    """
+    LLM 이 호출할 수 있는 함수 하나입니다.
+    인자 검증기(TypeAdapter)는 등록할 때 한 번만 만들고, 호출 수/에러 수/지연 시간을 함께 집계합니다.
+    """
+
+    def __init__(self, name: str, handler: Callable[..., Awaitable], args_model: type[BaseModel],
+                 description: str, status_code: int = 200, chain: bool = False, invalidates: tuple[str, ...] = ()):
+        self.name = name
+        self.handler = handler
+        self.args_model = args_model
+        self.description = description
+        self.status_code = status_code
+        # 토큰 전송이 따르는 함수인지 여부. 아니면 DB 만 사용합니다.
+        self.chain = chain
+        # 성공하면 무효화할 응답 캐시 이름공간
+        self.invalidates = invalidates
+        self.adapter = TypeAdapter(args_model)
+
+        self.calls = 0
+        self.errors = 0
+        self.invalid = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def validate(self, arguments: dict) -> BaseModel:
+        try:
+            return self.adapter.validate_python(arguments)
+        except ValidationError as e:
+            self.invalid += 1
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+
+    async def run(self, validated_args: BaseModel, session, **kwargs):
+        started = time.perf_counter()
+        failed = False
+        try:
+            return await self.handler(validated_args, session, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.calls += 1
+            self.errors += failed
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+            llm_function_duration.observe(elapsed, self.name, "error" if failed else "ok")
+
+    def schema(self) -> dict:
+        return {"name": self.name, "description": self.description, "parameters": self.adapter.json_schema()}
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "invalid_arguments": self.invalid,
+            "avg_ms": round(self.total_seconds / self.calls * 1000, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 3)
+        }
+
+
+class ToolRegistry:
+    """함수 이름으로 Tool 을 찾는 레지스트리입니다. 함수 목록(manifest)과 ETag 는 처음 요청될 때 한 번 만듭니다."""
+
+    def __init__(self):
+        self._tools: dict[str, Tool] = {}
+        self._manifest: tuple[dict, str] | None = None
+
+    def register(self, name: str, args_model: type[BaseModel], description: str,
+                 status_code: int = 200, chain: bool = False, invalidates: tuple[str, ...] = ()):
+        def decorator(handler):
+            if name in self._tools:
+                raise ValueError(f"Tool already registered: {name}")
+            self._tools[name] = Tool(name, handler, args_model, description, status_code, chain, invalidates)
+            self._manifest = None
+            return handler
+        return decorator
+
+    def get(self, name: str) -> Tool | None:
+        return self._tools.get(name)
+
+    def manifest(self) -> tuple[dict, str]:
+        """(함수 목록, ETag) 를 돌려줍니다."""
+        if self._manifest is None:
+            manifest = {"tools": [tool.schema() for tool in self._tools.values()]}
+            body = json.dumps(manifest, sort_keys=True, separators=(",", ":"))
+            self._manifest = (manifest, f'"{hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]}"')
+        return self._manifest
+
+    def stats(self) -> dict:
+        return {name: tool.stats() for name, tool in self._tools.items()}
+
+
+tool_registry = ToolRegistry()
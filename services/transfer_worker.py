@@ -0,0 +1,183 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.connection import async_session_factory
+from models.models import TransferOutbox
+from services.saga_blockchain import send_saga_token, rebroadcast_saga_transaction
+from services.signers import get_signer
+from services.receipt_tracker import receipt_tracker, gas_price_multiplier
+from services.logging_config import begin_context
+
+logger = logging.getLogger(__name__)
+
+TRANSFER_WORKERS = int(os.getenv("TRANSFER_WORKERS", "4"))
+TRANSFER_MAX_ATTEMPTS = int(os.getenv("TRANSFER_MAX_ATTEMPTS", "5"))
+# 재시도 대기 시간은 TRANSFER_BACKOFF_BASE * 2^(시도 횟수 - 1) 초, 최대 TRANSFER_BACKOFF_MAX 초
+TRANSFER_BACKOFF_BASE = float(os.getenv("TRANSFER_BACKOFF_BASE", "2"))
+TRANSFER_BACKOFF_MAX = float(os.getenv("TRANSFER_BACKOFF_MAX", "300"))
+# 대기열이 비었을 때 새 작업을 확인하는 주기(초)
+TRANSFER_POLL_INTERVAL = float(os.getenv("TRANSFER_POLL_INTERVAL", "1"))
+
+# 여러 프로세스 모드에서 sending 상태로 이 시간(초) 넘게 남은 작업은 보내던 프로세스가 죽은 것으로 보고
+# 다시 대기열에 넣습니다. 한 프로세스일 때는 시작할 때 모두 되돌립니다.
+TRANSFER_STALE_AFTER = float(os.getenv("TRANSFER_STALE_AFTER", "300"))
+
+# 재시도해도 성공할 수 없는 에러
+PERMANENT_ERROR_MARKERS = ("insufficient", "wallet not found", "invalid private key")
+
+
+def backoff_delay(attempts: int) -> float:
+    return min(TRANSFER_BACKOFF_BASE * (2 ** (attempts - 1)), TRANSFER_BACKOFF_MAX)
+
+
+async def claim_next_job(session: AsyncSession) -> Optional[TransferOutbox]:
+    """
+    실행할 차례가 된 pending 작업 하나를 sending 상태로 바꾸고 반환합니다.
+    상태 조건이 걸린 UPDATE 로 선점하므로 여러 워커가 같은 작업을 가져가지 않습니다.
+    """
+    now = datetime.utcnow()
+    job_id = (await session.exec(
+        select(TransferOutbox.id)
+        .where(TransferOutbox.status == "pending", TransferOutbox.next_attempt_at <= now)
+        .order_by(TransferOutbox.id)
+        .limit(1)
+    )).first()
+    if job_id is None:
+        return None
+
+    result = await session.exec(
+        update(TransferOutbox)
+        .where(TransferOutbox.id == job_id, TransferOutbox.status == "pending")
+        .values(status="sending", attempts=TransferOutbox.attempts + 1, updated_at=now)
+    )
+    await session.commit()
+    if result.rowcount != 1:
+        return None
+    return await session.get(TransferOutbox, job_id)
+
+
+async def recover_interrupted_jobs(older_than: Optional[float] = None) -> None:
+    # 서버가 전송 도중 종료되었다면 sending 상태로 남은 작업을 다시 대기열에 넣습니다.
+    # 이미 서명해 둔 작업(raw_tx)은 다음 시도에서 새로 서명하지 않고 같은 트랜잭션을 다시 보냅니다.
+    # older_than 을 주면 그 시간(초)보다 오래 멈춘 작업만 되돌립니다. 다른 프로세스가 보내는 중인 작업은 건드리지 않습니다.
+    now = datetime.utcnow()
+    conditions = [TransferOutbox.status == "sending"]
+    if older_than is not None:
+        conditions.append(TransferOutbox.updated_at < now - timedelta(seconds=older_than))
+    async with async_session_factory() as session:
+        result = await session.exec(
+            update(TransferOutbox)
+            .where(*conditions)
+            .values(status="pending", updated_at=now)
+        )
+        await session.commit()
+        if result.rowcount:
+            logger.warning("Re-queued %s interrupted transfer jobs", result.rowcount)
+
+
+async def process_job(session: AsyncSession, job: TransferOutbox) -> None:
+    # 전송 하나를 요청 하나처럼 다룹니다. DEBUG 상세 로그는 이 단위로 샘플링됩니다.
+    begin_context(job_id=job.id)
+    try:
+        account = await get_signer(session, job.sender_address)
+        tx_hash = None
+        if job.raw_tx:
+            # 앞선 시도가 노드에 닿았는지 모르므로 새 nonce 로 서명하지 않고 같은 트랜잭션을 다시 보냅니다.
+            tx_hash = await rebroadcast_saga_transaction(job.raw_tx, job.tx_hash)
+
+        async def save_signed(signed_hash: str, raw_tx: str) -> None:
+            # 보내기 전에 커밋해 두어야 타임아웃, 종료, 크래시 뒤에도 같은 트랜잭션을 다시 보낼 수 있습니다.
+            job.tx_hash = signed_hash
+            job.raw_tx = raw_tx
+            job.updated_at = datetime.utcnow()
+            session.add(job)
+            await session.commit()
+
+        if tx_hash is None:
+            tx_hash = await send_saga_token(
+                account=account,
+                recipient_address=job.recipient_address,
+                amount=job.amount,
+                gas_price_multiplier=gas_price_multiplier(job.gas_bumps),
+                on_signed=save_signed
+            )
+        job.status = "sent"
+        # save_signed 가 보내기 전에 저장한 해시가 있으면 그대로 둡니다.
+        job.tx_hash = job.tx_hash or tx_hash
+        job.last_error = None
+        logger.debug("Transfer job %s sent: %s", job.id, tx_hash)
+    except Exception as e:
+        job.last_error = str(e)
+        permanent = any(marker in job.last_error.lower() for marker in PERMANENT_ERROR_MARKERS)
+        if permanent or job.attempts >= TRANSFER_MAX_ATTEMPTS:
+            job.status = "failed"
+            logger.error("Transfer job %s failed after %s attempts: %s", job.id, job.attempts, e)
+        else:
+            job.status = "pending"
+            job.next_attempt_at = datetime.utcnow() + timedelta(seconds=backoff_delay(job.attempts))
+            logger.warning("Transfer job %s attempt %s failed, retrying: %s", job.id, job.attempts, e)
+
+    if job.status == "sent":
+        await receipt_tracker.track(session, job.tx_hash, job.sender_address, outbox_id=job.id)
+    job.updated_at = datetime.utcnow()
+    session.add(job)
+    await session.commit()
+
+
+class TransferWorkerPool:
+    """
+    transfer_outbox 에 쌓인 토큰 전송 작업을 서명·전송하는 백그라운드 워커 묶음입니다.
+    main.py 의 lifespan 에서 시작하고 종료합니다.
+    """
+
+    def __init__(self, size: int = TRANSFER_WORKERS):
+        self.size = size
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+    async def start(self, recover: bool = True) -> None:
+        if recover:
+            await recover_interrupted_jobs()
+        self._tasks = [asyncio.create_task(self._run(i)) for i in range(self.size)]
+        logger.info("Started %s transfer workers", self.size)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """새 작업이 추가되었음을 대기 중인 워커에게 알립니다."""
+        self._wakeup.set()
+
+    async def _wait_for_work(self) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=TRANSFER_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _run(self, worker_id: int) -> None:
+        while True:
+            try:
+                async with async_session_factory() as session:
+                    job = await claim_next_job(session)
+                    if job is not None:
+                        await process_job(session, job)
+                        continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Transfer worker %s error: %s", worker_id, e)
+            await self._wait_for_work()
+
+
+transfer_workers = TransferWorkerPool()